@@ -1 +1,10 @@
-from .app import app
\ No newline at end of file
+def __getattr__(name):
+    # importing a submodule (backend.config, backend.db.migration_check, ...)
+    # should not build the whole application
+    if name == "app":
+        from .app import app
+
+        # the import above bound the submodule here, keep the old meaning
+        globals()["app"] = app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
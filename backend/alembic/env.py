@@ -1,3 +1,4 @@
+import os
 from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
@@ -11,6 +12,13 @@ from db.model import *
 # access to the values within the .ini file in use.
 config = context.config
 
+# DATABASE_URL overrides alembic.ini, as it does for the app
+if os.getenv("DATABASE_URL"):
+    # the ini parser interpolates %, escape it
+    config.set_main_option(
+        "sqlalchemy.url", os.environ["DATABASE_URL"].replace("%", "%%")
+    )
+
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
 if config.config_file_name is not None:
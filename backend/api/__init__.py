@@ -1,5 +1,6 @@
 from .superadmin.routers import router as superadmin_routers
 from .admin.routers import router as admin_routers
 from .public.routers import router as public_routers
+from .health.routers import router as health_routers
 
-roter_list = [superadmin_routers, admin_routers, public_routers]
+roter_list = [superadmin_routers, admin_routers, public_routers, health_routers]
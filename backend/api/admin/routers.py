@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Query, Request, status
 from sqlalchemy.orm import Session
 
 
 from backend.db.engin import get_db
 from backend.auth import get_current_admin
+from backend.utils.responses import (
+    FastJSONResponse,
+    FastJSONRoute,
+    not_modified,
+    with_etag,
+)
 from backend.schema._input import ClientInput, ClientUpdateInput
 from backend.services import (
     add_new_user,
@@ -12,25 +17,46 @@ from backend.services import (
     delete_a_user,
     get_all_users_from_panel,
     reset_a_user_usage,
+    users_etag,
 )
 
-router = APIRouter(prefix="/admin", tags=["Admin"])
+router = APIRouter(prefix="/admin", tags=["Admin"], route_class=FastJSONRoute)
 
 
 @router.get("/user", description="Get all users")
 async def get_all_users(
-    db: Session = Depends(get_db), current_admin: dict = Depends(get_current_admin)
+    request: Request,
+    offset: int = Query(0, ge=0),
+    limit: int | None = Query(None, ge=1, le=1000),
+    search: str | None = Query(None, max_length=64),
+    user_status: str | None = Query(
+        None, alias="status", pattern="^(active|disabled|limited|expired|on_hold)$"
+    ),
+    db: Session = Depends(get_db),
+    current_admin: dict = Depends(get_current_admin),
 ):
     if current_admin["role"] != "admin":
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_403_FORBIDDEN,
             content={"detail": "Not authorized to access this resource."},
         )
 
+    query = request.url.query
+    cached = not_modified(request, users_etag(current_admin["username"], db, query))
+    if cached:
+        return cached
+
     result = await get_all_users_from_panel(
-        admin_username=current_admin["username"], db=db
+        admin_username=current_admin["username"],
+        db=db,
+        offset=offset,
+        limit=limit,
+        search=search,
+        user_status=user_status,
     )
-    return result
+    # a refetch that found the same users still answers 304
+    etag = users_etag(current_admin["username"], db, query, within_ttl=False)
+    return not_modified(request, etag) or with_etag(FastJSONResponse(result), etag)
 
 
 @router.post("/user", description="Add a new user")
@@ -40,7 +66,7 @@ async def add_user(
     current_admin: dict = Depends(get_current_admin),
 ):
     if current_admin["role"] != "admin":
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_403_FORBIDDEN,
             content={"detail": "Not authorized to access this resource."},
         )
@@ -59,7 +85,7 @@ async def update_user(
     current_admin: dict = Depends(get_current_admin),
 ):
     if current_admin["role"] != "admin":
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_403_FORBIDDEN,
             content={"detail": "Not authorized to access this resource."},
         )
@@ -80,7 +106,7 @@ async def reset_user_usage(
     current_admin: dict = Depends(get_current_admin),
 ):
     if current_admin["role"] != "admin":
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_403_FORBIDDEN,
             content={"detail": "Not authorized to access this resource."},
         )
@@ -98,7 +124,7 @@ async def delete_user(
     current_admin: dict = Depends(get_current_admin),
 ):
     if current_admin["role"] != "admin":
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_403_FORBIDDEN,
             content={"detail": "Not authorized to access this resource."},
         )
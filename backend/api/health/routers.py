@@ -0,0 +1,77 @@
+import secrets
+
+from fastapi import APIRouter, Depends, Header, status
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from backend.config import config
+from backend.db import crud
+from backend.db.engin import get_db
+from backend.services.health import get_health
+from backend.services.circuit_breaker import get_breaker
+from backend.utils.logger import logger
+from backend.utils.metrics import render_metrics
+from backend.utils.responses import FastJSONResponse, FastJSONRoute
+
+router = APIRouter(tags=["Health"], route_class=FastJSONRoute)
+
+
+def _has_metrics_token(authorization: str | None) -> bool:
+    if not config.METRICS_TOKEN or authorization is None:
+        return False
+    return secrets.compare_digest(authorization, f"Bearer {config.METRICS_TOKEN}")
+
+
+@router.get("/ready", description="Readiness check, per-panel health with the metrics token")
+async def readiness(
+    authorization: str | None = Header(None), db: Session = Depends(get_db)
+):
+    try:
+        db.execute(text("SELECT 1"))
+    except Exception as e:
+        logger.error(f"Readiness check failed, database unavailable: {str(e)}")
+        return FastJSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"success": False, "message": "Database unavailable"},
+        )
+
+    panels = {}
+    for panel in crud.get_all_panels(db):
+        if not panel.is_active:
+            continue
+        health = get_health(panel.name)
+        panels[panel.name] = {
+            "healthy": health.get("healthy"),
+            "p95_ms": health.get("p95_ms"),
+            "error_rate": health.get("error_rate"),
+            "breaker": get_breaker(panel.name).state,
+        }
+
+    degraded = any(
+        panel["healthy"] is False or panel["breaker"] != "closed"
+        for panel in panels.values()
+    )
+    content = {"success": True, "message": "degraded" if degraded else "ok"}
+    # panel names and latencies are for the operator, not for anyone probing
+    if _has_metrics_token(authorization):
+        content["data"] = {"database": True, "panels": panels}
+    return FastJSONResponse(status_code=status.HTTP_200_OK, content=content)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(authorization: str | None = Header(None)):
+    if not config.METRICS_TOKEN:
+        return FastJSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"success": False, "message": "Metrics are disabled"},
+        )
+    if not _has_metrics_token(authorization):
+        return FastJSONResponse(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            content={"success": False, "message": "Invalid metrics token"},
+        )
+
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -1,18 +1,25 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
 
 from backend.db import crud
 from backend.db.engin import get_db
 from backend.auth import get_current_admin
 from backend.schema.output import AdminOutput, ResponseModel, PanelOutput
-from backend.services import get_all_users_from_panel
+from backend.services import get_users_overview, users_etag
 from backend.utils import get_ads_from_github
+from backend.utils.responses import (
+    FastJSONResponse,
+    FastJSONRoute,
+    not_modified,
+    with_etag,
+)
 
-router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"], route_class=FastJSONRoute)
 
 
 @router.get("/", description="Get dashboard data")
 async def read_dashboard_data(
+    request: Request,
     db: Session = Depends(get_db), current_admin: dict = Depends(get_current_admin)
 ):
     if current_admin["role"] == "superadmin":
@@ -30,22 +37,31 @@ async def read_dashboard_data(
         )
 
     if current_admin["role"] == "admin":
+        cached = not_modified(request, users_etag(current_admin["username"], db))
+        if cached:
+            return cached
+
         admin_data = crud.get_admin_by_username(db, current_admin["username"])
         panel_data = crud.get_panel_by_name(db, admin_data.panel)
         news_data = crud.get_news(db)
-        _, users = await get_all_users_from_panel(
+        users, summary = await get_users_overview(
             admin_username=current_admin["username"], db=db
         )
 
-        return ResponseModel(
-            success=True,
-            message="Data retrieved successfully",
-            data={
-                "remaining_traffic": admin_data.traffic,
-                "initial_traffic": admin_data.initial_traffic,
-                "expiry_time": admin_data.expiry_date,
-                "news": [news.message for news in news_data],
-                "sub_url": panel_data.sub_url,
-                "users": users,
-            },
+        response = FastJSONResponse(
+            ResponseModel(
+                success=True,
+                message="Data retrieved successfully",
+                data={
+                    "remaining_traffic": admin_data.traffic,
+                    "initial_traffic": admin_data.initial_traffic,
+                    "expiry_time": admin_data.expiry_date,
+                    "news": [news.message for news in news_data],
+                    "sub_url": panel_data.sub_url,
+                    "users": users,
+                    "summary": summary,
+                },
+            )
         )
+        etag = users_etag(current_admin["username"], db, within_ttl=False)
+        return not_modified(request, etag) or with_etag(response, etag)
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, status, UploadFile, File
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 import os
 
@@ -9,12 +9,20 @@ from backend.db import crud
 from backend.db.engin import get_db
 from backend.services import create_new_panel, update_a_panel
 from backend.services.marzban.api import APIService as MarzbanAPI
+from backend.services.circuit_breaker import get_breaker
+from backend.services.concurrency import get_limiter
+from backend.services.retry import get_retry_stats
+from backend.services.health import forget_health, get_health
+from backend.services.upstream import forget_panel
+from backend.services.user_store import invalidate_user_store
+from backend.services.data_version import bump_data_version
 from backend.utils.logger import logger, get_10_logs
 from backend.utils.backup import restore_database
 from backend.auth.auth import get_current_superadmin
 from backend.utils.system import get_system_info
+from backend.utils.responses import FastJSONResponse, FastJSONRoute
 
-router = APIRouter(prefix="/superadmin", tags=["superadmin"])
+router = APIRouter(prefix="/superadmin", tags=["superadmin"], route_class=FastJSONRoute)
 
 
 @router.get("/admins", description="Get all admins")
@@ -39,7 +47,7 @@ async def create_admin(
         logger.warning(
             f"Attempt to create admin with duplicate username: {admin_input.username}"
         )
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_409_CONFLICT,
             content={
                 "success": False,
@@ -63,7 +71,7 @@ async def update_admin(
     admin: dict = Depends(get_current_superadmin),
 ):
     if not crud.get_admin_by_username(db, admin_input.username):
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
             content={
                 "success": False,
@@ -72,6 +80,7 @@ async def update_admin(
         )
     update_admin = crud.update_admin_values(db, admin_id, admin_input)
     if update_admin:
+        bump_data_version()
         return ResponseModel(
             success=True,
             message="Admin updated successfully",
@@ -87,7 +96,7 @@ async def delete_admin(
     remove_admin = crud.remove_admin(db, admin_id)
     if not remove_admin:
         logger.warning(f"Attempt to delete non-existent admin with id: {admin_id}")
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
             content={
                 "success": False,
@@ -95,6 +104,7 @@ async def delete_admin(
             },
         )
     logger.info(f"Admin deleted with id: {admin_id}")
+    bump_data_version()
     return ResponseModel(
         success=True,
         message="Admin deleted successfully",
@@ -109,13 +119,14 @@ async def toggle_admin_status(
 ):
     status_changed = crud.change_admin_status(db, admin_id)
     if not status_changed:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
             content={
                 "success": False,
                 "message": "Admin not found",
             },
         )
+    bump_data_version()
     return ResponseModel(
         success=True,
         message="Admin status changed successfully",
@@ -127,10 +138,19 @@ async def get_panels(
     db: Session = Depends(get_db), current_admin: dict = Depends(get_current_superadmin)
 ):
     all_panels = crud.get_all_panels(db)
+    panels = []
+    for panel in all_panels:
+        panel_output = PanelOutput.from_orm(panel)
+        panel_output.breaker = get_breaker(panel.name).snapshot()
+        panel_output.retries = get_retry_stats(panel.name)
+        panel_output.health = get_health(panel.name)
+        panel_output.concurrency = get_limiter(panel.name).snapshot()
+        panels.append(panel_output)
+
     return ResponseModel(
         success=True,
         message="Panels retrieved successfully",
-        data=[PanelOutput.from_orm(panel) for panel in all_panels],
+        data=panels,
     )
 
 
@@ -144,7 +164,7 @@ async def create_panel(
         logger.warning(
             f"Attempt to create panel with duplicate name: {panel_input.name}"
         )
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_409_CONFLICT,
             content={
                 "success": False,
@@ -157,7 +177,7 @@ async def create_panel(
         logger.error(
             f"Failed to connect to panel: {panel_input.name} at {panel_input.url}"
         )
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
             content={
                 "success": False,
@@ -180,9 +200,10 @@ async def update_panel(
     db: Session = Depends(get_db),
     admin: dict = Depends(get_current_superadmin),
 ):
-    if not crud.get_panel_by_id(db, panel_id):
+    panel = crud.get_panel_by_id(db, panel_id)
+    if not panel:
         logger.warning(f"Attempt to update non-existent panel with id: {panel_id}")
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
             content={
                 "success": False,
@@ -194,7 +215,7 @@ async def update_panel(
         logger.error(
             f"Failed to connect to panel: {panel_input.name} at {panel_input.url} during update"
         )
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
             content={
                 "success": False,
@@ -202,8 +223,14 @@ async def update_panel(
             },
         )
 
+    # the breaker, limiter and health window describe the old URL/credentials
+    old_name = panel.name
+    invalidate_user_store(old_name)
+    await forget_panel(old_name)
+    forget_health(old_name)
     crud.update_panel_values(db, panel_id, panel_input)
     logger.info(f"Panel updated with id: {panel_id} ({panel_input.name})")
+    bump_data_version()
     return ResponseModel(
         success=True,
         message="Panel updated successfully",
@@ -216,17 +243,22 @@ async def delete_panel(
     db: Session = Depends(get_db),
     admin: dict = Depends(get_current_superadmin),
 ):
-    remove_panel = crud.remove_panel(db, panel_id)
+    panel = crud.get_panel_by_id(db, panel_id)
+    remove_panel = panel is not None and crud.remove_panel(db, panel_id)
     if not remove_panel:
         logger.warning(f"Attempt to delete non-existent panel with id: {panel_id}")
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
             content={
                 "success": False,
                 "message": "Panel not found",
             },
         )
+    invalidate_user_store(panel.name)
+    await forget_panel(panel.name)
+    forget_health(panel.name)
     logger.info(f"Panel deleted with id: {panel_id}")
+    bump_data_version()
     return ResponseModel(
         success=True,
         message="Panel deleted successfully",
@@ -241,13 +273,14 @@ async def toggle_panel_status(
 ):
     status_changed = crud.change_panel_status(db, panel_id)
     if not status_changed:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
             content={
                 "success": False,
                 "message": "Panel not found",
             },
         )
+    bump_data_version()
     return ResponseModel(
         success=True,
         message="Panel status changed successfully",
@@ -263,7 +296,7 @@ async def get_panel_inbounds(
     """Get available inbounds for a Marzban panel"""
     panel = crud.get_panel_by_name(db, panel_name)
     if not panel:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
             content={
                 "success": False,
@@ -272,7 +305,7 @@ async def get_panel_inbounds(
         )
 
     if panel.panel_type != "marzban":
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
             content={
                 "success": False,
@@ -285,6 +318,7 @@ async def get_panel_inbounds(
             url=panel.url,
             username=panel.username,
             password=panel.password,
+            panel_name=panel.name,
         )
         inbounds = await api_service.get_inbounds()
         return ResponseModel(
@@ -292,7 +326,7 @@ async def get_panel_inbounds(
         )
     except Exception as e:
         logger.error(f"Failed to fetch inbounds from panel {panel_name}: {str(e)}")
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content={
                 "success": False,
@@ -306,7 +340,7 @@ async def download_backup(admin: dict = Depends(get_current_superadmin)):
     """Download the current database as a backup file"""
     db_path = "/app/data/walpanel.db"
     if not os.path.exists(db_path):
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
             content={
                 "success": False,
@@ -331,7 +365,7 @@ async def restore_backup(
 ):
     """Restore database from an uploaded backup file"""
     if not file.filename.endswith(".db"):
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
             content={
                 "success": False,
@@ -342,6 +376,7 @@ async def restore_backup(
     db_path = "/app/data/walpanel.db"
     try:
         restore_database(db_path, file)
+        bump_data_version()
         return ResponseModel(
             success=True,
             message="Database restored successfully. Please restart the container to apply changes.",
@@ -349,7 +384,7 @@ async def restore_backup(
 
     except Exception as e:
         logger.error(f"Restore failed: {str(e)}")
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content={
                 "success": False,
@@ -370,7 +405,7 @@ async def get_logs(admin: dict = Depends(get_current_superadmin)):
         )
     except Exception as e:
         logger.error(f"Failed to retrieve logs: {str(e)}")
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content={
                 "success": False,
@@ -402,7 +437,7 @@ async def get_news(
         )
     except Exception as e:
         logger.error(f"Failed to retrieve news: {str(e)}")
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content={
                 "success": False,
@@ -420,13 +455,14 @@ async def add_news(
     """Add news"""
     try:
         crud.add_news(db, news.news)
+        bump_data_version()
         return ResponseModel(
             success=True,
             message="News added successfully",
         )
     except Exception as e:
         logger.error(f"Failed to add news: {str(e)}")
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content={
                 "success": False,
@@ -447,7 +483,7 @@ async def delete_news(
     try:
         news = db.query(crud.News).filter(crud.News.id == news_id).first()
         if not news:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
                 content={
                     "success": False,
@@ -456,13 +492,14 @@ async def delete_news(
             )
         db.delete(news)
         db.commit()
+        bump_data_version()
         return ResponseModel(
             success=True,
             message="News deleted successfully",
         )
     except Exception as e:
         logger.error(f"Failed to delete news: {str(e)}")
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content={
                 "success": False,
@@ -477,4 +514,4 @@ async def get_system_info_endpoint(
 ):
 
     system_info = get_system_info()
-    return JSONResponse(content={"success": True, "data": system_info})
+    return FastJSONResponse(content={"success": True, "data": system_info})
@@ -1,18 +1,86 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from pathlib import Path
-from fastapi import FastAPI
+
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
 
 from backend.config import config
 from backend.auth import auth_router
 from backend.api import roter_list
+from backend.db.engin import engin, sessionLocal
+from backend.auth.refresh import load_revoked_families
+from backend.services.health import run_health_prober
+from backend.services.upstream import close_transports
+from backend.utils.metrics import (
+    MetricsMiddleware,
+    instrument_engine,
+    run_metrics_publisher,
+)
+from backend.utils.tracing import TracingMiddleware, flush_traces
+from backend.utils.responses import FastJSONResponse
+from backend.utils.compression import CompressionMiddleware
+from backend.utils.frontend import FrontendCache
+from backend.utils.logger import logger, flush_logs
+from backend.utils.system import process_uptime
+from backend.utils.shared_state import get_state
+from backend.utils.shutdown import DrainMiddleware, drain
+from backend.utils.disconnect import DisconnectMiddleware
+from backend.utils.rate_limit import RateLimitMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    frontend.load()
+    # fail on a bad STATE_BACKEND/STATE_URL now rather than on the first request
+    logger.info(f"Shared state: {get_state().name}, {config.WORKERS} worker(s)")
+    with sessionLocal() as db:
+        load_revoked_families(db)
+
+    prober = None
+    if config.HEALTH_PROBE_INTERVAL > 0:
+        prober = asyncio.create_task(run_health_prober())
+    # /metrics merges the series every worker publishes
+    publisher = None
+    if config.WORKERS > 1 and config.METRICS_TOKEN:
+        publisher = asyncio.create_task(run_metrics_publisher())
+
+    logger.info(f"Startup completed {process_uptime():.2f}s after process start")
+
+    yield
+
+    # the server has stopped taking connections and waited SHUTDOWN_TIMEOUT
+    # for open requests; mutations it gave up on are still running
+    await drain.wait(config.DRAIN_TIMEOUT)
+
+    # probes and publishing only read, there is nothing to finish
+    for task in (prober, publisher):
+        if task:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+    await close_transports()
+    engin.dispose()
+    logger.info("Shutdown completed")
+    flush_logs()
+    flush_traces()
 
 
 app = FastAPI(
     title="WalPanel",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
+instrument_engine(engin)
+
+app.add_middleware(DisconnectMiddleware)
+app.add_middleware(DrainMiddleware)
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(CompressionMiddleware, minimum_size=config.COMPRESSION_MIN_SIZE)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -29,17 +97,21 @@ app.include_router(auth_router, prefix=f"/{config.URLPATH}")
 
 # Serve frontend
 frontend_build_path = Path(__file__).parent.parent / "frontend" / "dist"
-app.mount(
-    f"/{config.URLPATH}/assets",
-    StaticFiles(directory=frontend_build_path / "assets"),
-    name="static",
+frontend = FrontendCache(
+    frontend_build_path,
+    minimum_size=config.COMPRESSION_MIN_SIZE,
+    replacements={"__URLPATH__": config.URLPATH},
 )
-index_html_path = frontend_build_path / "index.html"
 
 
 @app.get(f"/{config.URLPATH}")
 @app.get(f"/{config.URLPATH}/{{path_name:path}}")
-async def serve_frontend(path_name: str = ""):
-    if index_html_path.exists():
-        return FileResponse(index_html_path)
+async def serve_frontend(request: Request, path_name: str = ""):
+    # files in the build are served as is, every other path is an SPA route
+    asset = frontend.get(path_name)
+    if asset is None and path_name.startswith("assets/"):
+        return Response(status_code=404)
+    asset = asset or frontend.get("index.html")
+    if asset:
+        return frontend.response(request, asset)
     return {"error": "Frontend build not found"}
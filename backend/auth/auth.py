@@ -1,21 +1,35 @@
+import math
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from jose import jwt, JWTError
+from starlette.concurrency import run_in_threadpool
 
 from backend.auth.hash import verify_password
+from backend.auth.throttle import client_ip, login_throttle
+from backend.auth.refresh import (
+    InvalidRefreshToken,
+    is_family_revoked,
+    issue_refresh_token,
+    revoke_refresh_token,
+    rotate_refresh_token,
+)
 from backend.db.engin import get_db
 from backend.db import crud
 from backend.config import config
 from backend.utils.logger import logger
+from backend.utils.admin_context import current_admin
+from backend.utils.tracing import span
+from backend.utils.responses import FastJSONResponse, FastJSONRoute
+from backend.schema._input import RefreshTokenInput
 
-router = APIRouter(tags=["Login"])
+router = APIRouter(tags=["Login"], route_class=FastJSONRoute)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"/api/login")
 
 
 def create_access_token(data: dict):
+    from jose import jwt
+
     to_encode = data.copy()
     to_encode.update(
         {"exp": datetime.now() + timedelta(seconds=config.JWT_ACCESS_TOKEN_EXPIRES)}
@@ -24,17 +38,29 @@ def create_access_token(data: dict):
     return encoded_jwt
 
 
-def get_current_admin(token: str = Depends(oauth2_scheme)):
-    credentials_exception = JSONResponse(
+# async so the current_admin it sets is seen by the endpoint; a sync
+# dependency would run in the threadpool, on a copy of the context
+async def get_current_admin(token: str = Depends(oauth2_scheme)):
+    from jose import jwt, JWTError
+
+    # a response can't be raised, HTTPException is what FastAPI turns into one
+    credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
-        content={"success": False, "message": "Could not validate credentials"},
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, config.JWT_SECRET_KEY, algorithms=["HS256"])
+        with span("auth.jwt"):
+            payload = jwt.decode(token, config.JWT_SECRET_KEY, algorithms=["HS256"])
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
+        # one shared-state lookup; tokens from before refresh tokens have no family
+        family = payload.get("fam")
+        if family and is_family_revoked(family):
+            raise credentials_exception
 
+        current_admin.set(username)
         return {
             "username": username,
             "role": payload.get("role"),
@@ -48,57 +74,114 @@ def get_current_admin(token: str = Depends(oauth2_scheme)):
 def get_current_superadmin(admin: dict = Depends(get_current_admin)):
     """Verify that the current user is a superadmin"""
     if admin.get("role") != "superadmin":
-        raise JSONResponse(
+        raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            content={"success": False, "message": "Access denied. Only superadmin can access this endpoint"},
+            detail="Access denied. Only superadmin can access this endpoint",
         )
     return admin
 
 
+def _session_response(
+    message: str, username: str, role: str, panel: str, refresh_token: str, family: str
+):
+    access_token = create_access_token(
+        data={"sub": username, "role": role, "panel": panel, "fam": family}
+    )
+    return FastJSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "success": True,
+            "message": message,
+            "data": {
+                "access_token": access_token,
+                "refresh_token": refresh_token,
+                "token_type": "bearer",
+            },
+        },
+    )
+
+
 @router.post("/login", description="Admin login")
 async def login_for_access_token(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db),
 ):
+    ip = client_ip(request)
+    wait = login_throttle.check(form_data.username, ip)
+    if wait:
+        return FastJSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(math.ceil(wait))},
+            content={
+                "success": False,
+                "message": f"Too many login attempts, retry in {math.ceil(wait)}s",
+            },
+        )
+
     # Check for superadmin credentials
     if (
         form_data.username == config.ADMIN_USERNAME
         and form_data.password == config.ADMIN_PASSWORD
     ):
+        login_throttle.succeeded(form_data.username, ip)
         logger.info(f"SuperAdmin login successful: {form_data.username}")
-        access_token = create_access_token(
-            data={
-                "sub": form_data.username,
-                "role": "superadmin",
-                "panel": "main",
-            }
-        )
-        return JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content={
-                "success": True,
-                "message": "Login successful",
-                "data": {"access_token": access_token, "token_type": "bearer"},
-            },
+        refresh_token, family = issue_refresh_token(db, form_data.username, "superadmin")
+        return _session_response(
+            "Login successful", form_data.username, "superadmin", "main", refresh_token, family
         )
 
     # Check for regular admin credentials
     admin = crud.get_admin_by_username(db, form_data.username)
-    if not admin or not verify_password(form_data.password, admin.hashed_password):
+    # bcrypt releases the GIL, the event loop keeps serving meanwhile
+    if not admin or not await run_in_threadpool(
+        verify_password, form_data.password, admin.hashed_password
+    ):
         logger.warning(f"Failed login attempt for username: {form_data.username}")
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_401_UNAUTHORIZED,
             content={"success": False, "message": "Incorrect username or password"},
         )
 
+    login_throttle.succeeded(admin.username, ip)
     logger.info(f"Admin login successful: {admin.username}")
-    access_token = create_access_token(
-        data={"sub": admin.username, "role": "admin", "panel": admin.panel}
+    refresh_token, family = issue_refresh_token(db, admin.username, "admin")
+    return _session_response(
+        "Login successful", admin.username, "admin", admin.panel, refresh_token, family
+    )
+
+
+@router.post("/refresh", description="Renew the access token with a refresh token")
+async def refresh_access_token(
+    token_input: RefreshTokenInput, db: Session = Depends(get_db)
+):
+    invalid = FastJSONResponse(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        content={"success": False, "message": "Invalid or expired refresh token"},
     )
-    return JSONResponse(
+    try:
+        refresh_token, previous = rotate_refresh_token(db, token_input.refresh_token)
+    except InvalidRefreshToken:
+        return invalid
+
+    # the rotation already checked the owner still logs in with the same credentials
+    if previous.role == "superadmin":
+        panel = "main"
+    else:
+        admin = crud.get_admin_by_username(db, previous.username)
+        if not admin:
+            return invalid
+        panel = admin.panel
+
+    return _session_response(
+        "Token refreshed", previous.username, previous.role, panel, refresh_token, previous.family
+    )
+
+
+@router.post("/logout", description="Revoke a refresh token and its session")
+async def logout(token_input: RefreshTokenInput, db: Session = Depends(get_db)):
+    revoke_refresh_token(db, token_input.refresh_token)
+    return FastJSONResponse(
         status_code=status.HTTP_200_OK,
-        content={
-            "success": True,
-            "message": "Login successful",
-            "data": {"access_token": access_token, "token_type": "bearer"},
-        },
+        content={"success": True, "message": "Logged out"},
     )
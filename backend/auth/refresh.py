@@ -0,0 +1,103 @@
+import hmac
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+
+from backend.config import config
+from backend.db import crud
+from backend.utils.logger import logger
+
+
+class InvalidRefreshToken(Exception):
+    pass
+
+
+def hash_refresh_token(token: str) -> str:
+    # 256 random bits can't be guessed, a slow hash like bcrypt adds nothing
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _current_credential(db: Session, username: str, role: str) -> str | None:
+    """What the session's owner logs in with now, None if they can't anymore."""
+    if role == "superadmin":
+        if username != config.ADMIN_USERNAME:
+            return None
+        credential = f"{config.ADMIN_USERNAME}:{config.ADMIN_PASSWORD}"
+    else:
+        admin = crud.get_admin_by_username(db, username)
+        if admin is None:
+            return None
+        credential = admin.hashed_password
+    # keyed, so the table alone doesn't allow guessing the superadmin password
+    return hmac.new(
+        config.JWT_SECRET_KEY.encode(), credential.encode(), hashlib.sha256
+    ).hexdigest()
+
+
+def issue_refresh_token(
+    db: Session, username: str, role: str, family: str | None = None
+) -> tuple[str, str]:
+    """Store a new refresh token, returns it with its family."""
+    token = secrets.token_urlsafe(32)
+    family = family or secrets.token_hex(8)
+    crud.add_refresh_token(
+        db,
+        token_hash=hash_refresh_token(token),
+        family=family,
+        username=username,
+        role=role,
+        credential=_current_credential(db, username, role),
+        expires_at=datetime.now() + timedelta(seconds=config.JWT_REFRESH_TOKEN_EXPIRES),
+    )
+    return token, family
+
+
+def rotate_refresh_token(db: Session, token: str):
+    """Trade a refresh token for the next one of its family, returns the new
+    token and the stored row of the old one.
+
+    A token is good for one rotation. Presenting it again means it leaked,
+    whoever used it first may be the thief, so the whole family is revoked.
+    So is a family whose owner was renamed or removed, or whose password
+    (ADMIN_PASSWORD for the superadmin) changed since the login.
+    """
+    stored = crud.get_refresh_token(db, hash_refresh_token(token))
+    if stored is None or stored.revoked_at or stored.expires_at < datetime.now():
+        raise InvalidRefreshToken()
+    if stored.used_at:
+        logger.warning(f"Refresh token reused, revoking the session of {stored.username}")
+        revoke_family(db, stored.family)
+        raise InvalidRefreshToken()
+    credential = _current_credential(db, stored.username, stored.role)
+    if credential is None or not hmac.compare_digest(credential, stored.credential or ""):
+        logger.info(f"Credentials of {stored.username} changed, ending their session")
+        revoke_family(db, stored.family)
+        raise InvalidRefreshToken()
+
+    crud.mark_refresh_token_used(db, stored)
+    new_token, _ = issue_refresh_token(db, stored.username, stored.role, stored.family)
+    return new_token, stored
+
+
+def revoke_family(db: Session, family: str) -> None:
+    """End a login session: its refresh tokens and its access tokens."""
+    crud.revoke_refresh_family(db, family)
+
+
+def revoke_refresh_token(db: Session, token: str) -> None:
+    stored = crud.get_refresh_token(db, hash_refresh_token(token))
+    if stored is not None:
+        revoke_family(db, stored.family)
+
+
+def is_family_revoked(family: str) -> bool:
+    return crud.is_refresh_family_revoked(family)
+
+
+def load_revoked_families(db: Session) -> int:
+    """Put families revoked before a restart back into the shared state,
+    which the memory backend doesn't keep."""
+    families = crud.get_revoked_refresh_families(db, config.JWT_ACCESS_TOKEN_EXPIRES)
+    crud.mark_refresh_families_revoked(families)
+    return len(families)
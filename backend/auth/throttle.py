@@ -0,0 +1,115 @@
+import time
+from functools import cache
+from ipaddress import ip_address, ip_network
+
+from starlette.requests import Request
+
+from backend.config import config
+from backend.utils.logger import logger
+from backend.utils.metrics import login_lockouts, login_rejected
+from backend.utils.shared_state import get_state
+
+
+# lockouts stop doubling a day after the first one
+LOCKOUT_MEMORY = 86400
+
+
+@cache
+def _trusted_proxies():
+    return [ip_network(proxy, strict=False) for proxy in config.TRUSTED_PROXIES]
+
+
+def _is_trusted(address: str) -> bool:
+    try:
+        address = ip_address(address)
+    except ValueError:
+        return False
+    return any(address in network for network in _trusted_proxies())
+
+
+def client_ip(request: Request) -> str:
+    """The address a login comes from.
+
+    Behind a trusted proxy that's the last X-Forwarded-For hop not added by
+    a trusted proxy: hops further left are whatever the client sent, and
+    trusting them would let one client pose as many or lock out another.
+    """
+    peer = request.client.host if request.client else "unknown"
+    if not _is_trusted(peer):
+        return peer
+    hops = [
+        hop.strip()
+        for header in request.headers.getlist("x-forwarded-for")
+        for hop in header.split(",")
+        if hop.strip()
+    ]
+    for hop in reversed(hops):
+        if not _is_trusted(hop):
+            return hop
+    return hops[0] if hops else peer
+
+
+class LoginThrottle:
+    """Failed-login limits per username and per client IP.
+
+    Every attempt is counted before the password is checked, so a flood of
+    guesses stops costing bcrypt time once a limit is reached. Counts use a
+    sliding window made of two fixed ones (the previous window weighted by
+    how much of it still overlaps). Going over a limit locks the username or
+    IP for LOGIN_LOCKOUT seconds, doubling with each lockout up to
+    LOGIN_LOCKOUT_MAX, and starts its count over. A successful login clears
+    the username's count and lockouts but only takes itself off the IP's
+    count, or a bot could reset it by logging into an account of its own.
+    """
+
+    def _count(self, key: str, now: float) -> float:
+        window = config.LOGIN_WINDOW
+        index, elapsed = divmod(now / window, 1)
+        current = get_state().incr(f"login_attempts:{key}:{int(index)}", ttl=2 * window)
+        previous = get_state().counter(f"login_attempts:{key}:{int(index) - 1}")
+        return previous * (1 - elapsed) + current
+
+    def _forget(self, key: str, now: float) -> None:
+        index = int(now // config.LOGIN_WINDOW)
+        get_state().delete(f"login_attempts:{key}:{index}")
+        get_state().delete(f"login_attempts:{key}:{index - 1}")
+
+    def _lock(self, key_type: str, key: str, now: float) -> float:
+        lockouts = get_state().incr(f"login_lockouts:{key}", ttl=LOCKOUT_MEMORY)
+        duration = min(config.LOGIN_LOCKOUT * 2 ** (lockouts - 1), config.LOGIN_LOCKOUT_MAX)
+        get_state().set(f"login_lock:{key}", now + duration, ttl=duration)
+        self._forget(key, now)
+        login_lockouts.inc(key_type)
+        logger.warning(f"Login locked for {duration}s after too many attempts: {key}")
+        return duration
+
+    def check(self, username: str, ip: str) -> float:
+        """Count an attempt; returns 0 if it may go ahead, otherwise the
+        seconds until the username or IP is unlocked."""
+        now = time.time()
+        keys = (
+            ("ip", f"ip:{ip}", config.LOGIN_IP_MAX_ATTEMPTS),
+            ("username", f"username:{username}", config.LOGIN_MAX_ATTEMPTS),
+        )
+        for key_type, key, _ in keys:
+            locked_until = get_state().get(f"login_lock:{key}")
+            if locked_until and locked_until > now:
+                login_rejected.inc(key_type)
+                return locked_until - now
+
+        for key_type, key, limit in keys:
+            if self._count(key, now) > limit:
+                login_rejected.inc(key_type)
+                return self._lock(key_type, key, now)
+        return 0.0
+
+    def succeeded(self, username: str, ip: str) -> None:
+        now = time.time()
+        key = f"username:{username}"
+        self._forget(key, now)
+        get_state().delete(f"login_lockouts:{key}")
+        index = int(now // config.LOGIN_WINDOW)
+        get_state().incr(f"login_attempts:ip:{ip}:{index}", -1, ttl=2 * config.LOGIN_WINDOW)
+
+
+login_throttle = LoginThrottle()
@@ -1,7 +1,7 @@
 import os
 
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Literal, Optional
 
 
 class Setting(BaseSettings):
@@ -10,12 +10,54 @@ class Setting(BaseSettings):
     URLPATH: str = "dashboard"
     HOST: str = "0.0.0.0"
     PORT: int = 8000
+    WORKERS: int = 1
+    SERVER: Literal["uvicorn", "hypercorn"] = "uvicorn"  # hypercorn serves HTTP/2
+    LOOP: Literal["auto", "asyncio", "uvloop"] = "auto"  # auto picks uvloop if installed
+    HTTP_PARSER: Literal["auto", "h11", "httptools"] = "auto"  # uvicorn only
+    BACKLOG: int = 2048
+    KEEP_ALIVE_TIMEOUT: int = 5  # in seconds
+    LIMIT_CONCURRENCY: Optional[int] = None  # uvicorn only, 503 above this many connections
+    SHUTDOWN_TIMEOUT: int = 5  # in seconds the server waits for open requests on shutdown
+    DRAIN_TIMEOUT: int = 4  # in seconds mutations still running after that get to finish
     DEBUG: bool = False
     DOC: bool = False
     SSL_KEYFILE: Optional[str] = None
     SSL_CERTFILE: Optional[str] = None
     JWT_SECRET_KEY: str
-    JWT_ACCESS_TOKEN_EXPIRES: int = 86400  # in seconds
+    JWT_ACCESS_TOKEN_EXPIRES: int = 900  # in seconds, the frontend renews it with /refresh
+    JWT_REFRESH_TOKEN_EXPIRES: int = 2592000  # in seconds
+    LOGIN_MAX_ATTEMPTS: int = 5  # per username within LOGIN_WINDOW
+    LOGIN_IP_MAX_ATTEMPTS: int = 20  # per client IP within LOGIN_WINDOW
+    LOGIN_WINDOW: int = 300  # in seconds
+    LOGIN_LOCKOUT: int = 30  # in seconds, doubles with every lockout
+    LOGIN_LOCKOUT_MAX: int = 3600  # in seconds
+    TRUSTED_PROXIES: list[str] = []  # IPs or CIDRs whose X-Forwarded-For names the client
+    UPSTREAM_TIMEOUT: float = 30.0  # in seconds
+    UPSTREAM_CONNECT_TIMEOUT: float = 5.0  # in seconds
+    BREAKER_FAILURE_THRESHOLD: int = 5
+    BREAKER_RECOVERY_TIME: int = 30  # in seconds
+    UPSTREAM_RETRY_ATTEMPTS: int = 3
+    UPSTREAM_RETRY_BASE_DELAY: float = 0.2  # in seconds
+    UPSTREAM_RETRY_MAX_DELAY: float = 2.0  # in seconds
+    UPSTREAM_RETRY_DEADLINE: float = 10.0  # in seconds
+    UPSTREAM_CONCURRENCY: int = 10  # initial calls in flight per panel, 0 disables the limit
+    UPSTREAM_CONCURRENCY_MIN: int = 1
+    UPSTREAM_CONCURRENCY_MAX: int = 50
+    UPSTREAM_QUEUE_TIMEOUT: float = 10.0  # in seconds a call waits for a slot
+    UPSTREAM_ADMIN_WEIGHTS: dict[str, float] = {}  # admin username -> share of queued calls
+    HEALTH_PROBE_INTERVAL: int = 60  # in seconds, 0 disables the prober
+    USER_STORE_TTL: int = 10  # in seconds, 0 refetches users on every request
+    COMPRESSION_MIN_SIZE: int = 1024  # in bytes, smaller responses are sent as is
+    RATE_LIMIT_READS: float = 20.0  # per second per admin, 0 disables
+    RATE_LIMIT_READ_BURST: int = 100
+    RATE_LIMIT_MUTATIONS: float = 5.0  # per second per admin, 0 disables
+    RATE_LIMIT_MUTATION_BURST: int = 50
+    STATE_BACKEND: Optional[str] = None  # memory, sqlite or redis; sqlite if WORKERS > 1
+    STATE_URL: Optional[str] = None  # sqlite file or redis:// URL
+    METRICS_TOKEN: Optional[str] = None  # /metrics is disabled until set
+    TRACING_ENABLED: bool = True
+    SERVER_TIMING: bool = False  # adds span timings to every response
+    TRACE_SAMPLE_RATE: float = 0.0  # share of requests written to data/traces.jsonl
 
     class Config:
         env_file = os.path.join(os.path.dirname(__file__), "..", "..", ".env")
@@ -1,9 +1,11 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 
-from backend.db.model import Admins, Panels, News, SanaeiUsers
+from backend.db.model import Admins, Panels, News, SanaeiUsers, RefreshTokens
 from backend.schema._input import AdminInput, AdminUpdateInput, PanelInput
 from backend.auth.hash import hash_password
+from backend.config import config
+from backend.utils.shared_state import get_state
 
 
 def get_all_admins(db: Session):
@@ -45,6 +47,8 @@ def change_admin_status(db: Session, admin_id: int) -> bool:
     if admin:
         admin.is_active = not admin.is_active
         db.commit()
+        if not admin.is_active:
+            revoke_admin_refresh_tokens(db, admin.username)
         return True
     return False
 
@@ -59,6 +63,13 @@ def update_admin_values(
         else admin.hashed_password
     )
     if admin:
+        # a new password, a new name or disabling ends the admin's sessions
+        ends_sessions = (
+            bool(admin_input.password)
+            or admin.username != admin_input.username
+            or not admin_input.is_active
+        )
+        previous_username = admin.username
         admin.username = admin_input.username
         admin.hashed_password = new_password
         admin.is_active = admin_input.is_active
@@ -73,6 +84,8 @@ def update_admin_values(
         admin.delete_return_traffic = admin_input.delete_return_traffic
         admin.expiry_date = admin_input.expiry_date
         db.commit()
+        if ends_sessions:
+            revoke_admin_refresh_tokens(db, previous_username)
         return True
     return False
 
@@ -80,8 +93,10 @@ def update_admin_values(
 def remove_admin(db: Session, admin_id: int) -> bool:
     admin = db.query(Admins).filter(Admins.id == admin_id).first()
     if admin:
+        username = admin.username
         db.delete(admin)
         db.commit()
+        revoke_admin_refresh_tokens(db, username)
         return True
     return False
 
@@ -209,4 +224,88 @@ def remove_user_from_guard_table(db: Session, username: str) -> None:
         db.commit()
 
 def get_user_from_guard_table(db:Session):
-    return db.query(SanaeiUsers).all()
\ No newline at end of file
+    return db.query(SanaeiUsers).all()
+
+
+def add_refresh_token(
+    db: Session,
+    token_hash: str,
+    family: str,
+    username: str,
+    role: str,
+    credential: str,
+    expires_at: datetime,
+) -> None:
+    # expired tokens are dropped whenever a new one is stored
+    db.query(RefreshTokens).filter(RefreshTokens.expires_at < datetime.now()).delete()
+    token = RefreshTokens(
+        token_hash=token_hash,
+        family=family,
+        username=username,
+        role=role,
+        credential=credential,
+        expires_at=expires_at,
+    )
+    db.add(token)
+    db.commit()
+
+
+def get_refresh_token(db: Session, token_hash: str) -> RefreshTokens | None:
+    return db.query(RefreshTokens).filter(RefreshTokens.token_hash == token_hash).first()
+
+
+def mark_refresh_token_used(db: Session, token: RefreshTokens) -> None:
+    token.used_at = datetime.now()
+    db.commit()
+
+
+def mark_refresh_families_revoked(families: list[str]) -> None:
+    # access tokens can't be recalled, they are refused until they expire
+    for family in families:
+        get_state().set(f"revoked_family:{family}", True, ttl=config.JWT_ACCESS_TOKEN_EXPIRES)
+
+
+def is_refresh_family_revoked(family: str) -> bool:
+    return bool(get_state().get(f"revoked_family:{family}"))
+
+
+def revoke_refresh_family(db: Session, family: str) -> None:
+    db.query(RefreshTokens).filter(
+        RefreshTokens.family == family, RefreshTokens.revoked_at.is_(None)
+    ).update({RefreshTokens.revoked_at: datetime.now()})
+    db.commit()
+    mark_refresh_families_revoked([family])
+
+
+def revoke_admin_refresh_tokens(db: Session, username: str) -> None:
+    """End every login session of an admin."""
+    rows = (
+        db.query(RefreshTokens.family)
+        .filter(
+            RefreshTokens.username == username,
+            RefreshTokens.role == "admin",
+            RefreshTokens.revoked_at.is_(None),
+        )
+        .distinct()
+        .all()
+    )
+    families = [row.family for row in rows]
+    if not families:
+        return
+    db.query(RefreshTokens).filter(
+        RefreshTokens.family.in_(families), RefreshTokens.revoked_at.is_(None)
+    ).update({RefreshTokens.revoked_at: datetime.now()}, synchronize_session=False)
+    db.commit()
+    mark_refresh_families_revoked(families)
+
+
+def get_revoked_refresh_families(db: Session, seconds: int) -> list[str]:
+    """Families revoked in the last ``seconds``."""
+    since = datetime.now() - timedelta(seconds=seconds)
+    rows = (
+        db.query(RefreshTokens.family)
+        .filter(RefreshTokens.revoked_at >= since)
+        .distinct()
+        .all()
+    )
+    return [row.family for row in rows]
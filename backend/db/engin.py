@@ -1,11 +1,18 @@
+import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent
 
-DATABASE_URL = f"sqlite:///{BASE_DIR.parent.parent}/data/walpanel.db"
-engin = create_engine(url=DATABASE_URL, connect_args={"check_same_thread": False})
+# Read straight from the environment: alembic imports this module without
+# backend.config. alembic/env.py and migration_check.py honour it too.
+DATABASE_URL = os.getenv(
+    "DATABASE_URL", f"sqlite:///{BASE_DIR.parent.parent}/data/walpanel.db"
+)
+# sqlite connections are shared with the threadpool; other drivers reject the flag
+connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+engin = create_engine(url=DATABASE_URL, connect_args=connect_args)
 
 Base = declarative_base()
 
@@ -0,0 +1,95 @@
+"""Tell whether the database needs ``alembic upgrade head``, without alembic.
+
+Reads the stored revision from ``alembic_version`` with sqlite3 and the
+head revision from the files in ``alembic/versions``. Starting alembic
+costs more than a second on small machines, so the entrypoint only runs
+it when this exits non-zero.
+
+Run it by path, not with ``-m``: importing the ``backend`` package would
+load the whole application.
+
+    python backend/db/migration_check.py [path/to/alembic.ini]
+
+DATABASE_URL, when set, wins over the ini file, as it does for the app and
+for alembic.
+"""
+
+import os
+import re
+import sys
+import sqlite3
+import configparser
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+REVISION = re.compile(r"^revision\s*(?::[^=]*)?=\s*['\"](\w+)['\"]", re.M)
+DOWN_REVISION = re.compile(r"^down_revision\s*(?::[^=]*)?=\s*(.+)$", re.M)
+
+
+def head_revisions(versions_dir: Path = BACKEND_DIR / "alembic" / "versions") -> set[str]:
+    """Revisions no other migration builds on."""
+    revisions, parents = set(), set()
+    for path in versions_dir.glob("*.py"):
+        source = path.read_text(encoding="utf-8")
+        revision = REVISION.search(source)
+        if not revision:
+            continue
+        revisions.add(revision.group(1))
+        down_revision = DOWN_REVISION.search(source)
+        if down_revision:
+            parents.update(re.findall(r"['\"](\w+)['\"]", down_revision.group(1)))
+    return revisions - parents
+
+
+def database_path(ini_path: Path = BACKEND_DIR / "alembic.ini") -> Path | None:
+    """The SQLite file alembic migrates, None for any other database."""
+    url = os.getenv("DATABASE_URL")
+    if url:
+        if not url.startswith("sqlite:///"):
+            return None
+        return Path(url.removeprefix("sqlite:///")).resolve()
+
+    parser = configparser.ConfigParser()
+    parser.read(ini_path)
+    url = parser.get("alembic", "sqlalchemy.url", fallback="")
+    if not url.startswith("sqlite:///"):
+        return None
+    # alembic runs from the backend directory, relative paths start there
+    return (BACKEND_DIR / url.removeprefix("sqlite:///")).resolve()
+
+
+def current_revisions(db_path: Path) -> set[str]:
+    if not db_path.exists():
+        return set()
+    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        rows = connection.execute("SELECT version_num FROM alembic_version").fetchall()
+    except sqlite3.OperationalError:
+        return set()
+    finally:
+        connection.close()
+    return {row[0] for row in rows}
+
+
+def main(argv: list[str]) -> int:
+    db_path = database_path(Path(argv[0])) if argv else database_path()
+    if db_path is None:
+        print("Not a SQLite database, running migrations")
+        return 1
+
+    heads = head_revisions()
+    current = current_revisions(db_path)
+    if heads and current == heads:
+        print(f"Database is at head ({', '.join(sorted(heads))}), skipping migrations")
+        return 0
+
+    print(
+        f"Database at {', '.join(sorted(current)) or 'no revision'}, "
+        f"head is {', '.join(sorted(heads))}"
+    )
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
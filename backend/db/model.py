@@ -55,4 +55,20 @@ class GuardUsers(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, unique=True, index=True, nullable=False)
-    owner = Column(String, nullable=False)
\ No newline at end of file
+    owner = Column(String, nullable=False)
+
+class RefreshTokens(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # sha256 of the token, the token itself is only ever sent to the client
+    token_hash = Column(String, unique=True, index=True, nullable=False)
+    # every token rotated out of the same login shares its family
+    family = Column(String, index=True, nullable=False)
+    username = Column(String, index=True, nullable=False)
+    role = Column(String, nullable=False)
+    # keyed hash of the credentials logged in with, a password change ends the session
+    credential = Column(String, nullable=True)
+    expires_at = Column(DateTime, nullable=False)
+    used_at = Column(DateTime, nullable=True)
+    revoked_at = Column(DateTime, nullable=True)
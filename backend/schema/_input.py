@@ -69,3 +69,7 @@ class NewsInput(BaseModel):
     news: str = Field(
         max_length=250, description="News content must be 250 characters or less"
     )
+
+
+class RefreshTokenInput(BaseModel):
+    refresh_token: str
@@ -32,6 +32,10 @@ class PanelOutput(BaseModel):
     name: str
     url: str
     is_active: bool
+    breaker: Optional[dict] = None
+    retries: Optional[dict] = None
+    health: Optional[dict] = None
+    concurrency: Optional[dict] = None
 
     class Config:
         from_attributes = True
@@ -39,7 +43,7 @@ class PanelOutput(BaseModel):
 
 class ClientsOutput(BaseModel):
     id: int | str = 0
-    uuid: str = 0
+    uuid: str = "0"
     username: str
     email: Optional[str] = None
     status: bool = True
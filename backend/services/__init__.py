@@ -5,5 +5,7 @@ from .task_handler import (
     update_a_user,
     delete_a_user,
     get_all_users_from_panel,
+    get_users_overview,
     reset_a_user_usage,
+    users_etag,
 )
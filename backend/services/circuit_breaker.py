@@ -0,0 +1,112 @@
+import time
+
+from backend.config import config
+from backend.utils.logger import logger
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class PanelUnavailableError(Exception):
+    def __init__(self, panel_name: str, retry_after: float = 0):
+        self.panel_name = panel_name
+        self.retry_after = retry_after
+        super().__init__(
+            f"Panel {panel_name} is unavailable, retry in {int(retry_after) + 1}s"
+        )
+
+
+class CircuitBreaker:
+    """Tracks consecutive upstream failures for one panel and fails fast when it is down."""
+
+    def __init__(
+        self,
+        panel_name: str,
+        failure_threshold: int | None = None,
+        recovery_time: float | None = None,
+    ):
+        self.panel_name = panel_name
+        self.failure_threshold = failure_threshold or config.BREAKER_FAILURE_THRESHOLD
+        self.recovery_time = recovery_time or config.BREAKER_RECOVERY_TIME
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.last_error: str | None = None
+        self._trial_in_flight = False
+
+    def retry_after(self) -> float:
+        if self.state != OPEN or self.opened_at is None:
+            return 0
+        return max(self.recovery_time - (time.monotonic() - self.opened_at), 0)
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+
+        if self.state == OPEN:
+            if self.retry_after() > 0:
+                return False
+            self.state = HALF_OPEN
+            self._trial_in_flight = False
+
+        # Half-open: let a single trial request through
+        if self._trial_in_flight:
+            return False
+        self._trial_in_flight = True
+        return True
+
+    def check(self) -> None:
+        if not self.allow():
+            raise PanelUnavailableError(self.panel_name, self.retry_after())
+
+    def release_trial(self) -> None:
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        if self.state != CLOSED:
+            logger.warning(f"Circuit for panel {self.panel_name} closed again")
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self, error: str | None = None) -> None:
+        self.failures += 1
+        self.last_error = error
+        self._trial_in_flight = False
+
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.error(
+                    f"Circuit for panel {self.panel_name} opened after "
+                    f"{self.failures} failures: {error}"
+                )
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def is_open(self) -> bool:
+        return self.state == OPEN and self.retry_after() > 0
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retry_after": round(self.retry_after(), 1),
+            "last_error": self.last_error,
+        }
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(panel_name: str) -> CircuitBreaker:
+    breaker = _breakers.get(panel_name)
+    if breaker is None:
+        breaker = _breakers[panel_name] = CircuitBreaker(panel_name)
+    return breaker
+
+
+def drop_breaker(panel_name: str) -> None:
+    _breakers.pop(panel_name, None)
@@ -0,0 +1,240 @@
+import time
+import heapq
+import asyncio
+from itertools import count
+
+from backend.config import config
+from backend.services.circuit_breaker import PanelUnavailableError
+from backend.utils.admin_context import current_admin
+from backend.utils.logger import logger
+from backend.utils.metrics import (
+    upstream_concurrency_limit,
+    upstream_inflight,
+    upstream_queue_depth,
+    upstream_queue_timeouts,
+    upstream_queue_wait_seconds,
+)
+
+
+# multiplicative decrease on overload, additive increase otherwise
+BACKOFF = 0.75
+# calls this many times slower than their usual latency signal overload
+LATENCY_TOLERANCE = 2.0
+# smoothing of the recent slowdown, and of each endpoint's usual latency
+# (which follows improvements faster than degradations)
+SHORT_ALPHA = 0.2
+LONG_ALPHA = 0.01
+# usual latencies below this are too noisy to compare against, in seconds
+MIN_BASELINE = 0.01
+# endpoints whose usual latency is tracked per panel
+MAX_BASELINES = 256
+OVERLOAD_STATUS = {429, 502, 503, 504}
+
+
+def worker_share(calls: int) -> int:
+    """A worker's part of a per-panel limit; each worker runs its own limiter."""
+    return max(calls // max(config.WORKERS, 1), 1)
+
+
+class PanelOverloadedError(PanelUnavailableError):
+    def __str__(self) -> str:
+        return f"Panel {self.panel_name} is overloaded, retry in {int(self.retry_after) + 1}s"
+
+
+class FairQueue:
+    """Calls waiting for a panel, served by start-time fair queueing.
+
+    Each admin's calls get consecutive virtual start times spaced ``1 /
+    weight`` apart, beginning no earlier than the start time of the call
+    last served; the earliest start time goes first. An admin with a
+    thousand calls queued is served in turn with everyone else instead of
+    ahead of them, and an admin with weight 2 gets twice the turns.
+    """
+
+    def __init__(self, weights: dict[str, float] | None = None):
+        self.weights = config.UPSTREAM_ADMIN_WEIGHTS if weights is None else weights
+        self.virtual_time = 0.0
+        # admin -> virtual finish time of their last queued call
+        self.finish: dict[str, float] = {}
+        self.heap: list[tuple[float, int, asyncio.Future]] = []
+        self._order = count()
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def push(self, admin: str, waiter: asyncio.Future) -> None:
+        start = max(self.virtual_time, self.finish.get(admin, 0.0))
+        self.finish[admin] = start + 1 / self.weights.get(admin, 1.0)
+        heapq.heappush(self.heap, (start, next(self._order), waiter))
+
+    def pop(self) -> asyncio.Future | None:
+        while self.heap:
+            start, _, waiter = heapq.heappop(self.heap)
+            if not waiter.done():
+                self.virtual_time = start
+                return waiter
+        # an idle queue keeps no history, nobody is owed or owes turns
+        self.finish.clear()
+        return None
+
+    def remove(self, waiter: asyncio.Future) -> None:
+        self.heap = [entry for entry in self.heap if entry[2] is not waiter]
+        heapq.heapify(self.heap)
+
+
+class AdaptiveLimiter:
+    """Bounds concurrent upstream calls to one panel with an AIMD window.
+
+    Every success while the window is at least half used grows it by one
+    call per window's worth of responses; a 429/5xx, a transport error or
+    calls running well above their usual latency shrink it by a quarter, at
+    most once per round trip. Calls over the window queue in a ``FairQueue``,
+    which takes turns between admins by start-time fair queueing rather than
+    arrival order, for up to ``queue_timeout`` seconds, then fail with
+    ``PanelOverloadedError``.
+    Latency is compared per endpoint (method and path), so a 50k-user
+    listing isn't mistaken for a slow user update.
+    """
+
+    def __init__(
+        self,
+        panel_name: str,
+        initial: int | None = None,
+        minimum: int | None = None,
+        maximum: int | None = None,
+        queue_timeout: float | None = None,
+    ):
+        self.panel_name = panel_name
+        self.minimum = minimum or worker_share(config.UPSTREAM_CONCURRENCY_MIN)
+        self.maximum = maximum or worker_share(config.UPSTREAM_CONCURRENCY_MAX)
+        self.limit = float(initial or worker_share(config.UPSTREAM_CONCURRENCY))
+        self.limit = min(max(self.limit, self.minimum), self.maximum)
+        self.queue_timeout = queue_timeout or config.UPSTREAM_QUEUE_TIMEOUT
+        self.inflight = 0
+        self.waiters = FairQueue()
+        self.baselines: dict[str, float] = {}
+        # recent latency relative to the baselines, 1.0 is business as usual
+        self.slowdown = 1.0
+        self.latency = 0.0
+        self._decreased_at = 0.0
+        self._report()
+
+    def _report(self) -> None:
+        upstream_concurrency_limit.set(self.panel_name, value=int(self.limit))
+        upstream_inflight.set(self.panel_name, value=self.inflight)
+        upstream_queue_depth.set(self.panel_name, value=len(self.waiters))
+
+    def _wake(self) -> None:
+        while self.inflight < int(self.limit):
+            waiter = self.waiters.pop()
+            if waiter is None:
+                break
+            # the slot is handed over, the waiter doesn't take it again
+            self.inflight += 1
+            waiter.set_result(None)
+        self._report()
+
+    async def acquire(self) -> None:
+        # calls made outside a request (the health prober) share one turn
+        admin = current_admin.get() or ""
+        if not self.waiters and self.inflight < int(self.limit):
+            self.inflight += 1
+            self._report()
+            upstream_queue_wait_seconds.observe(0, self.panel_name)
+            return
+
+        started = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.push(admin, waiter)
+        self._report()
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await waiter
+        except BaseException as error:
+            if waiter.done() and not waiter.cancelled():
+                # woken just as the wait ended, give the slot back
+                self.release()
+            else:
+                waiter.cancel()
+                self.waiters.remove(waiter)
+                self._report()
+            if isinstance(error, TimeoutError):
+                upstream_queue_timeouts.inc(self.panel_name)
+                raise PanelOverloadedError(self.panel_name, self.queue_timeout) from None
+            raise
+        finally:
+            upstream_queue_wait_seconds.observe(time.perf_counter() - started, self.panel_name)
+
+    def release(
+        self,
+        endpoint: str | None = None,
+        latency: float | None = None,
+        overloaded: bool = False,
+    ) -> None:
+        """Free a slot; ``latency`` is None when the call never completed."""
+        used = self.inflight / self.limit
+        self.inflight -= 1
+        if overloaded:
+            self._decrease("upstream errors")
+        elif endpoint is not None and latency is not None:
+            self._observe(endpoint, latency, used)
+        self._wake()
+
+    def _observe(self, endpoint: str, latency: float, used: float) -> None:
+        self.latency += SHORT_ALPHA * (latency - self.latency)
+        # popped and reinserted, so the dict is ordered least recently used
+        # first; paths naming a single user come and go
+        baseline = self.baselines.pop(endpoint, None)
+        if baseline is None:
+            if len(self.baselines) >= MAX_BASELINES:
+                del self.baselines[next(iter(self.baselines))]
+            self.baselines[endpoint] = latency
+            return
+
+        alpha = LONG_ALPHA if latency > baseline else SHORT_ALPHA
+        self.baselines[endpoint] = baseline + alpha * (latency - baseline)
+        ratio = latency / max(baseline, MIN_BASELINE)
+        self.slowdown += SHORT_ALPHA * (ratio - self.slowdown)
+
+        if self.slowdown > LATENCY_TOLERANCE:
+            self._decrease(f"calls {self.slowdown:.1f}x slower than usual")
+        elif used >= 0.5:
+            self.limit = min(self.limit + 1 / self.limit, self.maximum)
+
+    def _decrease(self, reason: str) -> None:
+        now = time.monotonic()
+        # one decrease per round trip: the calls already in flight were
+        # sent under the old window and report the same overload
+        if now - self._decreased_at < self.latency:
+            return
+        self._decreased_at = now
+        limit = max(self.limit * BACKOFF, self.minimum)
+        if int(limit) < int(self.limit):
+            logger.warning(
+                f"Concurrency for panel {self.panel_name} lowered to {int(limit)}: {reason}"
+            )
+        self.limit = limit
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "inflight": self.inflight,
+            "queued": len(self.waiters),
+            "latency_ms": round(self.latency * 1000, 1),
+            "slowdown": round(self.slowdown, 2),
+        }
+
+
+_limiters: dict[str, AdaptiveLimiter] = {}
+
+
+def get_limiter(panel_name: str) -> AdaptiveLimiter:
+    limiter = _limiters.get(panel_name)
+    if limiter is None:
+        limiter = _limiters[panel_name] = AdaptiveLimiter(panel_name)
+    return limiter
+
+
+def drop_limiter(panel_name: str) -> None:
+    # calls already queued keep their reference and drain on the old limiter
+    _limiters.pop(panel_name, None)
@@ -0,0 +1,30 @@
+import hashlib
+
+from backend.utils.shared_state import get_state
+
+
+# Counters that change whenever data behind an admin's responses changes.
+# "admin:<username>" moves with the admin's own user mutations; SHARED moves
+# with anything a superadmin edits (admins, panels, news, restores). ETags
+# built from them let polling clients get 304 without the payload being
+# rebuilt. They live in the shared state so a mutation on one worker changes
+# the ETags every worker hands out.
+SHARED = "shared"
+
+
+def data_version(key: str = SHARED) -> int:
+    return get_state().counter(f"data_version:{key}")
+
+
+def bump_data_version(key: str = SHARED) -> None:
+    get_state().incr(f"data_version:{key}")
+
+
+def admin_key(username: str) -> str:
+    return f"admin:{username}"
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag over the given parts."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
@@ -1,22 +1,25 @@
-import httpx
-
 from secrets import token_hex
 from backend.schema._input import ClientInput, ClientUpdateInput
+from backend.services.upstream import create_client, instrument
+from backend.services.retry import IDEMPOTENT
+from backend.services.decoders import GuardSubscription, read_guard_subscriptions
 
 
+@instrument("guard")
 class APIService:
-    def __init__(self, url: str, token: str):
+    def __init__(self, url: str, token: str, panel_name: str | None = None):
         self.url = url.rstrip("/")
+        self.panel_name = panel_name
         self.token = token
 
-        self.client = httpx.AsyncClient(
+        self.client = create_client(
             base_url=self.url,
+            panel_name=panel_name,
             headers={
                 "X-API-Key": self.token,
                 "Accept": "application/json",
                 "Content-Type": "application/json",
             },
-            timeout=30.0,
         )
 
     async def close(self):
@@ -26,22 +29,22 @@ class APIService:
         try:
             response = await self.client.get("/api/subscriptions/count")
 
-            return response.status_code
+            return response.status_code == 200
         except Exception:
             return False
 
-    async def get_clients(self):
+    async def list_clients(self) -> list[GuardSubscription]:
         response = await self.client.get(
             "/api/subscriptions",
-            params = {
-            "page": 0,
-            "size": 1000,
-        }
+            params={
+                "page": 0,
+                "size": 1000,
+            }
         )
 
         response.raise_for_status()
 
-        return response.json()
+        return await read_guard_subscriptions(response.content)
 
     async def get_client_by_username(
         self,
@@ -91,6 +94,7 @@ class APIService:
         response = await self.client.put(
             f"/api/subscriptions/{username}",
             json=payload,
+            extensions=IDEMPOTENT,
         )
 
         response.raise_for_status()
@@ -124,7 +128,8 @@ class APIService:
             "/api/subscriptions/reset",
             json={
                 "usernames": [username]
-            }
+            },
+            extensions=IDEMPOTENT,
         )
 
         response.raise_for_status()
@@ -139,7 +144,8 @@ class APIService:
             "/api/subscriptions/enable",
             json={
                 "usernames": [username]
-            }
+            },
+            extensions=IDEMPOTENT,
         )
 
         response.raise_for_status()
@@ -154,7 +160,8 @@ class APIService:
             "/api/subscriptions/disable",
             json={
                 "usernames": [username]
-            }
+            },
+            extensions=IDEMPOTENT,
         )
 
         response.raise_for_status()
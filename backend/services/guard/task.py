@@ -1,9 +1,8 @@
-from typing import Any
-
 from sqlalchemy.orm import Session
 
 from backend.schema._input import ClientInput, ClientUpdateInput
 from backend.services.guard import APIService
+from backend.services.decoders import GuardSubscription
 from backend.db import crud
 from backend.utils.logger import logger
 
@@ -25,37 +24,13 @@ class AdminTaskService:
 
         self.api_service = APIService(
             url=panel.url,
-            token=panel.token if panel.token else ""
+            token=panel.token if panel.token else "",
+            panel_name=panel.name,
         )
 
-    async def get_all_users(self) -> Any:
+    async def list_clients(self) -> list[GuardSubscription]:
         try:
-            clients = await self.api_service.get_clients()
-
-            result = []
-
-            for client in clients:
-                result.append({
-                    "id": client["id"],
-                    "email": client["username"],
-                    "username": client["username"],
-                    "enable": client["is_active"],
-                    "isOnline": client["is_online"],
-                    "is_online": client["is_online"],
-                    "totalGB": client["limit_usage"],
-                    "usedData": client["current_usage"],
-                    "expiryTime": client["limit_expire"] *1000,
-                    "subId": client.get("link"),
-                })
-            return result
-
-        except Exception as e:
-            logger.error(
-                f"Error retrieving users for admin "
-                f"{self.admin_username}: {str(e)}"
-            )
-
-            return []
+            return await self.api_service.list_clients()
 
         except Exception as e:
             logger.error(
@@ -178,11 +153,11 @@ class AdminTaskService:
             id: str
         ) -> str | None:
         try:
-            clients = await self.get_all_users()
+            clients = await self.api_service.list_clients()
 
             for client in clients:
-                if client["id"] == int(id):
-                    return client["username"]
+                if client.id == int(id):
+                    return client.username
 
             return None
 
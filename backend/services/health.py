@@ -0,0 +1,171 @@
+import math
+import time
+import asyncio
+
+from backend.config import config
+from backend.db import crud
+from backend.db.engin import sessionLocal
+from backend.db.model import Panels
+from backend.services.circuit_breaker import get_breaker
+from backend.services.sanaei import APIService as sanaei_APIService
+from backend.services.tx_ui import APIService as txui_APIService
+from backend.services.marzban import APIService as marzban_APIService
+from backend.services.guard import APIService as guard_APIService
+from backend.utils.logger import logger
+from backend.utils.metrics import background_job_seconds
+from backend.utils.shared_state import get_state
+
+
+class LatencyStats:
+    """Rolling window of probe results for one panel.
+
+    The window lives in the shared state: one worker probes per round and
+    every worker reports the same numbers.
+    """
+
+    def __init__(self, panel_name: str, window: int = 120):
+        self.key = f"panel_health:{panel_name}"
+        self.window = window
+        data = get_state().get(self.key) or {}
+        self.samples: list[list] = data.get("samples", [])  # [latency, ok]
+        self.last_checked: float | None = data.get("last_checked")
+        self.last_ok: bool | None = data.get("last_ok")
+        # probes skipped while the circuit breaker was open, no latency to record
+        self.unreached: int = data.get("unreached", 0)
+
+    def _save(self) -> None:
+        get_state().set(
+            self.key,
+            {
+                "samples": self.samples[-self.window :],
+                "last_checked": self.last_checked,
+                "last_ok": self.last_ok,
+                "unreached": self.unreached,
+            },
+        )
+
+    def record(self, latency: float, ok: bool) -> None:
+        self.samples.append([latency, ok])
+        self.last_checked = time.time()
+        self.last_ok = ok
+        self._save()
+
+    def record_unreached(self) -> None:
+        self.unreached += 1
+        self.last_checked = time.time()
+        self.last_ok = False
+        self._save()
+
+    @staticmethod
+    def _percentile(values: list[float], percent: float) -> float:
+        index = math.ceil(percent / 100 * len(values)) - 1
+        return values[min(max(index, 0), len(values) - 1)]
+
+    def snapshot(self) -> dict:
+        if not self.samples:
+            return {
+                "healthy": self.last_ok,
+                "samples": 0,
+                "unreached": self.unreached,
+            }
+
+        latencies = sorted(latency for latency, _ in self.samples)
+        errors = sum(1 for _, ok in self.samples if not ok)
+        return {
+            "healthy": self.last_ok,
+            "samples": len(self.samples),
+            "unreached": self.unreached,
+            "error_rate": round(errors / len(self.samples), 3),
+            "p50_ms": round(self._percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(self._percentile(latencies, 95) * 1000, 1),
+            "p99_ms": round(self._percentile(latencies, 99) * 1000, 1),
+            "last_checked": self.last_checked,
+        }
+
+
+def forget_health(panel_name: str) -> None:
+    get_state().delete(f"panel_health:{panel_name}")
+
+
+def get_health(panel_name: str) -> dict:
+    stats = LatencyStats(panel_name)
+    if stats.last_checked is None:
+        return {"healthy": None, "samples": 0}
+    return stats.snapshot()
+
+
+def _api_service_for(panel: Panels):
+    if panel.panel_type == "3x-ui":
+        return sanaei_APIService(panel.url, panel.token or "", panel_name=panel.name)
+    if panel.panel_type == "guard":
+        return guard_APIService(panel.url, panel.token or "", panel_name=panel.name)
+    if panel.panel_type == "marzban":
+        return marzban_APIService(
+            panel.url, panel.username, panel.password, panel_name=panel.name
+        )
+    if panel.panel_type == "tx-ui":
+        return txui_APIService(
+            panel.url, panel.username, panel.password, panel_name=panel.name
+        )
+    return None
+
+
+async def probe_panel(panel: Panels) -> bool:
+    """Call the panel's cheapest status endpoint and record latency and outcome."""
+    api_service = _api_service_for(panel)
+    if api_service is None:
+        return False
+
+    stats = LatencyStats(panel.name)
+    # the call would fail fast without reaching the panel, and its ~0ms
+    # would pull the percentiles down while the panel is down
+    if get_breaker(panel.name).is_open():
+        await api_service.close()
+        stats.record_unreached()
+        return False
+
+    started = time.perf_counter()
+    try:
+        ok = bool(await api_service.test_connection())
+    except Exception:
+        ok = False
+    finally:
+        await api_service.close()
+
+    stats.record(time.perf_counter() - started, ok)
+    if not ok:
+        logger.warning(f"Health probe failed for panel {panel.name}")
+    return ok
+
+
+async def probe_all_panels() -> None:
+    db = sessionLocal()
+    try:
+        panels = [panel for panel in crud.get_all_panels(db) if panel.is_active]
+    finally:
+        db.close()
+
+    await asyncio.gather(*(probe_panel(panel) for panel in panels))
+
+
+def _claim_round() -> bool:
+    """Whether this worker probes the current round; the first to ask does."""
+    if config.WORKERS <= 1:
+        return True
+    interval = config.HEALTH_PROBE_INTERVAL
+    round_key = f"health_probe_round:{int(time.time() // interval)}"
+    return get_state().incr(round_key, ttl=interval * 2) == 1
+
+
+async def run_health_prober() -> None:
+    while True:
+        started = time.perf_counter()
+        try:
+            if _claim_round():
+                await probe_all_panels()
+                background_job_seconds.observe(
+                    time.perf_counter() - started, "health_probe"
+                )
+        except Exception as e:
+            logger.error(f"Health prober error: {str(e)}")
+        await asyncio.sleep(config.HEALTH_PROBE_INTERVAL)
@@ -1,27 +1,44 @@
-import time
 import json
-import requests
+from typing import AsyncIterator
 
 from backend.schema._input import ClientInput, ClientUpdateInput
-
-
+from backend.services.upstream import create_client, instrument
+from backend.services.retry import IDEMPOTENT, READ_ONLY
+from backend.services.decoders import (
+    MarzbanUser,
+    MarzbanUsersPage,
+    read_marzban_users_page,
+)
+from backend.utils.metrics import record_cache
+from backend.utils.shared_state import get_state
+
+
+@instrument("marzban")
 class APIService:
-    _username: str | None = None
-    _cached_token: str | None = None
-    _cached_url: str | None = None
-    _token_time: float | None = None
     _token_ttl = 300
+    page_size = 500
 
     def __init__(
-        self, url: str, username: str, password: str, inbounds: dict | str | None = None
+        self,
+        url: str,
+        username: str,
+        password: str,
+        inbounds: dict | str | None = None,
+        panel_name: str | None = None,
     ):
         self.url = url if url.endswith("/") else url + "/"
+        self.panel_name = panel_name
         self.username = username
         self.password = password
         self.token: str | None = None
-        self.session = requests.Session()
         self.headers: dict[str, str] | None = None
 
+        self.client = create_client(
+            base_url=self.url,
+            panel_name=panel_name,
+            headers={"Accept": "application/json"},
+        )
+
         if isinstance(inbounds, str):
             try:
                 self.inbounds = json.loads(inbounds)
@@ -30,96 +47,102 @@ class APIService:
         else:
             self.inbounds = inbounds or {}
 
-    async def _login(self):
-        now = time.time()
-
-        if (
-            APIService._username == self.username
-            and
-            APIService._cached_token
-            and APIService._cached_url == self.url
-            and APIService._token_time
-            and now - APIService._token_time < APIService._token_ttl
-        ):
-            self.token = APIService._cached_token
-            self.headers = {"Authorization": f"Bearer {self.token}"}
-            return
-
-        token = (
-            requests.post(
-                f"{self.url}api/admin/token",
-                data={
-                    "username": self.username,
-                    "password": self.password,
-                },
-            )
-            .json()
-            .get("access_token")
+    async def close(self):
+        await self.client.aclose()
+
+    async def _request_token(self) -> str | None:
+        response = await self.client.post(
+            "api/admin/token",
+            data={
+                "username": self.username,
+                "password": self.password,
+            },
+            extensions=READ_ONLY,
         )
+        return response.json().get("access_token")
+
+    async def _login(self, force: bool = False):
+        # tokens are shared between workers, a restart of one doesn't log in again
+        key = f"marzban_token:{self.url}:{self.username}"
+        token = None if force else get_state().get(key)
+
+        if token:
+            record_cache("marzban_token", True)
+        else:
+            record_cache("marzban_token", False)
+            token = await self._request_token()
+            get_state().set(key, token, ttl=APIService._token_ttl)
 
-        APIService._cached_token = token
-        APIService._cached_url = self.url
-        APIService._token_time = now
         self.token = token
         self.headers = {"Authorization": f"Bearer {self.token}"}
 
     async def test_connection(self) -> bool:
         try:
-            token = (
-                requests.post(
-                    f"{self.url}api/admin/token",
-                    data={
-                        "username": self.username,
-                        "password": self.password,
-                    },
-                )
-                .json()
-                .get("access_token")
-            )
+            token = await self._request_token()
             return True if token else False
         except Exception:
             return False
 
-    async def get_users(self):
+    async def get_users_page(
+        self,
+        offset: int = 0,
+        limit: int | None = None,
+        search: str | None = None,
+        status: str | None = None,
+        owner: str | None = None,
+    ) -> MarzbanUsersPage:
+        """Fetch one page of users, filtered upstream by marzban itself."""
         await self._login()
-        url = f"{self.url}api/users"
-        response = self.session.get(url, headers=self.headers).json()
-        return response
-
-    async def get_user(self, username: str) -> dict | bool:
-        token = (
-            requests.post(
-                f"{self.url}api/admin/token",
-                data={
-                    "username": self.username,
-                    "password": self.password,
-                },
+        params: dict = {"offset": offset}
+        if limit is not None:
+            params["limit"] = limit
+        if search:
+            params["search"] = search
+        if status:
+            params["status"] = status
+        if owner:
+            params["admin"] = owner
+
+        response = await self.client.get("api/users", params=params, headers=self.headers)
+        response.raise_for_status()
+        return await read_marzban_users_page(response.content)
+
+    async def iter_users(
+        self,
+        search: str | None = None,
+        status: str | None = None,
+        owner: str | None = None,
+    ) -> AsyncIterator[MarzbanUser]:
+        """Walk every matching user one upstream page at a time."""
+        offset = 0
+        while True:
+            page = await self.get_users_page(
+                offset=offset,
+                limit=self.page_size,
+                search=search,
+                status=status,
+                owner=owner,
             )
-            .json()
-            .get("access_token")
-        )
+            for user in page.users:
+                yield user
 
-        user = requests.get(
-            f"{self.url}api/user/{username}",
-            headers={"Authorization": f"Bearer {token}"},
-        ).json()
-        return user
+            offset += len(page.users)
+            if len(page.users) < self.page_size or (
+                page.total is not None and offset >= page.total
+            ):
+                return
 
-    async def get_inbounds(self) -> dict:
-        token = (
-            requests.post(
-                f"{self.url}api/admin/token",
-                data={
-                    "username": self.username,
-                    "password": self.password,
-                },
-            )
-            .json()
-            .get("access_token")
-        )
-        url = f"{self.url}api/inbounds"
+    async def get_users(self) -> list[MarzbanUser]:
+        return [user async for user in self.iter_users()]
 
-        response = self.session.get(url, headers={"Authorization": f"Bearer {token}"})
+    async def get_user(self, username: str) -> dict | bool:
+        await self._login()
+        response = await self.client.get(f"api/user/{username}", headers=self.headers)
+        return response.json()
+
+    async def get_inbounds(self) -> dict:
+        await self._login()
+        response = await self.client.get("api/inbounds", headers=self.headers)
 
         # Transform to list of tags for each protocol
         inbounds = response.json()
@@ -153,8 +176,8 @@ class APIService:
             },
         }
 
-        response = self.session.post(
-            f"{self.url}api/user",
+        response = await self.client.post(
+            "api/user",
             headers=self.headers,
             json=data,
         )
@@ -175,25 +198,27 @@ class APIService:
             "note": "",
         }
 
-        response = self.session.put(
-            f"{self.url}api/user/{username}",
+        response = await self.client.put(
+            f"api/user/{username}",
             headers=self.headers,
             json=update_data,
+            extensions=IDEMPOTENT,
         )
         return response.status_code
 
     async def reset_user_traffic(self, username: str) -> int:
         await self._login()
-        response = self.session.post(
-            f"{self.url}api/user/{username}/reset",
+        response = await self.client.post(
+            f"api/user/{username}/reset",
             headers=self.headers,
+            extensions=IDEMPOTENT,
         )
         return response.status_code
 
     async def delete_user(self, username: str) -> int:
         await self._login()
-        response = self.session.delete(
-            f"{self.url}api/user/{username}",
+        response = await self.client.delete(
+            f"api/user/{username}",
             headers=self.headers,
         )
         return response.status_code
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 
 from backend.schema._input import ClientInput, ClientUpdateInput
 from backend.services.marzban import APIService
+from backend.services.decoders import MarzbanUser
 from backend.db import crud
 from backend.utils.logger import logger
 
@@ -17,27 +18,81 @@ class AdminTaskService:
             username=self.admin_username,
             password=self.admin.marzban_password,
             inbounds=self.admin.marzban_inbounds,
+            panel_name=self.panel.name,
         )
         self.api_service_for_main_tasks = APIService(
             url=self.panel.url,
             username=self.panel.username,
             password=self.panel.password,
+            panel_name=self.panel.name,
         )
 
     async def get_all_users(self):
         try:
-            users = await self.api_service.get_users()
-            user_list = users.get("users", []) if isinstance(users, dict) else users
-            return user_list
+            return await self.api_service.get_users()
         except Exception as e:
             logger.error(
                 f"Error retrieving users for admin {self.admin_username}: {str(e)}"
             )
             raise e
 
+    async def get_users_page(
+        self,
+        offset: int = 0,
+        limit: int | None = None,
+        search: str | None = None,
+        status: str | None = None,
+    ) -> tuple[list[MarzbanUser], int]:
+        try:
+            page = await self.api_service.get_users_page(
+                offset=offset,
+                limit=limit,
+                search=search,
+                status=status,
+                owner=self.admin_username,
+            )
+            total = page.total if page.total is not None else len(page.users)
+            return page.users, total
+        except Exception as e:
+            logger.error(
+                f"Error retrieving users page for admin {self.admin_username}: {str(e)}"
+            )
+            raise e
+
+    def iter_users(self, search: str | None = None, status: str | None = None):
+        return self.api_service.iter_users(
+            search=search, status=status, owner=self.admin_username
+        )
+
+    async def get_users_by_status(self, status: str) -> list[MarzbanUser]:
+        try:
+            return [user async for user in self.iter_users(status=status)]
+        except Exception as e:
+            logger.error(
+                f"Error retrieving {status} users for admin {self.admin_username}: {str(e)}"
+            )
+            return []
+
+    async def get_expired_users(self) -> list[MarzbanUser]:
+        return await self.get_users_by_status("expired")
+
+    async def get_limited_users(self) -> list[MarzbanUser]:
+        return await self.get_users_by_status("limited")
+
+    async def get_on_hold_users(self) -> list[MarzbanUser]:
+        return await self.get_users_by_status("on_hold")
+
     async def get_user_by_username(self, username: str) -> dict | bool:
         try:
             user = await self.api_service_for_main_tasks.get_user(username)
+            if not isinstance(user, dict) or "username" not in user:
+                return False
+            owner = user.get("admin") if isinstance(user, dict) else None
+            if isinstance(owner, dict) and owner.get("username") != self.admin_username:
+                logger.warning(
+                    f"Admin {self.admin_username} requested user {username} owned by {owner.get('username')}"
+                )
+                return False
             return user
         except Exception as e:
             logger.error(f"Error retrieving user by username {username}: {str(e)}")
@@ -0,0 +1,83 @@
+import time
+import random
+import httpx
+
+from backend.config import config
+
+
+# Pass as ``extensions=`` on upstream calls that are safe to repeat
+IDEMPOTENT = {"idempotent": True}
+# ... and on POSTs that only log in or read, so they don't count as writes
+READ_ONLY = {"idempotent": True, "read_only": True}
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+RETRYABLE_STATUS = {502, 503, 504}
+
+# The request never reached the panel, so even a create can be resent
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+TRANSIENT_ERRORS = NOT_SENT_ERRORS + (
+    httpx.ReadTimeout,
+    httpx.WriteTimeout,
+    httpx.RemoteProtocolError,
+    httpx.ReadError,
+)
+
+
+def is_idempotent(request: httpx.Request) -> bool:
+    return request.extensions.get("idempotent", request.method in SAFE_METHODS)
+
+
+def is_write(request: httpx.Request) -> bool:
+    return request.method not in SAFE_METHODS and not request.extensions.get("read_only")
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, bounded by an attempt count and a total deadline."""
+
+    def __init__(
+        self,
+        attempts: int | None = None,
+        base_delay: float | None = None,
+        max_delay: float | None = None,
+        deadline: float | None = None,
+    ):
+        self.attempts = attempts or config.UPSTREAM_RETRY_ATTEMPTS
+        self.base_delay = base_delay or config.UPSTREAM_RETRY_BASE_DELAY
+        self.max_delay = max_delay or config.UPSTREAM_RETRY_MAX_DELAY
+        self.deadline = deadline or config.UPSTREAM_RETRY_DEADLINE
+
+    def should_retry_error(self, error: Exception, idempotent: bool) -> bool:
+        if isinstance(error, NOT_SENT_ERRORS):
+            return True
+        return idempotent and isinstance(error, TRANSIENT_ERRORS)
+
+    def should_retry_status(self, status_code: int, idempotent: bool) -> bool:
+        return idempotent and status_code in RETRYABLE_STATUS
+
+    def next_delay(self, attempt: int, started: float) -> float | None:
+        """Delay before the next attempt, or None once attempts or deadline run out."""
+        if attempt + 1 >= self.attempts:
+            return None
+
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+        if time.monotonic() - started + delay >= self.deadline:
+            return None
+        return delay
+
+
+_retry_stats: dict[str, dict[str, int]] = {}
+
+
+def record_retry(panel_name: str | None, exhausted: bool = False) -> None:
+    if panel_name is None:
+        return
+    stats = _retry_stats.setdefault(panel_name, {"retries": 0, "exhausted": 0})
+    stats["exhausted" if exhausted else "retries"] += 1
+
+
+def get_retry_stats(panel_name: str) -> dict[str, int]:
+    return dict(_retry_stats.get(panel_name, {"retries": 0, "exhausted": 0}))
+
+
+def drop_retry_stats(panel_name: str) -> None:
+    _retry_stats.pop(panel_name, None)
@@ -1,22 +1,26 @@
 import json
-import httpx
 
 from backend.schema._input import ClientInput, ClientUpdateInput
+from backend.services.upstream import create_client, instrument
+from backend.services.retry import IDEMPOTENT, READ_ONLY
+from backend.services.decoders import SanaeiClient, read_sanaei_clients
 
 
+@instrument("3x-ui")
 class APIService:
-    def __init__(self, url: str, token: str):
+    def __init__(self, url: str, token: str, panel_name: str | None = None):
         self.url = url.rstrip("/")
+        self.panel_name = panel_name
         self.token = token
 
-        self.client = httpx.AsyncClient(
+        self.client = create_client(
             base_url=self.url,
+            panel_name=panel_name,
             headers={
                 "Authorization": f"Bearer {self.token}",
                 "Accept": "application/json",
                 "Content-Type": "application/json",
             },
-            timeout=30.0,
         )
 
     async def test_connection(self) -> bool:
@@ -35,20 +39,19 @@ class APIService:
         except Exception:
             return False
 
-    async def get_clients(self):
+    async def list_clients(self) -> list[SanaeiClient]:
         response = await self.client.get(
             "/panel/api/clients/list"
         )
 
         response.raise_for_status()
 
-        data = response.json()
-
-        return data.get("obj", [])
+        return await read_sanaei_clients(response.content)
 
     async def get_all_online_clients(self):
         response = await self.client.post(
-            "/panel/api/clients/lastOnline"
+            "/panel/api/clients/lastOnline",
+            extensions=READ_ONLY,
         )
 
         response.raise_for_status()
@@ -115,6 +118,7 @@ class APIService:
         response = await self.client.post(
             f"/panel/api/clients/update/{client.email}",
             json=payload,
+            extensions=IDEMPOTENT,
         )
 
 
@@ -128,7 +132,8 @@ class APIService:
     ):
 
         response = await self.client.post(
-            f"/panel/api/clients/resetTraffic/{email}"
+            f"/panel/api/clients/resetTraffic/{email}",
+            extensions=IDEMPOTENT,
         )
 
         response.raise_for_status()
@@ -1,11 +1,11 @@
 import json
 import time
-from typing import Any
 
 from sqlalchemy.orm import Session
 
 from backend.schema._input import ClientInput, ClientUpdateInput
 from backend.services.sanaei import APIService
+from backend.services.decoders import SanaeiClient
 from backend.db import crud
 from backend.utils.logger import logger
 
@@ -27,33 +27,24 @@ class AdminTaskService:
 
         self.api_service = APIService(
             url=panel.url,
-            token=panel.token if panel.token else ""
+            token=panel.token if panel.token else "",
+            panel_name=panel.name,
         )
 
-    async def get_all_users(self) -> Any:
+    async def list_clients(self) -> list[SanaeiClient]:
         try:
-            clients = await self.api_service.get_clients()
+            clients = await self.api_service.list_clients()
 
             online_clients = (
                 await self.api_service.get_all_online_clients()
             )
             now = int(time.time() * 1000)
 
-            result = []
-
             for client in clients:
-                email = client.get("email")
-
-                last_seen = online_clients.get(email, 0)
-
-                client["isOnline"] = (
-                last_seen > 0
-                and now - last_seen < 120000
-                )
-
-                result.append(client)
+                last_seen = online_clients.get(client.email, 0)
+                client.is_online = last_seen > 0 and now - last_seen < 120000
 
-            return result
+            return clients
 
         except Exception as e:
             logger.error(
@@ -179,11 +170,11 @@ class AdminTaskService:
         uuid: str
     ) -> str | None:
         try:
-            clients = await self.get_all_users()
+            clients = await self.api_service.list_clients()
 
             for client in clients:
-                if client.get("uuid") == uuid:
-                    return client.get("email")
+                if client.uuid == uuid:
+                    return client.email
 
             return None
 
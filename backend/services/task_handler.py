@@ -1,6 +1,8 @@
+import inspect
+import functools
+
 from sqlalchemy.orm import Session
 from fastapi import status
-from fastapi.responses import JSONResponse
 
 from .limit_handler import AdminLimiter
 from .sanaei import AdminTaskService as SanaeiAdminTaskService
@@ -13,10 +15,78 @@ from backend.services.sanaei import APIService as sanaei_APIService
 from backend.services.tx_ui import APIService as txui_APIService
 from backend.services.marzban import APIService as marzban_APIService
 from backend.services.guard import APIService as guard_APIService
+from backend.services.circuit_breaker import get_breaker, PanelUnavailableError
+from backend.services.upstream import track_panel_writes
+from backend.services.user_store import (
+    UserStore,
+    build_guard_store,
+    build_marzban_store,
+    build_sanaei_store,
+    build_txui_store,
+    cached_store_digest,
+    cache_store,
+    drop_cached_store,
+    get_cached_store,
+    invalidate_user_store,
+    store_generation,
+)
+from backend.services.data_version import (
+    admin_key,
+    bump_data_version,
+    data_version,
+    make_etag,
+)
 from backend.db import crud
 from backend.utils.logger import logger
-
-
+from backend.utils.tracing import traced
+from backend.utils.responses import FastJSONResponse
+
+
+def _panel_unavailable(panel) -> FastJSONResponse | None:
+    """Fail fast with 503 while the panel's circuit breaker is open."""
+    breaker = get_breaker(panel.name)
+    if not breaker.is_open():
+        return None
+
+    error = PanelUnavailableError(panel.name, breaker.retry_after())
+    logger.warning(f"Skipping request to unavailable panel: {error}")
+    return FastJSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": str(int(error.retry_after) + 1)},
+        content={
+            "success": False,
+            "message": str(error),
+        },
+    )
+
+
+def _invalidates_user_data(func):
+    """Drop the user store cache of every panel the mutation wrote to and move
+    the admin's data version.
+
+    Rejections that never reach the panel (panel not found, breaker open,
+    inactive admin, traffic limit) leave the caches alone.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with track_panel_writes() as written:
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                for panel_name in written:
+                    invalidate_user_store(panel_name)
+                if written:
+                    admin_username = signature.bind(*args, **kwargs).arguments[
+                        "admin_username"
+                    ]
+                    bump_data_version(admin_key(admin_username))
+
+    return wrapper
+
+
+@traced("task.create_new_panel")
 async def create_new_panel(db: Session, panel_input: PanelInput) -> bool:
     if panel_input.panel_type == "3x-ui":
         try:
@@ -91,6 +161,7 @@ async def create_new_panel(db: Session, panel_input: PanelInput) -> bool:
             return False
 
 
+@traced("task.update_a_panel")
 async def update_a_panel(db: Session, panel_input: PanelInput) -> bool:
     if panel_input.panel_type == "3x-ui":
         try:
@@ -181,10 +252,122 @@ async def update_a_panel(db: Session, panel_input: PanelInput) -> bool:
             return False
 
 
+async def _load_user_store(panel, admin, db: Session) -> UserStore:
+    """The admin's view of the panel as a columnar store, from cache while fresh.
+
+    3x-ui and guard stores hold the whole panel with an owner column, tx-ui
+    stores one inbound and marzban stores the admin's own users.
+    """
+    scope = _store_scope(panel, admin)
+    store = get_cached_store(panel.name, scope)
+    if store is not None:
+        return store
+
+    generation = store_generation(panel.name)
+    if panel.panel_type == "guard":
+        admin_task = GuardAdminTaskService(admin_username=admin.username, db=db)
+        owners = {row.username: row.owner for row in crud.get_user_from_guard_table(db)}
+        store = build_guard_store(await admin_task.list_clients(), owners)
+
+    elif panel.panel_type == "3x-ui":
+        admin_task = SanaeiAdminTaskService(admin_username=admin.username, db=db)
+        owners = {
+            row.username: row.owner
+            for row in crud.get_all_users_from_sanaei_table(db)
+        }
+        store = build_sanaei_store(await admin_task.list_clients(), owners)
+
+    elif panel.panel_type == "tx-ui":
+        admin_task = TxUIAdminTaskService(admin_username=admin.username, db=db)
+        store = build_txui_store(await admin_task.list_clients())
+
+    elif panel.panel_type == "marzban":
+        admin_task = MarzbanAdminTaskService(admin_username=admin.username, db=db)
+        store = build_marzban_store(await admin_task.get_all_users())
+
+    else:
+        return UserStore()
+
+    # an empty listing is usually a failed fetch, so it is never cached, and
+    # the older store no longer describes what this request returns
+    if len(store):
+        cache_store(panel.name, scope, store, generation)
+    else:
+        drop_cached_store(panel.name, scope)
+    return store
+
+
+def _store_scope(panel, admin) -> str:
+    return {"tx-ui": str(admin.inbound_id), "marzban": admin.username}.get(
+        panel.panel_type, ""
+    )
+
+
+def users_etag(
+    admin_username: str, db: Session, query: str = "", within_ttl: bool = True
+) -> str | None:
+    """ETag for a response built from the admin's cached user store.
+
+    It is derived from the data (the data versions and the store's digest), so
+    a refetch of unchanged users, on any worker, keeps the same ETag. Before
+    the payload is built, pass ``within_ttl=True`` so only a fresh store can
+    answer 304; once it is built, ``within_ttl=False`` tags it from the store
+    just cached. None when no store is cached and for filtered marzban
+    requests, which are paged upstream.
+    """
+    _admin = crud.get_admin_by_username(db, admin_username)
+    panel = crud.get_panel_by_name(db, _admin.panel) if _admin else None
+    if not panel or (panel.panel_type == "marzban" and query):
+        return None
+    if get_breaker(panel.name).is_open():
+        return None
+
+    digest = cached_store_digest(panel.name, _store_scope(panel, _admin), within_ttl)
+    if digest is None:
+        return None
+    return make_etag(
+        admin_username,
+        data_version(admin_key(admin_username)),
+        data_version(),
+        digest,
+        query,
+    )
+
+
+def _select_users(
+    store: UserStore,
+    panel,
+    admin_username: str,
+    search: str | None = None,
+    user_status: str | None = None,
+) -> list[int]:
+    """Rows of the store the admin may see, narrowed by search and status."""
+    if panel.panel_type in ("3x-ui", "guard"):
+        rows = store.owned_by(admin_username)
+    else:
+        rows = store.all()
+
+    if search:
+        rows = store.search(search, rows)
+    if user_status:
+        rows = store.with_status(user_status, rows)
+    return rows
+
+
+@traced("task.get_all_users_from_panel")
 async def get_all_users_from_panel(
-    admin_username: str, db: Session
+    admin_username: str,
+    db: Session,
+    offset: int = 0,
+    limit: int | None = None,
+    search: str | None = None,
+    user_status: str | None = None,
 ) -> tuple[ResponseModel, list[ClientsOutput]]:
-    """This function retrieves all users from the panel associated with the given admin."""
+    """This function retrieves all users from the panel associated with the given admin.
+
+    Filtered marzban requests are paged upstream; everything else is served
+    from the panel's user store.
+    """
 
     _admin = crud.get_admin_by_username(db, admin_username)
     panel = crud.get_panel_by_name(db, _admin.panel)
@@ -198,129 +381,25 @@ async def get_all_users_from_panel(
             [],
         )
 
-    if panel.panel_type == "guard":
-        admin_task = GuardAdminTaskService(admin_username=admin_username, db=db)
-        _clients = await admin_task.get_all_users()
-
-        if _clients is None:
-            return JSONResponse(
-                status_code=status.HTTP_404_NOT_FOUND,
-                content={
-                    "success": False,
-                    "message": "No users found",
-                },
-            )
-        clients = [] 
-
-        for client in _clients:
-            clients.append(
-                ClientsOutput(
-                    id=client.get("id"),
-                    uuid=str(client.get("id")),
-                    sub_id=client.get("subId").split("/")[-1] if client.get("subId") else None,
-                    username=client.get("email"),
-                    status=client.get("enable"),
-                    is_online=client.get("is_online"),
-                    data_limit=client.get("totalGB"),
-                    used_data=client.get("usedData"),
-                    expiry_date_unix=client.get("expiryTime")
-                )
-            )
-        
-        admin_users = crud.get_user_from_guard_table(db)
-        allowed_usernames = {
-            user.username for user in admin_users if user.owner == admin_username
-        }
-
-        filtered_clients = [c for c in clients if c.username in allowed_usernames]
-
-        return (
-            ResponseModel(
-                success=True,
-                message="Users retrieved successfully", 
-                data=filtered_clients,
-            ),
-            filtered_clients,
-        )
-        
-
-
-    if panel.panel_type == "3x-ui":
-        admin_task = SanaeiAdminTaskService(admin_username=admin_username, db=db)
-        _clients = await admin_task.get_all_users()
-
-        if _clients is None:
-            return JSONResponse(
-                status_code=status.HTTP_404_NOT_FOUND,
-                content={
-                    "success": False,
-                    "message": "No users found",
-                },
-            )
-        clients = []
-        for client in _clients:
-            clients.append(
-                ClientsOutput(
-                    id=client.get("id"),
-                    uuid=client.get("uuid"),
-                    username=client.get("email"),
-                    status=client.get("enable"),
-                    is_online=client.get("isOnline"),
-                    data_limit=client.get("totalGB"),
-                    used_data=(
-                        client.get("traffic", {}).get("up", 0)
-                        + client.get("traffic", {}).get("down", 0)
-                    ),
-                    expiry_date=None,
-                    expiry_date_unix=client.get("expiryTime"),
-                    sub_id=client.get("subId"),
-                    flow=client.get("flow"),
-                )
-            )
-
-        admin_users = crud.get_all_users_from_sanaei_table(db)
-        allowed_usernames = {
-            user.username for user in admin_users if user.owner == admin_username
-        }
-
-        filtered_clients = [c for c in clients if c.username in allowed_usernames]
-
+    breaker = get_breaker(panel.name)
+    if breaker.is_open():
         return (
             ResponseModel(
-                success=True,
-                message="Users retrieved successfully",
-                data=filtered_clients,
+                success=False,
+                message=str(PanelUnavailableError(panel.name, breaker.retry_after())),
             ),
-            filtered_clients,
+            [],
         )
 
-    elif panel.panel_type == "marzban":
+    if panel.panel_type == "marzban" and (
+        offset or limit is not None or search or user_status
+    ):
         admin_task = MarzbanAdminTaskService(admin_username=admin_username, db=db)
-        _users = await admin_task.get_all_users()
-
-        if _users is None:
-            return JSONResponse(
-                status_code=status.HTTP_404_NOT_FOUND,
-                content={
-                    "success": False,
-                    "message": "No users found",
-                },
-            )
-
-        users = []
-        for user in _users:
-            expire_val = user.get("expire")
-            users.append(
-                ClientsOutput(
-                    username=user.get("username"),
-                    status=True if user.get("status") == "active" else False,
-                    is_online=False,
-                    data_limit=user.get("data_limit") or 0,
-                    used_data=user.get("used_traffic") or 0,
-                    expiry_date_unix=expire_val * 1000 if expire_val else None,
-                    sub_id=user.get("subscription_url"),
-                )
-            )
+        _users, _ = await admin_task.get_users_page(
+            offset=offset, limit=limit, search=search, status=user_status
+        )
+        page = build_marzban_store(_users)
+        users = page.rows(page.all())
         return (
             ResponseModel(
                 success=True,
@@ -330,58 +409,51 @@ async def get_all_users_from_panel(
             users,
         )
 
-    elif panel.panel_type == "tx-ui":
-        admin_task = TxUIAdminTaskService(admin_username=admin_username, db=db)
-        _clients = await admin_task.get_all_users()
+    store = await _load_user_store(panel, _admin, db)
+    rows = _select_users(store, panel, admin_username, search, user_status)
+    if offset or limit is not None:
+        end = offset + limit if limit is not None else None
+        rows = rows[offset:end]
 
-        if _clients is None:
-            return JSONResponse(
-                status_code=status.HTTP_404_NOT_FOUND,
-                content={
-                    "success": False,
-                    "message": "No users found",
-                },
-            )
-        clients = []
-        for client in _clients:
-            up = client.get("up", 0) or 0
-            down = client.get("down", 0) or 0
-
-            clients.append(
-                ClientsOutput(
-                    id=client.get("id"),
-                    uuid=client.get("id"),
-                    username=client.get("email"),
-                    status=client.get("enable", False),
-                    is_online=client.get("is_online", False),
-                    data_limit=client.get("totalGB", 0),
-                    used_data=up + down,
-                    expiry_date=None,
-                    expiry_date_unix=client.get("expiryTime", 0),
-                    sub_id=client.get("subId"),
-                    flow=client.get("flow"),
-                )
-            )
-        return (
-            ResponseModel(
-                success=True,
-                message="Users retrieved successfully",
-                data=clients,
-            ),
-            clients,
-        )
+    clients = store.rows(rows)
+    return (
+        ResponseModel(
+            success=True,
+            message="Users retrieved successfully",
+            data=clients,
+        ),
+        clients,
+    )
+
+
+@traced("task.get_users_overview")
+async def get_users_overview(
+    admin_username: str, db: Session
+) -> tuple[list[ClientsOutput], dict | None]:
+    """All of the admin's users plus counts and totals for the dashboard."""
 
+    _admin = crud.get_admin_by_username(db, admin_username)
+    panel = crud.get_panel_by_name(db, _admin.panel)
+    if not panel or get_breaker(panel.name).is_open():
+        return [], None
+
+    store = await _load_user_store(panel, _admin, db)
+    rows = _select_users(store, panel, admin_username)
+    return store.rows(rows), store.summary(rows)
 
+
+@traced("task.add_new_user")
+@_invalidates_user_data
 async def add_new_user(
     admin_username: str, user_input: ClientInput, db: Session
-) -> JSONResponse:
+) -> FastJSONResponse:
     """This function adds a new user to the panel associated with the given admin."""
 
     _admin = crud.get_admin_by_username(db, admin_username)
     panel = crud.get_panel_by_name(db, _admin.panel)
     
     if not panel:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
             content={
                 "success": False,
@@ -389,12 +461,16 @@ async def add_new_user(
             },
         )
     
+    unavailable = _panel_unavailable(panel)
+    if unavailable:
+        return unavailable
+
     admin_check = AdminLimiter(admin_username=admin_username, db=db)
 
     if panel.panel_type == "guard":
         if not admin_check.admin_is_active():
             logger.warning(f"Inactive admin attempted to add user: {admin_username}")
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
@@ -405,7 +481,7 @@ async def add_new_user(
             logger.warning(
                 f"Admin {admin_username} exceeded traffic limit when adding user: {user_input.email}"
             )
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
@@ -418,7 +494,7 @@ async def add_new_user(
         success = await admin_task.add_client_to_panel(user_input)
 
         if not success:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 content={
                     "success": False,
@@ -436,7 +512,7 @@ async def add_new_user(
     if panel.panel_type == "3x-ui":
         if not admin_check.admin_is_active():
             logger.warning(f"Inactive admin attempted to add user: {admin_username}")
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
@@ -447,7 +523,7 @@ async def add_new_user(
             logger.warning(
                 f"Admin {admin_username} exceeded traffic limit when adding user: {user_input.email}"
             )
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
@@ -462,7 +538,7 @@ async def add_new_user(
             logger.warning(
                 f"Attempt to add user with duplicate email: {user_input.email} by admin: {admin_username}"
             )
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_409_CONFLICT,
                 content={
                     "success": False,
@@ -473,7 +549,7 @@ async def add_new_user(
         success = await admin_task.add_client_to_panel(user_input)
 
         if not success:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 content={
                     "success": False,
@@ -491,7 +567,7 @@ async def add_new_user(
     if panel.panel_type == "marzban":
         if not admin_check.admin_is_active():
             logger.warning(f"Inactive admin attempted to add user: {admin_username}")
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
@@ -502,7 +578,7 @@ async def add_new_user(
             logger.warning(
                 f"Admin {admin_username} exceeded traffic limit when adding user: {user_input.email}"
             )
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
@@ -514,7 +590,7 @@ async def add_new_user(
         success = await admin_task.add_user_to_panel(user_input)
 
         if not success:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 content={
                     "success": False,
@@ -530,7 +606,7 @@ async def add_new_user(
     if panel.panel_type == "tx-ui":
         if not admin_check.admin_is_active():
             logger.warning(f"Inactive admin attempted to add user: {admin_username}")
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
@@ -541,7 +617,7 @@ async def add_new_user(
             logger.warning(
                 f"Admin {admin_username} exceeded traffic limit when adding user: {user_input.email}"
             )
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
@@ -556,7 +632,7 @@ async def add_new_user(
             logger.warning(
                 f"Attempt to add user with duplicate email: {user_input.email} by admin: {admin_username}"
             )
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_409_CONFLICT,
                 content={
                     "success": False,
@@ -567,7 +643,7 @@ async def add_new_user(
         success = await admin_task.add_client_to_panel(user_input)
 
         if not success:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 content={
                     "success": False,
@@ -581,16 +657,18 @@ async def add_new_user(
         )
 
 
+@traced("task.update_a_user")
+@_invalidates_user_data
 async def update_a_user(
     admin_username: str, uuid: str, user_input: ClientUpdateInput, db: Session
-) -> JSONResponse:
+) -> FastJSONResponse:
     """This function updates an existing user in the panel associated with the given admin."""
 
     _admin = crud.get_admin_by_username(db, admin_username)
     panel = crud.get_panel_by_name(db, _admin.panel)
     
     if not panel:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
             content={
                 "success": False,
@@ -598,12 +676,16 @@ async def update_a_user(
             },
         )
     
+    unavailable = _panel_unavailable(panel)
+    if unavailable:
+        return unavailable
+
     admin_check = AdminLimiter(admin_username=admin_username, db=db)
 
     if panel.panel_type == "guard":
         if not admin_check.admin_is_active():
             logger.warning(f"Inactive admin attempted to update user: {admin_username}")
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
@@ -614,7 +696,7 @@ async def update_a_user(
             logger.warning(
                 f"Admin {admin_username} exceeded traffic limit when updating user: {user_input.email}"
             )
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
@@ -623,11 +705,11 @@ async def update_a_user(
             )
 
         admin_task = GuardAdminTaskService(admin_username=admin_username, db=db)
-        clients = await admin_task.get_all_users()
-        user_info = next((client for client in clients if client.get("id") == int(uuid)), None)
+        clients = await admin_task.list_clients()
+        user_info = next((client for client in clients if client.id == int(uuid)), None)
 
         if not user_info:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
                 content={
                     "success": False,
@@ -636,15 +718,15 @@ async def update_a_user(
             )
 
         extra_traffic = (
-            user_input.total - user_info.get("totalGB", 0)
-            if user_input.total > user_info.get("totalGB", 0)
+            user_input.total - (user_info.limit_usage or 0)
+            if user_input.total > (user_info.limit_usage or 0)
             else 0
         )
 
-        update_user = await admin_task.update_client_in_panel(user_info.get("username"), user_input)
+        update_user = await admin_task.update_client_in_panel(user_info.username, user_input)
 
         if not update_user:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 content={
                     "success": False,
@@ -653,7 +735,7 @@ async def update_a_user(
             )
 
         admin_check.reduce_usage(user_input.total, extra_traffic)
-        increase_traffic = user_info.get("totalGB", 0) - user_input.total 
+        increase_traffic = (user_info.limit_usage or 0) - user_input.total 
         admin_check.increase_usage(increase_traffic if increase_traffic > 0 else 0)
         
         return ResponseModel(
@@ -664,7 +746,7 @@ async def update_a_user(
     if panel.panel_type == "3x-ui":
         if not admin_check.admin_is_active():
             logger.warning(f"Inactive admin attempted to update user: {admin_username}")
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
@@ -675,7 +757,7 @@ async def update_a_user(
             logger.warning(
                 f"Admin {admin_username} exceeded traffic limit when updating user: {uuid}"
             )
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
@@ -684,11 +766,11 @@ async def update_a_user(
             )
 
         admin_task = SanaeiAdminTaskService(admin_username=admin_username, db=db)
-        all_users = await admin_task.get_all_users()
-        user_info = next((user for user in all_users if user.get("email") == user_input.email), None)
+        all_users = await admin_task.list_clients()
+        user_info = next((user for user in all_users if user.email == user_input.email), None)
 
         if not user_info:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
                 content={
                     "success": False,
@@ -701,7 +783,7 @@ async def update_a_user(
         update_user = await admin_task.update_client_in_panel(uuid, user_input)
 
         if not update_user:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 content={
                     "success": False,
@@ -710,12 +792,12 @@ async def update_a_user(
             )
 
         extra_traffic = (
-            user_input.total - user_info.get("totalGB", 0)
-            if user_input.total > user_info.get("totalGB", 0)
+            user_input.total - (user_info.total_gb or 0)
+            if user_input.total > (user_info.total_gb or 0)
             else 0
         )
         admin_check.reduce_usage(user_input.total, extra_traffic)
-        increase_traffic = user_info.get("totalGB", 0) - user_input.total 
+        increase_traffic = (user_info.total_gb or 0) - user_input.total 
         admin_check.increase_usage(increase_traffic if increase_traffic > 0 else 0)
         
 
@@ -727,7 +809,7 @@ async def update_a_user(
     if panel.panel_type == "marzban":
         if not admin_check.admin_is_active():
             logger.warning(f"Inactive admin attempted to update user: {admin_username}")
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
@@ -738,7 +820,7 @@ async def update_a_user(
             logger.warning(
                 f"Admin {admin_username} exceeded traffic limit when updating user: {user_input.email}"
             )
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
@@ -749,7 +831,7 @@ async def update_a_user(
         user_info = await admin_task.get_user_by_username(user_input.email)
 
         if not user_info:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
                 content={
                     "success": False,
@@ -769,7 +851,7 @@ async def update_a_user(
         )
 
         if not update_user:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 content={
                     "success": False,
@@ -786,7 +868,7 @@ async def update_a_user(
     elif panel.panel_type == "tx-ui":
         if not admin_check.admin_is_active():
             logger.warning(f"Inactive admin attempted to update user: {admin_username}")
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
@@ -797,7 +879,7 @@ async def update_a_user(
             logger.warning(
                 f"Admin {admin_username} exceeded traffic limit when updating user: {user_input.email}"
             )
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
@@ -805,22 +887,22 @@ async def update_a_user(
                 },
             )
         admin_task = TxUIAdminTaskService(admin_username=admin_username, db=db)
-        users = await admin_task.get_all_users()
+        users = await admin_task.list_clients()
         for user in users:
-            if user.get("id") == uuid:
+            if user.id == uuid:
                 user_info = user
                 break
 
         extra_traffic = (
-            user_input.total - user_info.get("totalGB", 0)
-            if user_input.total > user_info.get("totalGB", 0)
+            user_input.total - (user_info.total_gb or 0)
+            if user_input.total > (user_info.total_gb or 0)
             else 0
         )
 
         update_user = await admin_task.update_client_in_panel(uuid, user_input)
 
         if not update_user:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 content={
                     "success": False,
@@ -835,21 +917,27 @@ async def update_a_user(
         )
 
 
+@traced("task.reset_a_user_usage")
+@_invalidates_user_data
 async def reset_a_user_usage(
     admin_username: str, email: str, db: Session
-) -> JSONResponse:
+) -> FastJSONResponse:
     """This function resets a user's usage statistics in the panel associated with the given admin."""
 
     _admin = crud.get_admin_by_username(db, admin_username)
     panel = crud.get_panel_by_name(db, _admin.panel)    
     if not panel:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
             content={
                 "success": False,
                 "message": "Panel not found",
             },
         )
+    unavailable = _panel_unavailable(panel)
+    if unavailable:
+        return unavailable
+
     admin_check = AdminLimiter(admin_username=admin_username, db=db)
 
     if panel.panel_type == "guard":
@@ -857,7 +945,7 @@ async def reset_a_user_usage(
             logger.warning(
                 f"Inactive admin attempted to reset user usage: {admin_username}"
             )
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
@@ -866,17 +954,17 @@ async def reset_a_user_usage(
             )
 
         admin_task = GuardAdminTaskService(admin_username=admin_username, db=db)
-        clients = await admin_task.get_all_users()
+        clients = await admin_task.list_clients()
         user_info = next(
             (
                 client for client in clients
-                if client.get("username") == email
+                if client.username == email
             ),
             None
         )
 
         if not user_info:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
                 content={
                     "success": False,
@@ -884,26 +972,26 @@ async def reset_a_user_usage(
                 },
             )
 
-        if not admin_check.check_traffic_limit(user_info.get("totalGB", 0)):
-            return JSONResponse(
+        if not admin_check.check_traffic_limit(user_info.limit_usage or 0):
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
                     "message": f"Insufficient traffic to reset usage for this user, your limit: {round((_admin.traffic) / (1024 ** 3), 1)} GB",
                 },
             )
-        usage_user_traffic = user_info.get("usedData", 0)
+        usage_user_traffic = user_info.current_usage or 0
         reset_usage = await admin_task.reset_client_usage(email)
 
         if not reset_usage:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 content={
                     "success": False,
                     "message": "Failed to reset user usage",
                 },
             )
-        admin_check.reduce_usage(user_info.get("totalGB", 0), usage_user_traffic)
+        admin_check.reduce_usage(user_info.limit_usage or 0, usage_user_traffic)
         return ResponseModel(
             success=True,
             message="User usage reset successfully",
@@ -913,7 +1001,7 @@ async def reset_a_user_usage(
             logger.warning(
                 f"Inactive admin attempted to reset user usage: {admin_username}"
             )
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
@@ -922,31 +1010,28 @@ async def reset_a_user_usage(
             )
 
         admin_task = SanaeiAdminTaskService(admin_username=admin_username, db=db)
-        all_users = await admin_task.get_all_users()
+        all_users = await admin_task.list_clients()
         user_info = next(
             (
                 user for user in all_users
-                if user.get("email") == email
+                if user.email == email
             ),
             None
         )
 
-        if not admin_check.check_traffic_limit(user_info["totalGB"]):
-            return JSONResponse(
+        if not admin_check.check_traffic_limit(user_info.total_gb or 0):
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
                     "message": f"Insufficient traffic to reset usage for this user, your limit: {round((_admin.traffic) / (1024 ** 3), 1)} GB",
                 },
             )
-        traffic = user_info.get("traffic", {})
+        traffic = user_info.traffic
 
-        usage_user_traffic = (
-            traffic.get("up", 0) +
-            traffic.get("down", 0)
-        )
+        usage_user_traffic = (traffic.up or 0) + (traffic.down or 0) if traffic else 0
 
-        total_gb = user_info.get("totalGB", 0)
+        total_gb = user_info.total_gb or 0
 
         reset_usage = await admin_task.reset_client_usage(email)
 
@@ -956,14 +1041,14 @@ async def reset_a_user_usage(
             usage_traffic = usage_user_traffic
 
         if not reset_usage:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 content={
                     "success": False,
                     "message": "Failed to reset user usage",
                 },
             )
-        admin_check.reduce_usage(user_info["totalGB"], usage_traffic)
+        admin_check.reduce_usage(user_info.total_gb or 0, usage_traffic)
         return ResponseModel(
             success=True,
             message="User usage reset successfully",
@@ -974,7 +1059,7 @@ async def reset_a_user_usage(
             logger.warning(
                 f"Inactive admin attempted to reset user usage: {admin_username}"
             )
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
@@ -985,7 +1070,7 @@ async def reset_a_user_usage(
         admin_task = MarzbanAdminTaskService(admin_username=admin_username, db=db)
         user_info = await admin_task.get_user_by_username(email)
         if not user_info:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
                 content={
                     "success": False,
@@ -993,7 +1078,7 @@ async def reset_a_user_usage(
                 },
             )
         if not admin_check.check_traffic_limit(user_info.get("data_limit", 0)):
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
@@ -1004,7 +1089,7 @@ async def reset_a_user_usage(
         reset_usage = await admin_task.reset_user_usage_in_panel(email)
 
         if not reset_usage:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 content={
                     "success": False,
@@ -1022,7 +1107,7 @@ async def reset_a_user_usage(
             logger.warning(
                 f"Inactive admin attempted to reset user usage: {admin_username}"
             )
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
@@ -1033,7 +1118,7 @@ async def reset_a_user_usage(
         admin_task = TxUIAdminTaskService(admin_username=admin_username, db=db)
         user_info = await admin_task.get_client_by_email(email)
         if not user_info:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
                 content={
                     "success": False,
@@ -1041,7 +1126,7 @@ async def reset_a_user_usage(
                 },
             )
         if not admin_check.check_traffic_limit(user_info.get("total", 0)):
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
@@ -1057,7 +1142,7 @@ async def reset_a_user_usage(
             usage_traffic = usage_user_traffic
 
         if not reset_usage:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 content={
                     "success": False,
@@ -1071,6 +1156,8 @@ async def reset_a_user_usage(
         )
 
 
+@traced("task.delete_a_user")
+@_invalidates_user_data
 async def delete_a_user(admin_username: str, uuid: str, db: Session) -> bool:
     """This function deletes a user from the panel associated with the given admin."""
 
@@ -1080,12 +1167,16 @@ async def delete_a_user(admin_username: str, uuid: str, db: Session) -> bool:
     if not panel:
         return False
     
+    unavailable = _panel_unavailable(panel)
+    if unavailable:
+        return unavailable
+
     admin_check = AdminLimiter(admin_username=admin_username, db=db)
 
     if panel.panel_type == "guard":
         if not admin_check.admin_is_active():
             logger.warning(f"Inactive admin attempted to delete user: {admin_username}")
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
@@ -1094,11 +1185,11 @@ async def delete_a_user(admin_username: str, uuid: str, db: Session) -> bool:
             )
 
         admin_task = GuardAdminTaskService(admin_username=admin_username, db=db)
-        users = await admin_task.get_all_users()
+        users = await admin_task.list_clients()
 
         user_info = None
         for user in users:
-            if user.get("id") == int(uuid):
+            if user.id == int(uuid):
                 user_info = user
                 break
 
@@ -1106,7 +1197,7 @@ async def delete_a_user(admin_username: str, uuid: str, db: Session) -> bool:
             logger.warning(
                 f"User with uuid {uuid} not found for deletion by admin {admin_username}"
             )
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
                 content={
                     "success": False,
@@ -1114,17 +1205,17 @@ async def delete_a_user(admin_username: str, uuid: str, db: Session) -> bool:
                 },
             )
 
-        total = user_info.get("totalGB", 0)
-        used = user_info.get("usedData", 0)
+        total = user_info.limit_usage or 0
+        used = user_info.current_usage or 0
         traffic = total - used
         if traffic < 0:
             traffic = 0
 
-        delete_user = await admin_task.delete_client_from_panel(user_info.get("username"))
+        delete_user = await admin_task.delete_client_from_panel(user_info.username)
 
         if not delete_user:
             logger.error(f"Failed to delete user {uuid} by admin {admin_username}")
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 content={
                     "success": False,
@@ -1132,14 +1223,14 @@ async def delete_a_user(admin_username: str, uuid: str, db: Session) -> bool:
                 },
             )
 
-        crud.remove_user_from_guard_table(db, user_info["username"])
+        crud.remove_user_from_guard_table(db, user_info.username)
 
         admin_check.increase_usage(traffic)
         logger.info(
-            f"User {user_info['email']} deleted by admin {admin_username}, traffic returned: {round(traffic / (1024 ** 3), 2)} GB"
+            f"User {user_info.username} deleted by admin {admin_username}, traffic returned: {round(traffic / (1024 ** 3), 2)} GB"
         )
 
-        crud.remove_user_from_sanaei_table(db, user_info["email"])
+        crud.remove_user_from_sanaei_table(db, user_info.username)
         return ResponseModel(
             success=True,
             message="User deleted successfully",
@@ -1149,7 +1240,7 @@ async def delete_a_user(admin_username: str, uuid: str, db: Session) -> bool:
     if panel.panel_type == "3x-ui":
         if not admin_check.admin_is_active():
             logger.warning(f"Inactive admin attempted to delete user: {admin_username}")
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
@@ -1158,12 +1249,12 @@ async def delete_a_user(admin_username: str, uuid: str, db: Session) -> bool:
             )
 
         admin_task = SanaeiAdminTaskService(admin_username=admin_username, db=db)
-        users = await admin_task.get_all_users()
+        users = await admin_task.list_clients()
 
         # Find user
         user_info = None
         for user in users:
-            if user.get("uuid") == uuid:
+            if user.uuid == uuid:
                 user_info = user
                 break
 
@@ -1171,7 +1262,7 @@ async def delete_a_user(admin_username: str, uuid: str, db: Session) -> bool:
             logger.warning(
                 f"User with uuid {uuid} not found for deletion by admin {admin_username}"
             )
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
                 content={
                     "success": False,
@@ -1179,16 +1270,19 @@ async def delete_a_user(admin_username: str, uuid: str, db: Session) -> bool:
                 },
             )
 
-        total = user_info.get("totalGB", user_info.get("total", 0)) or 0
-        _traffic_dict = user_info.get("traffic", {}) or {}
-        used = (_traffic_dict.get("up", 0) or 0) + (_traffic_dict.get("down", 0) or 0)
+        total = user_info.total_gb or 0
+        used = (
+            (user_info.traffic.up or 0) + (user_info.traffic.down or 0)
+            if user_info.traffic
+            else 0
+        )
         traffic = max(total - used, 0)
 
         delete_user = await admin_task.delete_client_from_panel(uuid)
 
         if not delete_user:
             logger.error(f"Failed to delete user {uuid} by admin {admin_username}")
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 content={
                     "success": False,
@@ -1198,10 +1292,10 @@ async def delete_a_user(admin_username: str, uuid: str, db: Session) -> bool:
 
         admin_check.increase_usage(traffic)
         logger.info(
-            f"User {user_info['email']} deleted by admin {admin_username}, traffic returned: {round(traffic / (1024 ** 3), 2)} GB"
+            f"User {user_info.email} deleted by admin {admin_username}, traffic returned: {round(traffic / (1024 ** 3), 2)} GB"
         )
 
-        crud.remove_user_from_sanaei_table(db, user_info["email"])
+        crud.remove_user_from_sanaei_table(db, user_info.email)
         return ResponseModel(
             success=True,
             message="User deleted successfully",
@@ -1211,7 +1305,7 @@ async def delete_a_user(admin_username: str, uuid: str, db: Session) -> bool:
         username = uuid  # Marzban uses username as identifier
         if not admin_check.admin_is_active():
             logger.warning(f"Inactive admin attempted to delete user: {admin_username}")
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
@@ -1226,7 +1320,7 @@ async def delete_a_user(admin_username: str, uuid: str, db: Session) -> bool:
             logger.warning(
                 f"User with username {username} not found for deletion by admin {admin_username}"
             )
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
                 content={
                     "success": False,
@@ -1240,7 +1334,7 @@ async def delete_a_user(admin_username: str, uuid: str, db: Session) -> bool:
 
         if not delete_user:
             logger.error(f"Failed to delete user {username} by admin {admin_username}")
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 content={
                     "success": False,
@@ -1261,7 +1355,7 @@ async def delete_a_user(admin_username: str, uuid: str, db: Session) -> bool:
     elif panel.panel_type == "tx-ui":
         if not admin_check.admin_is_active():
             logger.warning(f"Inactive admin attempted to delete user: {admin_username}")
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "success": False,
@@ -1270,27 +1364,22 @@ async def delete_a_user(admin_username: str, uuid: str, db: Session) -> bool:
             )
 
         admin_task = TxUIAdminTaskService(admin_username=admin_username, db=db)
-        users = await admin_task.get_all_users()
+        users = await admin_task.list_clients()
 
         # Find user
         user_info = None
         for user in users:
-            if user.get("id") == uuid:
+            if user.id == uuid:
                 user_info = user
                 break
 
-        _traffic_dict = user_info.get("traffic", {}) or {}
-        traffic = max(
-            user_info.get("totalGB", 0) - (
-                (_traffic_dict.get("up", 0) or 0) + (_traffic_dict.get("down", 0) or 0)
-            ), 0
-        )
+        traffic = max((user_info.total_gb or 0) - (user_info.up + user_info.down), 0)
 
         delete_user = await admin_task.delete_client_from_panel(uuid)
 
         if not delete_user:
             logger.error(f"Failed to delete user {uuid} by admin {admin_username}")
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 content={
                     "success": False,
@@ -1300,7 +1389,7 @@ async def delete_a_user(admin_username: str, uuid: str, db: Session) -> bool:
 
         admin_check.increase_usage(traffic)
         logger.info(
-            f"User {user_info['email']} deleted by admin {admin_username}, traffic returned: {round(traffic / (1024 ** 3), 2)} GB"
+            f"User {user_info.email} deleted by admin {admin_username}, traffic returned: {round(traffic / (1024 ** 3), 2)} GB"
         )
 
         return ResponseModel(
@@ -1,86 +1,89 @@
-import time
-import requests
+import httpx
 import json
-from typing import List, Dict, Any
+from typing import List
 
 from backend.utils.logger import logger
 from backend.schema._input import ClientInput, ClientUpdateInput
+from backend.services.upstream import create_client, instrument
+from backend.services.retry import IDEMPOTENT, READ_ONLY
+from backend.services.decoders import TxUIInbound, read_txui_inbounds
+from backend.utils.metrics import record_cache
+from backend.utils.shared_state import get_state
 
 
+@instrument("tx-ui")
 class APIService:
-    _username: str | None = None
-    _cached_url: str | None = None
-    _token_time: float | None = None
     _token_expiry: float = 300
-    _session: requests.Session | None = None
 
-    def __init__(self, url: str, username: str, password: str):
+    def __init__(
+        self, url: str, username: str, password: str, panel_name: str | None = None
+    ):
         self.url = url if url.endswith("/") else url + "/"
+        self.panel_name = panel_name
         self.username = username
         self.password = password
+        self.client = create_client(
+            base_url=self.url,
+            panel_name=panel_name,
+            headers={"User-Agent": "Mozilla/5.0", "Accept": "application/json"},
+        )
 
-    def _get_session(self) -> requests.Session:
-        if APIService._session is None:
-            APIService._session = requests.Session()
-            APIService._session.headers.update(
-                {"User-Agent": "Mozilla/5.0", "Accept": "application/json"}
-            )
-        return APIService._session
+    async def close(self):
+        await self.client.aclose()
 
-    def _login(self, force: bool = False):
-        now = time.time()
+    async def _login(self, force: bool = False):
+        # session cookies are shared between workers as name -> value
+        key = f"txui_session:{self.url}:{self.username}"
+        cookies = None if force else get_state().get(key)
 
-        if not force and (
-            APIService._username == self.username
-            and APIService._cached_url == self.url
-            and APIService._token_time
-            and now - APIService._token_time < APIService._token_expiry
-        ):
+        if cookies:
+            record_cache("txui_session", True)
+            self.client.cookies = httpx.Cookies(cookies)
             return
 
-        session = self._get_session()
+        record_cache("txui_session", False)
 
-        response = session.post(
-            f"{self.url}login",
+        response = await self.client.post(
+            "login",
             data={"username": self.username, "password": self.password},
+            extensions=READ_ONLY,
         )
 
         if response.status_code != 200:
             raise Exception(f"Login failed: {response.status_code} - {response.text}")
 
-        APIService._cached_url = self.url
-        APIService._token_time = now
-        APIService._username = self.username
+        get_state().set(
+            key, dict(self.client.cookies.items()), ttl=APIService._token_expiry
+        )
 
-    def _safe_json(self, response: requests.Response) -> dict:
+    def _safe_json(self, response: httpx.Response) -> dict:
         try:
             return response.json()
         except ValueError:
             logger.warning(f"Invalid JSON: {response.text}")
             return {}
 
-    def _request_with_retry(self, method: str, endpoint: str, **kwargs):
-        self._login()
-        session = self._get_session()
+    async def _request_with_relogin(self, method: str, endpoint: str, **kwargs):
+        # x-ui rejects an expired session with 401/403/404 before the handler
+        # runs, so replaying once after a fresh login cannot apply a change twice.
+        await self._login()
 
-        url = f"{self.url}{endpoint}"
-        response = session.request(method, url, **kwargs)
+        response = await self.client.request(method, endpoint, **kwargs)
 
         if response.status_code in (401, 403, 404):
-            self._login(force=True)
-            response = session.request(method, url, **kwargs)
+            await self._login(force=True)
+            response = await self.client.request(method, endpoint, **kwargs)
 
         response.raise_for_status()
         return response
 
-    async def get_inbounds(self) -> List[Dict[str, Any]]:
-        response = self._request_with_retry("GET", "panel/api/inbounds/list")
-        data = self._safe_json(response)
-        return data.get("obj", [])
+    async def list_inbounds(self) -> list[TxUIInbound]:
+        response = await self._request_with_relogin("GET", "panel/api/inbounds/list")
+        return await read_txui_inbounds(response.content)
 
     async def test_connection(self) -> bool:
         try:
-            response = self._request_with_retry("GET", "panel/api/server/status")
+            response = await self._request_with_relogin("GET", "panel/api/server/status")
             return self._safe_json(response).get("success", False)
         except Exception:
             return False
@@ -107,7 +110,7 @@ class APIService:
 
         data = {"id": inbound_id, "settings": json.dumps(settings_dict)}
 
-        response = self._request_with_retry(
+        response = await self._request_with_relogin(
             "POST", "panel/api/inbounds/addClient", json=data
         )
 
@@ -132,32 +135,39 @@ class APIService:
 
         data = {"id": inbound_id, "settings": json.dumps(settings_dict)}
 
-        response = self._request_with_retry(
-            "POST", f"panel/api/inbounds/updateClient/{uuid}", json=data
+        response = await self._request_with_relogin(
+            "POST",
+            f"panel/api/inbounds/updateClient/{uuid}",
+            json=data,
+            extensions=IDEMPOTENT,
         )
 
         return self._safe_json(response).get("success", False)
 
     async def delete_client(self, inbound_id: int, uuid: str) -> bool:
-        response = self._request_with_retry(
+        response = await self._request_with_relogin(
             "POST", f"panel/api/inbounds/{inbound_id}/delClient/{uuid}"
         )
         return self._safe_json(response).get("success", False)
 
     async def reset_client_usage(self, inbound_id: int, email: str) -> bool:
-        response = self._request_with_retry(
-            "POST", f"panel/api/inbounds/{inbound_id}/resetClientTraffic/{email}"
+        response = await self._request_with_relogin(
+            "POST",
+            f"panel/api/inbounds/{inbound_id}/resetClientTraffic/{email}",
+            extensions=IDEMPOTENT,
         )
         return self._safe_json(response).get("success", False)
 
     async def get_online_clients(self) -> List[str]:
-        response = self._request_with_retry("POST", "panel/api/inbounds/onlines")
+        response = await self._request_with_relogin(
+            "POST", "panel/api/inbounds/onlines", extensions=READ_ONLY
+        )
         data = self._safe_json(response)
         return data.get("obj", []) or []
 
     async def get_client_by_email(self, email: str) -> dict | bool:
         try:
-            response = self._request_with_retry(
+            response = await self._request_with_relogin(
                 "GET", f"panel/api/inbounds/getClientTraffics/{email}"
             )
             data = self._safe_json(response)
@@ -1,9 +1,8 @@
-import json
-from typing import Any
 from sqlalchemy.orm import Session
 
 from backend.schema._input import ClientInput, ClientUpdateInput
 from backend.services.tx_ui.api import APIService
+from backend.services.decoders import TxUIClient, read_txui_clients
 from backend.db import crud
 from backend.utils.logger import logger
 
@@ -15,44 +14,36 @@ class AdminTaskService:
         self.admin = crud.get_admin_by_username(db, username=admin_username)
         panel = crud.get_panel_by_name(db, name=self.admin.panel)
         self.api_service = APIService(
-            url=panel.url, username=panel.username, password=panel.password
+            url=panel.url,
+            username=panel.username,
+            password=panel.password,
+            panel_name=panel.name,
         )
 
-    async def get_all_users(self) -> list[dict]:
+    async def list_clients(self) -> list[TxUIClient]:
         try:
-            inbounds = await self.api_service.get_inbounds()
+            inbounds = await self.api_service.list_inbounds()
 
             inbound = next(
-                (inb for inb in inbounds if inb["id"] == self.admin.inbound_id), None
+                (inb for inb in inbounds if str(inb.id) == str(self.admin.inbound_id)),
+                None,
             )
 
             if not inbound:
                 return []
 
-            settings = json.loads(inbound["settings"])
-            clients = settings.get("clients", [])
+            clients = await read_txui_clients(inbound.settings)
+            stats_map = {stat.email: stat for stat in inbound.client_stats or []}
+            online_clients = set(await self.api_service.get_online_clients())
 
-            client_stats = inbound.get("clientStats", [])
+            for client in clients:
+                stat = stats_map.get(client.email)
+                if stat:
+                    client.up = stat.up or 0
+                    client.down = stat.down or 0
+                client.is_online = client.email in online_clients
 
-            stats_map = {c["email"]: c for c in client_stats}
-
-            online_clients = await self.api_service.get_online_clients()
-
-            result = []
-
-            for c in clients:
-                client_dict = c.copy()
-
-                stat = stats_map.get(c["email"], {})
-
-                client_dict["up"] = stat.get("up", 0)
-                client_dict["down"] = stat.get("down", 0)
-                client_dict["total"] = stat.get("total", 0)
-
-                client_dict["is_online"] = c["email"] in online_clients
-
-                result.append(client_dict)
-            return result
+            return clients
 
         except Exception as e:
             logger.error(f"Error retrieving all users: {str(e)}")
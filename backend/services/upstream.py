@@ -0,0 +1,217 @@
+import time
+import asyncio
+import inspect
+import functools
+import httpx
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from backend.config import config
+from backend.services.circuit_breaker import drop_breaker, get_breaker
+from backend.services.concurrency import OVERLOAD_STATUS, drop_limiter, get_limiter
+from backend.services.retry import (
+    RetryPolicy,
+    drop_retry_stats,
+    is_idempotent,
+    is_write,
+    record_retry,
+)
+from backend.utils.metrics import upstream_call_seconds
+from backend.utils.tracing import record_span
+
+
+# names of the panels sent a write inside track_panel_writes()
+_panel_writes: ContextVar[set[str] | None] = ContextVar("panel_writes", default=None)
+
+
+@contextmanager
+def track_panel_writes():
+    """Collect the panels that were sent a write while the block runs.
+
+    A write counts once it leaves for the panel, whatever the response, since
+    the panel may have applied it even if the reply is lost.
+    """
+    written: set[str] = set()
+    token = _panel_writes.set(written)
+    try:
+        yield written
+    finally:
+        _panel_writes.reset(token)
+
+
+class PanelTransport(httpx.AsyncBaseTransport):
+    """Shared transport for one panel: pools connections, retries transient
+    failures and feeds the panel's circuit breaker."""
+
+    def __init__(self, panel_name: str | None = None):
+        self.panel_name = panel_name
+        self.transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=10)
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        idempotent = is_idempotent(request)
+        started = time.monotonic()
+        attempt = 0
+
+        while True:
+            try:
+                response = await self._send_once(request)
+            except httpx.TransportError as e:
+                if not retry_policy.should_retry_error(e, idempotent):
+                    raise
+                delay = retry_policy.next_delay(attempt, started)
+                if delay is None:
+                    record_retry(self.panel_name, exhausted=True)
+                    raise
+            else:
+                if not retry_policy.should_retry_status(response.status_code, idempotent):
+                    return response
+                delay = retry_policy.next_delay(attempt, started)
+                if delay is None:
+                    record_retry(self.panel_name, exhausted=True)
+                    return response
+                await response.aclose()
+
+            attempt += 1
+            record_retry(self.panel_name)
+            await asyncio.sleep(delay)
+
+    async def _send_once(self, request: httpx.Request) -> httpx.Response:
+        if self.panel_name is None:
+            return await self.transport.handle_async_request(request)
+
+        breaker = get_breaker(self.panel_name)
+        breaker.check()
+        limiter = get_limiter(self.panel_name) if config.UPSTREAM_CONCURRENCY else None
+
+        try:
+            if limiter:
+                await limiter.acquire()
+            written = _panel_writes.get()
+            if written is not None and is_write(request):
+                written.add(self.panel_name)
+            response = await self._send_limited(request, limiter)
+        except httpx.TransportError as e:
+            breaker.record_failure(f"{type(e).__name__}: {e}")
+            raise
+        except BaseException:
+            breaker.release_trial()
+            raise
+
+        if response.status_code >= 500:
+            breaker.record_failure(f"HTTP {response.status_code}")
+        else:
+            breaker.record_success()
+        return response
+
+    async def _send_limited(self, request: httpx.Request, limiter) -> httpx.Response:
+        if limiter is None:
+            return await self.transport.handle_async_request(request)
+
+        started = time.perf_counter()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except httpx.TransportError:
+            limiter.release(overloaded=True)
+            raise
+        except BaseException:
+            limiter.release()
+            raise
+        # the slot covers the panel's work up to the response headers
+        limiter.release(
+            f"{request.method} {request.url.path}",
+            time.perf_counter() - started,
+            overloaded=response.status_code in OVERLOAD_STATUS,
+        )
+        return response
+
+    async def aclose(self) -> None:
+        # Pooled transports outlive the clients that borrow them
+        if self.panel_name is None:
+            await self.transport.aclose()
+
+
+retry_policy = RetryPolicy()
+_transports: dict[str, PanelTransport] = {}
+
+
+def get_transport(panel_name: str | None) -> PanelTransport:
+    if panel_name is None:
+        return PanelTransport()
+
+    transport = _transports.get(panel_name)
+    if transport is None:
+        transport = _transports[panel_name] = PanelTransport(panel_name)
+    return transport
+
+
+def create_client(
+    base_url: str, panel_name: str | None = None, **kwargs
+) -> httpx.AsyncClient:
+    """Build an httpx client for a panel with bounded timeouts and the shared transport."""
+    return httpx.AsyncClient(
+        base_url=base_url,
+        transport=get_transport(panel_name),
+        timeout=httpx.Timeout(
+            config.UPSTREAM_TIMEOUT, connect=config.UPSTREAM_CONNECT_TIMEOUT
+        ),
+        **kwargs,
+    )
+
+
+async def forget_panel(panel_name: str) -> None:
+    """Drop the breaker, limiter, retry stats and pooled connections kept
+    for a panel, after it was edited or deleted.
+
+    The state is per worker; other workers keep theirs until it heals on its
+    own (the breaker recovers, idle connections to the old URL time out).
+    """
+    drop_breaker(panel_name)
+    drop_limiter(panel_name)
+    drop_retry_stats(panel_name)
+    transport = _transports.pop(panel_name, None)
+    if transport is not None:
+        await transport.transport.aclose()
+
+
+async def close_transports() -> None:
+    for transport in list(_transports.values()):
+        await transport.transport.aclose()
+    _transports.clear()
+
+
+def _timed(func, panel_type: str, method: str):
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await func(self, *args, **kwargs)
+            outcome = "ok"
+            return result
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            upstream_call_seconds.observe(
+                duration, panel_type, self.panel_name or "", method, outcome
+            )
+            record_span(f"upstream.{method}", started, duration)
+
+    return wrapper
+
+
+def instrument(panel_type: str):
+    """Class decorator timing every public coroutine method of an APIService."""
+
+    def decorate(cls):
+        for name, func in list(vars(cls).items()):
+            if name.startswith("_") or name == "close":
+                continue
+            if inspect.iscoroutinefunction(func):
+                setattr(cls, name, _timed(func, panel_type, name))
+        return cls
+
+    return decorate
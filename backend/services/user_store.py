@@ -0,0 +1,339 @@
+import time
+import hashlib
+from array import array
+from itertools import compress
+
+from backend.config import config
+from backend.schema.output import ClientsOutput
+from backend.services.decoders import (
+    GuardSubscription,
+    MarzbanUser,
+    SanaeiClient,
+    TxUIClient,
+)
+from backend.utils.metrics import record_cache
+from backend.utils.shared_state import get_state
+
+
+DAY_MS = 86400 * 1000
+NO_EXPIRY = -1
+NO_OWNER = -1
+
+
+class UserStore:
+    """Users of one panel held column by column.
+
+    Numbers and flags live in typed ``array`` columns (8 bytes per limit,
+    usage or expiry value, 1 byte per flag) instead of one dict and one
+    pydantic model per user. Filters and aggregates walk whole columns and
+    return row indices; ``ClientsOutput`` objects are only built for the
+    rows a response actually returns.
+    """
+
+    def __init__(self):
+        self.ids: list[int | str] = []
+        self.uuids: list[str] = []
+        self.usernames: list[str] = []
+        self.sub_ids: list[str | None] = []
+        self.flows: list[str | None] = []
+        self.data_limit = array("q")
+        self.used_data = array("q")
+        self.expiry = array("q")  # unix ms, NO_EXPIRY when unset
+        self.status = array("b")
+        self.online = array("b")
+        self.owner = array("i")  # index into owner_names, NO_OWNER when unowned
+        self.owner_names: list[str] = []
+        self._owner_index: dict[str, int] = {}
+        self._lowered: list[str] | None = None
+        self.digest = ""
+
+    def __len__(self) -> int:
+        return len(self.usernames)
+
+    def append(
+        self,
+        id: int | str,
+        uuid: str,
+        username: str,
+        status: bool,
+        is_online: bool,
+        data_limit: int,
+        used_data: int,
+        expiry: int | None,
+        sub_id: str | None = None,
+        flow: str | None = None,
+        owner: str | None = None,
+    ) -> None:
+        self.ids.append(id)
+        self.uuids.append(uuid)
+        self.usernames.append(username)
+        self.sub_ids.append(sub_id)
+        self.flows.append(flow)
+        self.data_limit.append(data_limit or 0)
+        self.used_data.append(used_data or 0)
+        self.expiry.append(NO_EXPIRY if expiry is None else expiry)
+        self.status.append(bool(status))
+        self.online.append(bool(is_online))
+        self.owner.append(self._owner_id(owner))
+
+    def seal(self) -> "UserStore":
+        """Hash the columns into ``digest`` once the store is built.
+
+        The digest only depends on the users, so refetching unchanged data, on
+        any worker, gives the same value; ETags are built from it.
+        """
+        hasher = hashlib.blake2b(digest_size=12)
+        for column in (self.ids, self.uuids, self.usernames, self.sub_ids, self.flows):
+            hasher.update("\0".join(map(str, column)).encode())
+            hasher.update(b"\1")
+        for column in (
+            self.data_limit,
+            self.used_data,
+            self.expiry,
+            self.status,
+            self.online,
+            self.owner,
+        ):
+            hasher.update(column.tobytes())
+        hasher.update("\0".join(self.owner_names).encode())
+        self.digest = hasher.hexdigest()
+        return self
+
+    def _owner_id(self, owner: str | None) -> int:
+        if owner is None:
+            return NO_OWNER
+        index = self._owner_index.get(owner)
+        if index is None:
+            index = self._owner_index[owner] = len(self.owner_names)
+            self.owner_names.append(owner)
+        return index
+
+    # filters: each takes and returns a list of row indices
+
+    def all(self) -> list[int]:
+        return list(range(len(self)))
+
+    def owned_by(self, owner: str, rows: list[int] | None = None) -> list[int]:
+        index = self._owner_index.get(owner)
+        if index is None:
+            return []
+        mask = map(index.__eq__, self.owner)
+        selected = compress(range(len(self)), mask)
+        return list(selected) if rows is None else self._intersect(rows, selected)
+
+    def search(self, needle: str, rows: list[int]) -> list[int]:
+        if self._lowered is None:
+            self._lowered = [username.lower() for username in self.usernames]
+        needle = needle.lower()
+        lowered = self._lowered
+        return [row for row in rows if needle in lowered[row]]
+
+    def with_status(self, status: str, rows: list[int], now_ms: int | None = None) -> list[int]:
+        if status == "active":
+            mask = self.status
+        elif status == "disabled":
+            mask = map((0).__eq__, self.status)
+        elif status == "limited":
+            mask = self.over_quota_mask()
+        elif status == "expired":
+            now_ms = now_ms or int(time.time() * 1000)
+            mask = map(lambda expiry: 0 < expiry < now_ms, self.expiry)
+        elif status == "on_hold":
+            # 3x-ui and tx-ui keep a countdown that starts on first use as a
+            # negative expiry, marzban's "on_hold"
+            mask = map(lambda expiry: expiry < 0 and expiry != NO_EXPIRY, self.expiry)
+        else:
+            return []
+        return self._intersect(rows, compress(range(len(self)), mask))
+
+    def expiring_within(
+        self, days: float, rows: list[int], now_ms: int | None = None
+    ) -> list[int]:
+        now_ms = now_ms or int(time.time() * 1000)
+        until = now_ms + int(days * DAY_MS)
+        mask = map(lambda expiry: now_ms <= expiry <= until, self.expiry)
+        return self._intersect(rows, compress(range(len(self)), mask))
+
+    def over_quota_mask(self):
+        return map(
+            lambda limit, used: limit > 0 and used >= limit,
+            self.data_limit,
+            self.used_data,
+        )
+
+    @staticmethod
+    def _intersect(rows: list[int], selected) -> list[int]:
+        wanted = set(selected)
+        return [row for row in rows if row in wanted]
+
+    # aggregates
+
+    def used_per_owner(self) -> dict[str, int]:
+        totals = [0] * len(self.owner_names)
+        for owner, used in zip(self.owner, self.used_data):
+            if owner != NO_OWNER:
+                totals[owner] += used
+        return dict(zip(self.owner_names, totals))
+
+    def summary(self, rows: list[int], expiring_days: float = 3) -> dict:
+        now_ms = int(time.time() * 1000)
+        row_set = set(rows)
+        in_rows = [index in row_set for index in range(len(self))]
+        return {
+            "total": len(rows),
+            "active": sum(compress(self.status, in_rows)),
+            "online": sum(compress(self.online, in_rows)),
+            "limited": sum(compress(self.over_quota_mask(), in_rows)),
+            "expired": len(self.with_status("expired", rows, now_ms)),
+            "expiring_soon": len(self.expiring_within(expiring_days, rows, now_ms)),
+            "used_data": sum(compress(self.used_data, in_rows)),
+            "data_limit": sum(compress(self.data_limit, in_rows)),
+        }
+
+    def rows(self, indices: list[int]) -> list[ClientsOutput]:
+        return [
+            ClientsOutput(
+                id=self.ids[i],
+                uuid=self.uuids[i],
+                username=self.usernames[i],
+                status=self.status[i],
+                is_online=self.online[i],
+                data_limit=self.data_limit[i],
+                used_data=self.used_data[i],
+                expiry_date_unix=None if self.expiry[i] == NO_EXPIRY else self.expiry[i],
+                sub_id=self.sub_ids[i],
+                flow=self.flows[i],
+            )
+            for i in indices
+        ]
+
+
+def build_sanaei_store(clients: list[SanaeiClient], owners: dict[str, str]) -> UserStore:
+    store = UserStore()
+    for client in clients:
+        traffic = client.traffic
+        store.append(
+            id=client.id,
+            uuid=client.uuid,
+            username=client.email,
+            status=client.enable,
+            is_online=client.is_online,
+            data_limit=client.total_gb or 0,
+            used_data=(traffic.up or 0) + (traffic.down or 0) if traffic else 0,
+            expiry=client.expiry_time,
+            sub_id=client.sub_id,
+            flow=client.flow,
+            owner=owners.get(client.email),
+        )
+    return store.seal()
+
+
+def build_guard_store(clients: list[GuardSubscription], owners: dict[str, str]) -> UserStore:
+    store = UserStore()
+    for client in clients:
+        store.append(
+            id=client.id,
+            uuid=str(client.id),
+            username=client.username,
+            status=client.is_active,
+            is_online=client.is_online,
+            data_limit=client.limit_usage or 0,
+            used_data=client.current_usage or 0,
+            expiry=(client.limit_expire or 0) * 1000,
+            sub_id=client.link.split("/")[-1] if client.link else None,
+            owner=owners.get(client.username),
+        )
+    return store.seal()
+
+
+def build_txui_store(clients: list[TxUIClient]) -> UserStore:
+    store = UserStore()
+    for client in clients:
+        store.append(
+            id=client.id,
+            uuid=client.id,
+            username=client.email,
+            status=client.enable,
+            is_online=client.is_online,
+            data_limit=client.total_gb or 0,
+            used_data=client.up + client.down,
+            expiry=client.expiry_time or 0,
+            sub_id=client.sub_id,
+            flow=client.flow,
+        )
+    return store.seal()
+
+
+def build_marzban_store(users: list[MarzbanUser]) -> UserStore:
+    store = UserStore()
+    for user in users:
+        store.append(
+            id=0,
+            uuid="0",
+            username=user.username,
+            status=user.status == "active",
+            is_online=False,
+            data_limit=user.data_limit,
+            used_data=user.used_traffic,
+            expiry=user.expire * 1000 if user.expire else None,
+            sub_id=user.subscription_url,
+        )
+    return store.seal()
+
+
+# Stores are cached per (panel name, scope) for USER_STORE_TTL seconds so that
+# paging and searching don't refetch the panel. Mutations invalidate the panel;
+# the generation counter keeps a fetch that started before the mutation from
+# caching what it read. Stores stay in the worker that built them, the
+# generation is shared so a mutation on any worker invalidates them all.
+_stores: dict[tuple[str, str], tuple[UserStore, float, int]] = {}
+
+
+def store_generation(panel_name: str) -> int:
+    return get_state().counter(f"store_generation:{panel_name}")
+
+
+def _current(
+    panel_name: str, scope: str, within_ttl: bool = True
+) -> tuple[UserStore, float, int] | None:
+    cached = _stores.get((panel_name, scope))
+    if (
+        cached is None
+        or (within_ttl and time.monotonic() - cached[1] >= config.USER_STORE_TTL)
+        or cached[2] != store_generation(panel_name)
+    ):
+        return None
+    return cached
+
+
+def get_cached_store(panel_name: str, scope: str = "") -> UserStore | None:
+    cached = _current(panel_name, scope)
+    record_cache("user_store", cached is not None)
+    return cached[0] if cached else None
+
+
+def cached_store_digest(
+    panel_name: str, scope: str = "", within_ttl: bool = True
+) -> str | None:
+    """Digest of the cached store, None if there is none.
+
+    With ``within_ttl=False`` a store past USER_STORE_TTL still counts as long
+    as no mutation has invalidated it.
+    """
+    cached = _current(panel_name, scope, within_ttl)
+    return cached[0].digest if cached else None
+
+
+def cache_store(panel_name: str, scope: str, store: UserStore, generation: int) -> None:
+    if config.USER_STORE_TTL > 0 and generation == store_generation(panel_name):
+        _stores[(panel_name, scope)] = (store, time.monotonic(), generation)
+
+
+def drop_cached_store(panel_name: str, scope: str = "") -> None:
+    _stores.pop((panel_name, scope), None)
+
+
+def invalidate_user_store(panel_name: str) -> None:
+    get_state().incr(f"store_generation:{panel_name}")
+    for key in [key for key in _stores if key[0] == panel_name]:
+        del _stores[key]
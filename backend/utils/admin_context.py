@@ -0,0 +1,6 @@
+from contextvars import ContextVar
+
+
+# username of the admin the current request acts for, set by
+# get_current_admin; upstream calls are scheduled fairly between admins
+current_admin: ContextVar[str | None] = ContextVar("current_admin", default=None)
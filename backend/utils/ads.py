@@ -1,36 +1,34 @@
-from datetime import datetime
-import requests
+from backend.utils.metrics import record_cache
+from backend.utils.shared_state import get_state
 
-ads_cache = None
-ads_cache_time = None
+ADS_KEY = "ads"
+ADS_TTL = 3600  # in seconds
 
 
 def get_ads_from_github() -> dict:
-    global ads_cache, ads_cache_time
+    ads = get_state().get(ADS_KEY)
+    if ads:
+        record_cache("ads", True)
+        return ads
 
-    if (
-        ads_cache
-        and ads_cache_time
-        and (datetime.now().timestamp() - ads_cache_time) < 3600
-    ):
-        return ads_cache
+    record_cache("ads", False)
+
+    # requests is only used here, keep it out of startup
+    import requests
 
     try:
         url = "https://raw.githubusercontent.com/primeZdev/whale-panel/main/media/ads.json"
         response = requests.get(url, timeout=5)
         response.raise_for_status()
-        ads_data = response.json()
-        ads_cache = ads_data
-        ads_cache_time = datetime.now().timestamp()
-        return ads_cache
+        ads = response.json()
 
     except (requests.RequestException, ValueError):
-        default_ads = {
+        ads = {
             "title": "جایگاه آگهی شما",
             "text": "کسب‌وکار خود را به بقیه افراد معرفی کنید! اینجا می‌توانید تبلیغ ویژه خود را قرار دهید",
             "link": "https://t.me/primezdev",
             "button": "رزرو جایگاه آگهی",
         }
-        ads_cache = default_ads
-        ads_cache_time = datetime.now().timestamp()
-        return default_ads
+
+    get_state().set(ADS_KEY, ads, ttl=ADS_TTL)
+    return ads
@@ -0,0 +1,73 @@
+import asyncio
+
+from backend.utils.metrics import cancelled_requests
+from backend.utils.shutdown import SAFE_METHODS
+
+
+# nginx's "client closed request", recorded by the metrics and tracing
+# middlewares; the client never sees it
+CLIENT_CLOSED_REQUEST = 499
+
+
+class DisconnectMiddleware:
+    """Pure ASGI middleware cancelling read-only requests whose client left.
+
+    A user listing can spend seconds downloading a panel's clients and
+    building the store from them; when the browser is closed or the poll
+    times out meanwhile, that work is thrown away. The handler runs as a
+    task while this middleware reads ``receive`` for it; on
+    ``http.disconnect`` the task is cancelled, which aborts the pending
+    upstream call before the decoding and rendering that would follow.
+
+    Mutations are left alone: stopping one halfway is worse than finishing
+    it for nobody.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        messages: asyncio.Queue = asyncio.Queue()
+        responded = disconnected = False
+
+        async def send_wrapper(message):
+            nonlocal responded
+            if message["type"] == "http.response.body" and not message.get("more_body"):
+                responded = True
+            await send(message)
+
+        handler = asyncio.create_task(self.app(scope, messages.get, send_wrapper))
+
+        async def watch():
+            nonlocal disconnected
+            while True:
+                message = await receive()
+                messages.put_nowait(message)
+                if message["type"] != "http.disconnect":
+                    continue
+                # once the response is out, receive reports a disconnect too
+                if not responded:
+                    disconnected = True
+                    handler.cancel()
+                return
+
+        watcher = asyncio.create_task(watch())
+        try:
+            await handler
+        except asyncio.CancelledError:
+            if not disconnected:
+                # cancelled from outside, e.g. by the server shutting down
+                handler.cancel()
+                raise
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            cancelled_requests.inc(scope["method"], route)
+            # nothing is sent to a closed connection; this only tells the
+            # outer middlewares how the request ended
+            await send({"type": "http.response.start", "status": CLIENT_CLOSED_REQUEST})
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            watcher.cancel()
@@ -0,0 +1,139 @@
+import gzip
+import hashlib
+import mimetypes
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import brotli
+from starlette.requests import Request
+from starlette.responses import Response
+
+from backend.utils.compression import COMPRESSIBLE_TYPES, negotiate_encoding
+from backend.utils.logger import logger
+from backend.utils.responses import etag_matches
+
+
+SIDECARS = {"br": ".br", "gzip": ".gz"}
+TEMPLATED_SUFFIXES = {".html", ".js", ".css"}
+# vite names bundled files like assets/index-B2x9kQ1a.js: an 8 character
+# base64url hash, which an ordinary word like "manifest" is unlikely to pass
+# for once it has to contain an uppercase letter, a digit, "_" or "-"
+HASHED_NAME = re.compile(r"^assets/[^/]*-(?=[a-z]*[A-Z0-9_-])[A-Za-z0-9_-]{8}\.[a-z0-9]+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+
+@dataclass
+class StaticAsset:
+    body: bytes
+    content_type: str
+    etag: str
+    cache_control: str
+    encoded: dict[str, bytes] = field(default_factory=dict)
+
+
+class FrontendCache:
+    """The built frontend held in memory, with compressed variants.
+
+    Every file under ``root`` is read once by ``load``, and placeholders
+    in HTML, JS and CSS are replaced in memory (the bundle is built with
+    ``__URLPATH__`` as its base). A ``.br``/``.gz`` sidecar is used when
+    the file needed no replacement and the sidecar is at least as new as
+    its source; otherwise compressible files are compressed here.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        minimum_size: int = 1024,
+        replacements: dict[str, str] | None = None,
+    ):
+        self.root = root
+        self.minimum_size = minimum_size
+        self.replacements = {
+            old.encode(): new.encode() for old, new in (replacements or {}).items()
+        }
+        self.assets: dict[str, StaticAsset] = {}
+
+    def load(self) -> None:
+        started = time.perf_counter()
+        assets = {}
+        if self.root.is_dir():
+            for path in sorted(self.root.rglob("*")):
+                if path.is_file() and path.suffix not in SIDECARS.values():
+                    name = path.relative_to(self.root).as_posix()
+                    assets[name] = self._read(path, name)
+        self.assets = assets
+
+        encoded = sum(len(asset.encoded) for asset in assets.values())
+        size = sum(len(asset.body) for asset in assets.values())
+        logger.info(
+            f"Frontend loaded: {len(assets)} files, {size // 1024} KiB, "
+            f"{encoded} compressed variants in "
+            f"{(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+
+    def _read(self, path: Path, name: str) -> StaticAsset:
+        body = path.read_bytes()
+        templated = False
+        if path.suffix in TEMPLATED_SUFFIXES:
+            for old, new in self.replacements.items():
+                if old in body:
+                    body = body.replace(old, new)
+                    templated = True
+
+        content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type == "application/javascript":
+            content_type += "; charset=utf-8"
+
+        asset = StaticAsset(
+            body=body,
+            content_type=content_type,
+            etag=f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"',
+            cache_control=IMMUTABLE if HASHED_NAME.match(name) else REVALIDATE,
+        )
+        if len(body) < self.minimum_size or not content_type.startswith(COMPRESSIBLE_TYPES):
+            return asset
+
+        modified = path.stat().st_mtime
+        for encoding, suffix in SIDECARS.items():
+            sidecar = path.with_name(path.name + suffix)
+            if (
+                not templated
+                and sidecar.is_file()
+                and sidecar.stat().st_mtime >= modified
+            ):
+                asset.encoded[encoding] = sidecar.read_bytes()
+            else:
+                asset.encoded[encoding] = _compress(body, encoding)
+        return asset
+
+    def get(self, name: str) -> StaticAsset | None:
+        return self.assets.get(name)
+
+    def response(self, request: Request, asset: StaticAsset) -> Response:
+        headers = {
+            "ETag": asset.etag,
+            "Cache-Control": asset.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, asset.etag):
+            return Response(status_code=304, headers=headers)
+
+        body = asset.body
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        if encoding in asset.encoded:
+            body = asset.encoded[encoding]
+            headers["Content-Encoding"] = encoding
+            headers["ETag"] = f'{asset.etag[:-1]}-{encoding}"'
+        return Response(body, media_type=asset.content_type, headers=headers)
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    # done once per file at startup, so spend more effort than per response
+    if encoding == "br":
+        return brotli.compress(body, quality=9)
+    return gzip.compress(body, compresslevel=9)
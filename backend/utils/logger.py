@@ -28,3 +28,8 @@ def get_10_logs():
     with open(LOG_FILE, "r") as f:
         lines = f.readlines()
     return lines[-10:]
+
+
+def flush_logs() -> None:
+    for handler in logging.getLogger().handlers:
+        handler.flush()
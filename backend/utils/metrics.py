@@ -0,0 +1,330 @@
+import os
+import time
+import asyncio
+from bisect import bisect_left
+
+from sqlalchemy import event
+
+from backend.config import config
+from backend.utils.logger import logger
+from backend.utils.shared_state import get_state
+from backend.utils.tracing import record_span
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# with several workers, how often each one publishes its series, in seconds
+PUBLISH_INTERVAL = 15
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, *extra: str) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    pairs.extend(label for label in extra if label)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self, worker: str = "") -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labels, labels, worker)} {value}"
+            for labels, value in self.values.items()
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, *labels, value: float) -> None:
+        self.values[labels] = value
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) - amount
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = buckets
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self.values: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    header = Counter.header
+
+    def samples(self, worker: str = "") -> list[str]:
+        lines = []
+        for labels, series in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = _format_labels(self.labels, labels, worker, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            cumulative += series[-2]
+            le = _format_labels(self.labels, labels, worker, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+            plain = _format_labels(self.labels, labels, worker)
+            lines.append(f"{self.name}_sum{plain} {series[-1]}")
+            lines.append(f"{self.name}_count{plain} {cumulative}")
+        return lines
+
+
+_registry: list[Counter | Histogram] = []
+
+
+def register(metric):
+    _registry.append(metric)
+    return metric
+
+
+def _local_samples() -> dict[str, list[str]]:
+    worker = f'worker="{os.getpid()}"' if config.WORKERS > 1 else ""
+    return {metric.name: metric.samples(worker) for metric in _registry}
+
+
+# With several workers a scrape reaches one of them at random. Each worker
+# publishes its series, labelled with its pid, to the shared state, and
+# whichever worker answers /metrics merges all of them, so every scrape
+# sees every worker's counters instead of jumping between them.
+
+
+def publish_metrics() -> None:
+    state = get_state()
+    now = time.time()
+    state.set(f"metrics:{os.getpid()}", _local_samples(), ttl=PUBLISH_INTERVAL * 3)
+    # pid -> last publish; a lost concurrent update is redone next interval
+    workers = {
+        pid: published
+        for pid, published in (state.get("metrics_workers") or {}).items()
+        if now - published < PUBLISH_INTERVAL * 3
+    }
+    workers[str(os.getpid())] = now
+    state.set("metrics_workers", workers)
+
+
+async def run_metrics_publisher() -> None:
+    while True:
+        try:
+            publish_metrics()
+        except Exception as e:
+            logger.error(f"Metrics publisher error: {str(e)}")
+        await asyncio.sleep(PUBLISH_INTERVAL)
+
+
+def render_metrics() -> str:
+    if config.WORKERS > 1:
+        publish_metrics()
+        state = get_state()
+        published = [
+            state.get(f"metrics:{pid}") for pid in state.get("metrics_workers") or {}
+        ]
+        published = [samples for samples in published if samples]
+    else:
+        published = [_local_samples()]
+
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.header())
+        for samples in published:
+            lines.extend(samples.get(metric.name, ()))
+    return "\n".join(lines) + "\n"
+
+
+http_request_seconds = register(
+    Histogram(
+        "whale_http_request_duration_seconds",
+        "HTTP request latency by route",
+        ("method", "route", "status"),
+    )
+)
+upstream_call_seconds = register(
+    Histogram(
+        "whale_upstream_call_duration_seconds",
+        "Upstream panel API call latency",
+        ("panel_type", "panel", "method", "outcome"),
+    )
+)
+db_query_seconds = register(
+    Histogram(
+        "whale_db_query_duration_seconds",
+        "Database query latency by statement type",
+        ("operation",),
+        buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+    )
+)
+cache_requests = register(
+    Counter(
+        "whale_cache_requests_total",
+        "Cache lookups by cache and result (hit or miss)",
+        ("cache", "result"),
+    )
+)
+background_job_seconds = register(
+    Histogram(
+        "whale_background_job_duration_seconds",
+        "Background job run time",
+        ("job",),
+    )
+)
+inflight_mutations = register(
+    Gauge(
+        "whale_inflight_mutations",
+        "Mutating requests being processed",
+    )
+)
+shutdown_mutations = register(
+    Counter(
+        "whale_shutdown_mutations_total",
+        "Mutating requests seen during shutdown (rejected, drained or abandoned)",
+        ("outcome",),
+    )
+)
+upstream_concurrency_limit = register(
+    Gauge(
+        "whale_upstream_concurrency_limit",
+        "Adaptive limit on concurrent upstream calls per panel",
+        ("panel",),
+    )
+)
+upstream_inflight = register(
+    Gauge(
+        "whale_upstream_inflight",
+        "Upstream calls in flight per panel",
+        ("panel",),
+    )
+)
+upstream_queue_depth = register(
+    Gauge(
+        "whale_upstream_queue_depth",
+        "Upstream calls waiting for a concurrency slot per panel",
+        ("panel",),
+    )
+)
+upstream_queue_timeouts = register(
+    Counter(
+        "whale_upstream_queue_timeouts_total",
+        "Upstream calls that gave up waiting for a concurrency slot",
+        ("panel",),
+    )
+)
+upstream_queue_wait_seconds = register(
+    Histogram(
+        "whale_upstream_queue_wait_seconds",
+        "Time upstream calls waited for a concurrency slot",
+        ("panel",),
+    )
+)
+rate_limited_requests = register(
+    Counter(
+        "whale_rate_limited_requests_total",
+        "Requests refused with 429 by route class (read or mutation)",
+        ("route_class",),
+    )
+)
+login_rejected = register(
+    Counter(
+        "whale_login_rejected_total",
+        "Login attempts refused before checking the password, by locked key (username or ip)",
+        ("key_type",),
+    )
+)
+login_lockouts = register(
+    Counter(
+        "whale_login_lockouts_total",
+        "Usernames and client IPs locked out after too many login attempts",
+        ("key_type",),
+    )
+)
+cancelled_requests = register(
+    Counter(
+        "whale_cancelled_requests_total",
+        "Read-only requests cancelled because the client disconnected",
+        ("method", "route"),
+    )
+)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    cache_requests.inc(cache, "hit" if hit else "miss")
+
+
+def instrument_engine(engine) -> None:
+    """Time every SQL statement executed through the given SQLAlchemy engine."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start"].pop()
+        duration = time.perf_counter() - started
+        operation = statement.lstrip().split(" ", 1)[0].upper()
+        db_query_seconds.observe(duration, operation)
+        record_span(f"db.{operation.lower()}", started, duration)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        if context.connection is not None and context.connection.info.get("query_start"):
+            context.connection.info["query_start"].pop()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing each request by its route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            http_request_seconds.observe(
+                time.perf_counter() - started, scope["method"], route, status_code
+            )
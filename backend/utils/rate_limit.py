@@ -0,0 +1,73 @@
+import math
+
+from backend.config import config
+from backend.utils.metrics import rate_limited_requests
+from backend.utils.responses import FastJSONResponse
+from backend.utils.shared_state import get_state
+from backend.utils.shutdown import SAFE_METHODS
+
+
+def _bearer_subject(scope) -> str | None:
+    """The admin named by the request's access token, None without a valid one."""
+    from jose import jwt, JWTError
+
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer":
+                return None
+            try:
+                payload = jwt.decode(token, config.JWT_SECRET_KEY, algorithms=["HS256"])
+            except JWTError:
+                return None
+            return payload.get("sub")
+    return None
+
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware giving every admin a token bucket per route class.
+
+    Reads (GET, HEAD, OPTIONS) and mutations are limited separately, so a
+    bot creating users can't also lock its admin out of the dashboard. Only
+    requests carrying a valid access token count: the frontend's assets,
+    login and the probes are left alone, and a forged token can't drain
+    another admin's bucket. Buckets live in the shared state, per process
+    by default and shared by all workers with STATE_BACKEND sqlite or redis.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        # route class -> (requests per second, bucket size)
+        self.limits = {
+            "read": (config.RATE_LIMIT_READS, config.RATE_LIMIT_READ_BURST),
+            "mutation": (config.RATE_LIMIT_MUTATIONS, config.RATE_LIMIT_MUTATION_BURST),
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_class = "read" if scope["method"] in SAFE_METHODS else "mutation"
+        rate, burst = self.limits[route_class]
+        admin = _bearer_subject(scope) if rate > 0 else None
+        if admin is None:
+            await self.app(scope, receive, send)
+            return
+
+        wait = get_state().throttle(f"rate_limit:{route_class}:{admin}", 1 / rate, burst)
+        if wait <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        rate_limited_requests.inc(route_class)
+        retry_after = math.ceil(wait)
+        response = FastJSONResponse(
+            status_code=429,
+            headers={"Retry-After": str(retry_after)},
+            content={
+                "success": False,
+                "message": f"Too many requests, retry in {retry_after}s",
+            },
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,89 @@
+import functools
+import inspect
+from typing import Any
+
+import pydantic_core
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by pydantic's Rust serializer.
+
+    ``pydantic_core.to_json`` serializes pydantic models, datetimes, dates,
+    UUIDs and the usual containers directly to bytes, so content does not
+    need to go through ``jsonable_encoder`` first.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return pydantic_core.to_json(content)
+
+
+class FastJSONRoute(APIRoute):
+    """Route that hands plain return values straight to ``FastJSONResponse``.
+
+    FastAPI runs ``jsonable_encoder`` over anything an endpoint returns that
+    is not a ``Response``, which for a large user list costs far more than
+    the serialization itself. Wrapping the endpoint skips that step; a
+    declared ``response_model`` is still used for the OpenAPI schema.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        status_code = kwargs.get("status_code") or 200
+        super().__init__(path, _respond_with_fast_json(endpoint, status_code), **kwargs)
+
+
+def _respond_with_fast_json(endpoint, status_code: int):
+    def wrap(result):
+        if isinstance(result, Response):
+            return result
+        return FastJSONResponse(result, status_code=status_code)
+
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            return wrap(await endpoint(*args, **kwargs))
+
+    else:
+
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            return wrap(endpoint(*args, **kwargs))
+
+    return wrapper
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip().removeprefix("W/")
+        # CompressionMiddleware tags encoded bodies as "<etag>-br" / "<etag>-gzip"
+        for suffix in ('-br"', '-gzip"'):
+            if candidate.endswith(suffix):
+                candidate = candidate[: -len(suffix)] + '"'
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified(request: Request, etag: str | None) -> Response | None:
+    """304 when the client already holds the representation tagged ``etag``."""
+    if_none_match = request.headers.get("if-none-match")
+    if etag is None or not if_none_match or not etag_matches(if_none_match, etag):
+        return None
+    return Response(status_code=304, headers=_validator_headers(etag))
+
+
+def with_etag(response: Response, etag: str | None) -> Response:
+    if etag is not None:
+        response.headers.update(_validator_headers(etag))
+    return response
+
+
+def _validator_headers(etag: str) -> dict[str, str]:
+    # browsers revalidate on every request instead of reusing the body blindly
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
@@ -0,0 +1,283 @@
+import json
+import time
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from functools import cache
+from pathlib import Path
+
+from backend.config import config
+
+
+DATA_DIR = Path(__file__).resolve().parent.parent.parent / "data"
+# expired keys are swept after this many writes
+SWEEP_EVERY = 1024
+
+
+class SharedState(ABC):
+    """Small key-value store for state every worker must agree on.
+
+    Session tokens, cache entries, data versions and counters go through
+    here so that several uvicorn workers behave like one process. Values
+    must be JSON-serializable; ``ttl`` is in seconds. All calls are
+    synchronous: the SQLite and Redis backends answer from local disk or a
+    local socket in well under a millisecond.
+
+    Metrics are published through it and merged on /metrics, and health
+    probe results live in it; circuit breakers and concurrency limits stay in
+    each worker, the limits split between workers.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def get(self, key: str): ...
+
+    @abstractmethod
+    def set(self, key: str, value, ttl: float | None = None) -> None: ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    def incr(self, key: str, amount: int = 1, ttl: float | None = None) -> int:
+        """Add ``amount`` to a counter and return it; ``ttl`` applies when
+        the counter is created."""
+
+    def counter(self, key: str) -> int:
+        return self.get(key) or 0
+
+    @abstractmethod
+    def throttle(self, key: str, interval: float, burst: int) -> float:
+        """Take a token from a bucket refilled every ``interval`` seconds and
+        holding up to ``burst``; returns 0 when one was taken, otherwise the
+        seconds until the next one.
+
+        The bucket is kept as a single time (GCRA): when it would be full
+        again, which moves ``interval`` ahead per token taken.
+        """
+
+
+class MemoryState(SharedState):
+    """Per-process dict, the default for a single worker."""
+
+    name = "memory"
+
+    def __init__(self):
+        # key -> (value, expires_at or None), expires_at on the monotonic clock
+        self._values: dict[str, tuple[object, float | None]] = {}
+        self._writes = 0
+
+    def _live(self, key: str):
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del self._values[key]
+            return None
+        return entry
+
+    def _written(self) -> None:
+        self._writes += 1
+        if self._writes % SWEEP_EVERY == 0:
+            now = time.monotonic()
+            for key in [
+                key
+                for key, (_, expires_at) in self._values.items()
+                if expires_at is not None and expires_at <= now
+            ]:
+                del self._values[key]
+
+    def get(self, key: str):
+        entry = self._live(key)
+        return entry[0] if entry else None
+
+    def set(self, key: str, value, ttl: float | None = None) -> None:
+        self._values[key] = (value, time.monotonic() + ttl if ttl else None)
+        self._written()
+
+    def delete(self, key: str) -> None:
+        self._values.pop(key, None)
+
+    def incr(self, key: str, amount: int = 1, ttl: float | None = None) -> int:
+        entry = self._live(key)
+        if entry is None:
+            entry = (0, time.monotonic() + ttl if ttl else None)
+        value = entry[0] + amount
+        self._values[key] = (value, entry[1])
+        self._written()
+        return value
+
+    def throttle(self, key: str, interval: float, burst: int) -> float:
+        now = time.monotonic()
+        full_at = max(self.get(key) or now, now) + interval
+        wait = full_at - now - interval * burst
+        if wait > 0:
+            return wait
+        self._values[key] = (full_at, full_at)
+        self._written()
+        return 0.0
+
+
+class SQLiteState(SharedState):
+    """A table in a local SQLite file, shared by the workers of one host."""
+
+    name = "sqlite"
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS shared_state "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+        self._sweep()
+
+    def _connection(self) -> sqlite3.Connection:
+        # sync endpoints run in the threadpool, one connection per thread
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, isolation_level=None, timeout=5)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _sweep(self) -> None:
+        self._connection().execute(
+            "DELETE FROM shared_state WHERE expires_at <= ?", (time.time(),)
+        )
+
+    def _written(self) -> None:
+        self._writes += 1
+        if self._writes % SWEEP_EVERY == 0:
+            self._sweep()
+
+    def get(self, key: str):
+        row = self._connection().execute(
+            "SELECT value FROM shared_state "
+            "WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time()),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value, ttl: float | None = None) -> None:
+        self._connection().execute(
+            "INSERT OR REPLACE INTO shared_state (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), time.time() + ttl if ttl else None),
+        )
+        self._written()
+
+    def delete(self, key: str) -> None:
+        self._connection().execute("DELETE FROM shared_state WHERE key = ?", (key,))
+
+    def incr(self, key: str, amount: int = 1, ttl: float | None = None) -> int:
+        now = time.time()
+        # an expired counter starts over, as if it had been swept
+        row = self._connection().execute(
+            "INSERT INTO shared_state (key, value, expires_at) VALUES (?1, ?2, ?3) "
+            "ON CONFLICT (key) DO UPDATE SET "
+            "value = CASE WHEN expires_at <= ?4 THEN excluded.value "
+            "ELSE CAST(CAST(value AS INTEGER) + ?2 AS TEXT) END, "
+            "expires_at = CASE WHEN expires_at <= ?4 THEN excluded.expires_at "
+            "ELSE expires_at END "
+            "RETURNING value",
+            (key, str(amount), now + ttl if ttl else None, now),
+        ).fetchone()
+        self._written()
+        return int(row[0])
+
+    def throttle(self, key: str, interval: float, burst: int) -> float:
+        now = time.time()
+        # taken only while the bucket isn't empty, in one statement so two
+        # workers can't both take the last token
+        row = self._connection().execute(
+            "INSERT INTO shared_state (key, value, expires_at) VALUES (?1, ?2 + ?3, ?2 + ?3) "
+            "ON CONFLICT (key) DO UPDATE SET "
+            "value = MAX(CAST(value AS REAL), ?2) + ?3, "
+            "expires_at = MAX(CAST(value AS REAL), ?2) + ?3 "
+            "WHERE MAX(CAST(value AS REAL), ?2) - ?2 <= ?3 * (?4 - 1) "
+            "RETURNING value",
+            (key, now, interval, burst),
+        ).fetchone()
+        self._written()
+        if row is not None:
+            return 0.0
+        full_at = float(self.get(key) or now)
+        return max(full_at + interval - now - interval * burst, 0.0)
+
+
+class RedisState(SharedState):
+    """Redis, or anything speaking its protocol (Valkey, KeyDB, ...)."""
+
+    name = "redis"
+    prefix = "whale:"
+
+    # KEYS[1] bucket, ARGV now, interval, burst; returns the wait as a string
+    THROTTLE_SCRIPT = """
+    local now = tonumber(ARGV[1])
+    local interval = tonumber(ARGV[2])
+    local full_at = math.max(tonumber(redis.call('GET', KEYS[1]) or now), now) + interval
+    local wait = full_at - now - interval * tonumber(ARGV[3])
+    if wait > 0 then
+        return tostring(wait)
+    end
+    redis.call('SET', KEYS[1], tostring(full_at), 'PX', math.ceil((full_at - now) * 1000))
+    return '0'
+    """
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as error:
+            raise RuntimeError(
+                "STATE_BACKEND=redis needs the redis package: uv sync --extra redis"
+            ) from error
+        self.client = redis.Redis.from_url(url)
+        self._throttle = self.client.register_script(self.THROTTLE_SCRIPT)
+
+    def get(self, key: str):
+        value = self.client.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, value, ttl: float | None = None) -> None:
+        self.client.set(
+            self.prefix + key, json.dumps(value), px=int(ttl * 1000) if ttl else None
+        )
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def incr(self, key: str, amount: int = 1, ttl: float | None = None) -> int:
+        key = self.prefix + key
+        with self.client.pipeline() as pipeline:
+            if ttl:
+                # creates the counter with its expiry, no-op if it exists
+                pipeline.set(key, 0, px=int(ttl * 1000), nx=True)
+            pipeline.incrby(key, amount)
+            return int(pipeline.execute()[-1])
+
+    def throttle(self, key: str, interval: float, burst: int) -> float:
+        wait = self._throttle(keys=[self.prefix + key], args=[time.time(), interval, burst])
+        return float(wait)
+
+
+def state_backend() -> str:
+    """The configured backend; several workers can't share process memory."""
+    if config.STATE_BACKEND:
+        return config.STATE_BACKEND
+    return "memory" if config.WORKERS <= 1 else "sqlite"
+
+
+@cache
+def get_state() -> SharedState:
+    backend = state_backend()
+    if backend == "memory":
+        return MemoryState()
+    if backend == "sqlite":
+        return SQLiteState(Path(config.STATE_URL or DATA_DIR / "state.db"))
+    if backend == "redis":
+        return RedisState(config.STATE_URL or "redis://localhost:6379/0")
+    raise ValueError(f"Unknown STATE_BACKEND {backend!r}, use memory, sqlite or redis")
@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+from backend.utils.logger import logger
+from backend.utils.metrics import inflight_mutations, shutdown_mutations
+from backend.utils.responses import FastJSONResponse
+
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class RequestDrain:
+    """Mutating requests that must finish before the process exits.
+
+    A mutation talks to the upstream panel first and records the result in
+    the database afterwards (the user row, the admin's traffic). Cancelling
+    it in between leaves a user on the panel that whale-panel doesn't know
+    about, so ``DrainMiddleware`` runs every mutation as its own task,
+    shielded from the server cancelling the request when its graceful
+    shutdown times out, and ``wait`` gives them a deadline of their own.
+    """
+
+    def __init__(self):
+        self.accepting = True
+        self.tasks: set[asyncio.Task] = set()
+
+    def track(self, task: asyncio.Task) -> None:
+        self.tasks.add(task)
+        inflight_mutations.inc()
+
+        def done(task: asyncio.Task) -> None:
+            self.tasks.discard(task)
+            inflight_mutations.dec()
+
+        task.add_done_callback(done)
+
+    async def wait(self, timeout: float) -> int:
+        """Stop accepting mutations and wait for the running ones, returns
+        how many were still running at the deadline."""
+        self.accepting = False
+        pending = set(self.tasks)
+        if not pending:
+            return 0
+
+        started = time.perf_counter()
+        logger.warning(f"Waiting up to {timeout}s for {len(pending)} mutation(s)")
+        done, pending = await asyncio.wait(pending, timeout=timeout)
+        shutdown_mutations.inc("drained", amount=len(done))
+        shutdown_mutations.inc("abandoned", amount=len(pending))
+        logger.warning(
+            f"Drained {len(done)} mutation(s) in {time.perf_counter() - started:.2f}s, "
+            f"{len(pending)} abandoned"
+        )
+        return len(pending)
+
+
+drain = RequestDrain()
+
+
+class DrainMiddleware:
+    """Pure ASGI middleware running mutating requests through ``drain``.
+
+    Once shutdown has started, new mutations get a 503 with Retry-After so
+    clients retry them against the restarted process.
+    """
+
+    def __init__(self, app, drain: RequestDrain = drain):
+        self.app = app
+        self.drain = drain
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        if not self.drain.accepting:
+            shutdown_mutations.inc("rejected")
+            response = FastJSONResponse(
+                status_code=503,
+                headers={"Retry-After": "5", "Connection": "close"},
+                content={"success": False, "message": "Server is restarting, try again"},
+            )
+            await response(scope, receive, send)
+            return
+
+        abandoned = False
+
+        async def guarded_send(message):
+            if not abandoned:
+                await send(message)
+
+        task = asyncio.create_task(self.app(scope, receive, guarded_send))
+        self.drain.track(task)
+        try:
+            await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # the server gave up on the request and answered it itself; the
+            # mutation still runs to the end, its response has nowhere to go
+            abandoned = True
+            raise
@@ -1,7 +1,15 @@
-import psutil
+import os
+import time
+
+
+# fallback start time where /proc isn't available
+IMPORTED = time.monotonic()
 
 
 def get_system_info() -> dict:
+    # psutil is only needed by the superadmin system page
+    import psutil
+
     memory = psutil.virtual_memory()
     cpu_percent = psutil.cpu_percent(interval=1)
     disk_usage = psutil.disk_usage("/")
@@ -12,3 +20,17 @@ def get_system_info() -> dict:
         "disk_total": disk_usage.total,
         "disk_used": disk_usage.used,
     }
+
+
+def process_uptime() -> float:
+    """Seconds since this process was started, or since this module was
+    imported without /proc. Called at startup, so it doesn't import psutil."""
+    try:
+        with open("/proc/self/stat") as stat:
+            # the fields after the parenthesized command name, starttime is the 20th
+            fields = stat.read().rpartition(")")[2].split()
+        with open("/proc/uptime") as uptime:
+            since_boot = float(uptime.read().split()[0])
+        return since_boot - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return time.monotonic() - IMPORTED
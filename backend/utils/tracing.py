@@ -0,0 +1,170 @@
+import os
+import json
+import time
+import queue
+import random
+import logging
+import secrets
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+
+from starlette.datastructures import MutableHeaders
+
+from backend.config import config
+
+
+TRACE_FILE = os.path.join(os.path.dirname(__file__), "..", "..", "data", "traces.jsonl")
+
+
+class Trace:
+    """Spans collected while serving one request."""
+
+    __slots__ = ("trace_id", "method", "path", "started", "spans")
+
+    def __init__(self, method: str, path: str):
+        self.trace_id = secrets.token_hex(8)
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.spans: list[tuple[str, float, float]] = []
+
+    def add(self, name: str, started: float, duration: float) -> None:
+        self.spans.append((name, started - self.started, duration))
+
+    def server_timing(self) -> str:
+        """Sum span durations per category (the part of the name before the first dot)."""
+        totals: dict[str, float] = {}
+        for name, _, duration in self.spans:
+            category = name.split(".", 1)[0]
+            totals[category] = totals.get(category, 0) + duration
+
+        entries = [f"{name};dur={duration * 1000:.1f}" for name, duration in totals.items()]
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(entries)
+
+    def to_dict(self, route: str | None, status_code: int) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "timestamp": time.time(),
+            "method": self.method,
+            "path": self.path,
+            "route": route,
+            "status": status_code,
+            "duration_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "spans": [
+                {
+                    "name": name,
+                    "start_ms": round(offset * 1000, 3),
+                    "duration_ms": round(duration * 1000, 3),
+                }
+                for name, offset, duration in self.spans
+            ],
+        }
+
+
+_current_trace: ContextVar[Trace | None] = ContextVar("current_trace", default=None)
+
+
+def record_span(name: str, started: float, duration: float) -> None:
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(name, started, duration)
+
+
+@contextmanager
+def span(name: str):
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, started, time.perf_counter() - started)
+
+
+def traced(name: str):
+    """Record a span around every call of the decorated coroutine function."""
+
+    def decorate(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+# traces are handed to a background thread, the event loop never waits on the file
+_trace_logger = logging.getLogger("Traces")
+_trace_logger.setLevel(logging.INFO)
+_trace_logger.propagate = False
+_trace_listener: QueueListener | None = None
+
+
+def _write_trace(record: dict) -> None:
+    global _trace_listener
+    if _trace_listener is None:
+        handler = logging.FileHandler(TRACE_FILE, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        records = queue.SimpleQueue()
+        _trace_listener = QueueListener(records, handler)
+        _trace_listener.start()
+        _trace_logger.addHandler(QueueHandler(records))
+    _trace_logger.info(json.dumps(record))
+
+
+def flush_traces() -> None:
+    """Write out queued traces, on shutdown."""
+    global _trace_listener
+    if _trace_listener is not None:
+        _trace_listener.stop()
+        _trace_listener = None
+        for handler in _trace_logger.handlers[:]:
+            _trace_logger.removeHandler(handler)
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware sampling traces to JSONL and, with SERVER_TIMING,
+    adding a Server-Timing header (off by default: it shows any caller where
+    the server spends its time)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        # with neither output on (the default) no trace is built at all
+        if (
+            scope["type"] != "http"
+            or not config.TRACING_ENABLED
+            or not (config.SERVER_TIMING or config.TRACE_SAMPLE_RATE)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(scope["method"], scope["path"])
+        token = _current_trace.set(trace)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if config.SERVER_TIMING:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", trace.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_trace.reset(token)
+            if config.TRACE_SAMPLE_RATE and random.random() < config.TRACE_SAMPLE_RATE:
+                route = getattr(scope.get("route"), "path", None)
+                _write_trace(trace.to_dict(route, status_code))
@@ -0,0 +1,4 @@
+from benchmarks.load import main
+
+
+main()
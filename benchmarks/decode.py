@@ -0,0 +1,154 @@
+"""Decode benchmark: generic ``json.loads`` against the typed panel decoders.
+
+For each panel type a listing body with ``--clients`` users is decoded
+generically, with the typed decoders and with their incremental async
+readers. The benchmark reports the median decode time, the peak memory
+allocated while decoding and the memory still held by the result (all
+measured with tracemalloc, so time is reported from a separate,
+untraced run), plus the longest the event loop went without running
+another task while the typed and incremental decodes ran on it.
+
+    python -m benchmarks.decode --clients 50000 --output decode.json
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import asyncio
+import argparse
+import platform
+import statistics
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+# backend reads its settings at import time
+os.environ.setdefault("ADMIN_USERNAME", "bench")
+os.environ.setdefault("ADMIN_PASSWORD", "bench")
+os.environ.setdefault("JWT_SECRET_KEY", "bench")
+
+from benchmarks.fake_panels import PANELS
+from benchmarks.payloads import listing_body, read_clients, typed_clients
+
+
+def generic(panel_type: str, body: bytes):
+    data = json.loads(body)
+    if panel_type == "tx-ui":
+        # the settings string is a second JSON document
+        return data, json.loads(data["obj"][0]["settings"])
+    return data
+
+
+def measure(decode, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        decode()
+        timings.append(time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    result = decode()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 2),
+        "min_ms": round(min(timings) * 1000, 2),
+        "peak_mb": round(peak / 1024**2, 2),
+        "retained_mb": round(retained / 1024**2, 2),
+    }
+
+
+async def _stall(decode) -> float:
+    # a task that wakes up as often as the loop lets it; the longest gap
+    # between two wake-ups is the longest stretch the decode blocked
+    longest = 0.0
+    done = False
+
+    async def tick():
+        nonlocal longest
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0)
+            now = time.perf_counter()
+            longest = max(longest, now - last)
+            last = now
+
+    ticker = asyncio.create_task(tick())
+    await asyncio.sleep(0)
+    await decode()
+    done = True
+    await ticker
+    return longest
+
+
+def stall(decode, repeat: int) -> float:
+    """Median longest event-loop stall in ms while running ``decode``."""
+    stalls = [asyncio.run(_stall(decode)) for _ in range(repeat)]
+    return round(statistics.median(stalls) * 1000, 2)
+
+
+async def _blocking(decode):
+    return decode()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Typed vs generic upstream decoding")
+    parser.add_argument("--panels", nargs="+", choices=sorted(PANELS), default=sorted(PANELS))
+    parser.add_argument("--clients", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = []
+    for panel_type in args.panels:
+        body = listing_body(panel_type, args.clients)
+        result = {
+            "panel_type": panel_type,
+            "clients": args.clients,
+            "body_mb": round(len(body) / 1024**2, 2),
+            "json_loads": measure(lambda: generic(panel_type, body), args.repeat),
+            "typed": measure(lambda: typed_clients(panel_type, body), args.repeat),
+            "incremental": measure(
+                lambda: asyncio.run(read_clients(panel_type, body)), args.repeat
+            ),
+        }
+        result["typed"]["stall_ms"] = stall(
+            lambda: _blocking(lambda: typed_clients(panel_type, body)), args.repeat
+        )
+        result["incremental"]["stall_ms"] = stall(
+            lambda: read_clients(panel_type, body), args.repeat
+        )
+        results.append(result)
+        print(
+            f"{panel_type:8} json.loads {result['json_loads']['median_ms']}ms "
+            f"{result['json_loads']['retained_mb']}MB | typed "
+            f"{result['typed']['median_ms']}ms {result['typed']['retained_mb']}MB "
+            f"stall {result['typed']['stall_ms']}ms | incremental "
+            f"{result['incremental']['median_ms']}ms "
+            f"stall {result['incremental']['stall_ms']}ms",
+            file=sys.stderr,
+        )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,535 @@
+"""Local stand-ins for the upstream panels whale-panel talks to.
+
+Each fake keeps its users in memory and answers with the payload shapes
+that ``backend/services/*/api.py`` parse. Latency and error injection
+apply to every request, so the same fakes serve throughput baselines and
+failure drills (circuit breaker, retries).
+
+Run one standalone with::
+
+    python -m benchmarks.fake_panels --type 3x-ui --port 9101 --users 5000
+"""
+
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+
+GB = 1024**3
+
+
+def user_name(panel_type: str, index: int) -> str:
+    return f"{panel_type.replace('-', '')}user{index}"
+
+
+def admin_name(panel_type: str) -> str:
+    """The whale-panel admin that owns a fake panel's seeded users."""
+    return f"bench_{panel_type.replace('-', '')}"
+
+
+class FakePanel:
+    panel_type = ""
+
+    def __init__(
+        self,
+        users: int = 1000,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        owner: str = "bench",
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.owner = owner
+        self.random = random.Random(seed)
+        self.next_id = 1
+        self.users: dict[str, dict] = {}
+        for index in range(users):
+            self.add(self.generate(user_name(self.panel_type, index)))
+
+    def generate(self, name: str) -> dict:
+        raise NotImplementedError
+
+    def key(self, user: dict) -> str:
+        raise NotImplementedError
+
+    def add(self, user: dict) -> dict:
+        self.users[self.key(user)] = user
+        self.next_id += 1
+        return user
+
+    def routes(self) -> list[Route]:
+        raise NotImplementedError
+
+    def listing(self) -> object:
+        """The full user listing response body, as whale-panel fetches it."""
+        raise NotImplementedError
+
+    def chaos(self, handler):
+        async def wrapper(request: Request):
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if self.error_rate and self.random.random() < self.error_rate:
+                return JSONResponse({"success": False, "msg": "injected"}, 503)
+            return await handler(request)
+
+        return wrapper
+
+    def app(self) -> Starlette:
+        routes = [
+            Route(route.path, self.chaos(route.endpoint), methods=route.methods)
+            for route in self.routes()
+        ]
+        return Starlette(routes=routes)
+
+    def usage(self) -> tuple[int, int]:
+        return self.random.randint(0, 2 * GB), self.random.randint(0, 3 * GB)
+
+    @staticmethod
+    def expiry_ms() -> int:
+        return int((time.time() + 30 * 86400) * 1000)
+
+
+class SanaeiPanel(FakePanel):
+    """3x-ui ``/panel/api/clients`` API, authenticated with a bearer token."""
+
+    panel_type = "3x-ui"
+
+    def key(self, user):
+        return user["email"]
+
+    def generate(self, name):
+        up, down = self.usage()
+        return {
+            "id": self.next_id,
+            "uuid": str(uuid.uuid4()),
+            "email": name,
+            "enable": True,
+            "totalGB": 10 * GB,
+            "expiryTime": self.expiry_ms(),
+            "subId": uuid.uuid4().hex[:16],
+            "flow": "",
+            "traffic": {"up": up, "down": down},
+        }
+
+    def listing(self):
+        return {"success": True, "obj": list(self.users.values())}
+
+    def routes(self):
+        async def status(request):
+            return JSONResponse({"success": True, "obj": {"cpu": 1.0}})
+
+        async def clients(request):
+            return JSONResponse(self.listing())
+
+        async def last_online(request):
+            now = int(time.time() * 1000)
+            online = {email: now for email in list(self.users)[::10]}
+            return JSONResponse({"success": True, "obj": online})
+
+        async def get(request):
+            user = self.users.get(request.path_params["email"])
+            return JSONResponse({"success": True, "obj": user})
+
+        async def add(request):
+            client = (await request.json())["client"]
+            self.add(
+                {
+                    "id": self.next_id,
+                    "uuid": client["id"],
+                    "email": client["email"],
+                    "enable": client["enable"],
+                    "totalGB": client["totalGB"],
+                    "expiryTime": client["expiryTime"],
+                    "subId": client["subId"],
+                    "flow": client["flow"],
+                    "traffic": {"up": 0, "down": 0},
+                }
+            )
+            return JSONResponse({"success": True})
+
+        async def update(request):
+            user = self.users.get(request.path_params["email"])
+            if not user:
+                return JSONResponse({"success": False}, 404)
+            payload = await request.json()
+            user.update(
+                enable=payload["enable"],
+                totalGB=payload["totalGB"],
+                expiryTime=payload["expiryTime"],
+            )
+            return JSONResponse({"success": True})
+
+        async def reset(request):
+            user = self.users.get(request.path_params["email"])
+            if user:
+                user["traffic"] = {"up": 0, "down": 0}
+            return JSONResponse({"success": bool(user)})
+
+        async def delete(request):
+            user = self.users.pop(request.path_params["email"], None)
+            return JSONResponse({"success": bool(user)})
+
+        return [
+            Route("/panel/api/server/status", status),
+            Route("/panel/api/clients/list", clients),
+            Route("/panel/api/clients/lastOnline", last_online, methods=["POST"]),
+            Route("/panel/api/clients/get/{email}", get),
+            Route("/panel/api/clients/add", add, methods=["POST"]),
+            Route("/panel/api/clients/update/{email}", update, methods=["POST"]),
+            Route("/panel/api/clients/resetTraffic/{email}", reset, methods=["POST"]),
+            Route("/panel/api/clients/del/{email}", delete, methods=["POST"]),
+        ]
+
+
+class GuardPanel(FakePanel):
+    """Guard ``/api/subscriptions`` API, authenticated with an API key."""
+
+    panel_type = "guard"
+
+    def key(self, user):
+        return user["username"]
+
+    def generate(self, name):
+        return {
+            "id": self.next_id,
+            "username": name,
+            "is_active": True,
+            "is_online": self.random.random() < 0.1,
+            "limit_usage": 10 * GB,
+            "current_usage": sum(self.usage()),
+            "limit_expire": self.expiry_ms() // 1000,
+            "link": f"https://sub.example/{uuid.uuid4().hex}",
+        }
+
+    def listing(self):
+        return list(self.users.values())
+
+    def routes(self):
+        async def count(request):
+            return JSONResponse({"total": len(self.users)})
+
+        async def listing(request):
+            page = int(request.query_params.get("page", 0))
+            size = int(request.query_params.get("size", 1000))
+            users = list(self.users.values())[page * size : (page + 1) * size]
+            return JSONResponse(users)
+
+        async def create(request):
+            for item in await request.json():
+                user = self.generate(item["username"])
+                user.update(
+                    is_active=item["enabled"],
+                    limit_usage=item["limit_usage"],
+                    limit_expire=item["limit_expire"],
+                    current_usage=0,
+                )
+                self.add(user)
+            return JSONResponse({"success": True})
+
+        async def delete(request):
+            for username in (await request.json())["usernames"]:
+                self.users.pop(username, None)
+            return JSONResponse({"success": True})
+
+        async def single(request):
+            user = self.users.get(request.path_params["username"])
+            if not user:
+                return JSONResponse({"detail": "not found"}, 404)
+            if request.method == "PUT":
+                payload = await request.json()
+                user.update(
+                    limit_usage=payload["limit_usage"],
+                    limit_expire=payload["limit_expire"],
+                )
+            return JSONResponse(user)
+
+        def bulk(**changes):
+            async def handler(request):
+                for username in (await request.json())["usernames"]:
+                    if username in self.users:
+                        self.users[username].update(changes)
+                return JSONResponse({"success": True})
+
+            return handler
+
+        return [
+            Route("/api/subscriptions/count", count),
+            Route("/api/subscriptions", listing, methods=["GET"]),
+            Route("/api/subscriptions", create, methods=["POST"]),
+            Route("/api/subscriptions", delete, methods=["DELETE"]),
+            Route("/api/subscriptions/reset", bulk(current_usage=0), methods=["POST"]),
+            Route("/api/subscriptions/enable", bulk(is_active=True), methods=["POST"]),
+            Route("/api/subscriptions/disable", bulk(is_active=False), methods=["POST"]),
+            Route("/api/subscriptions/{username}", single, methods=["GET", "PUT"]),
+        ]
+
+
+class TxUIPanel(FakePanel):
+    """tx-ui ``/panel/api/inbounds`` API with a cookie session, one inbound."""
+
+    panel_type = "tx-ui"
+    inbound_id = 1
+    session = "bench-session"
+
+    def key(self, user):
+        return user["email"]
+
+    def generate(self, name):
+        up, down = self.usage()
+        return {
+            "id": str(uuid.uuid4()),
+            "subId": uuid.uuid4().hex[:16],
+            "email": name,
+            "flow": "",
+            "enable": True,
+            "totalGB": 10 * GB,
+            "expiryTime": self.expiry_ms(),
+            "up": up,
+            "down": down,
+        }
+
+    def listing(self):
+        users = list(self.users.values())
+        clients = [
+            {k: v for k, v in user.items() if k not in ("up", "down")} for user in users
+        ]
+        stats = [
+            {
+                "email": user["email"],
+                "up": user["up"],
+                "down": user["down"],
+                "total": user["totalGB"],
+            }
+            for user in users
+        ]
+        inbound = {
+            "id": self.inbound_id,
+            "settings": json.dumps({"clients": clients}),
+            "clientStats": stats,
+        }
+        return {"success": True, "obj": [inbound]}
+
+    def routes(self):
+        def authorized(handler):
+            async def wrapper(request):
+                if request.cookies.get("session") != self.session:
+                    return Response(status_code=404)
+                return await handler(request)
+
+            return wrapper
+
+        async def login(request):
+            response = JSONResponse({"success": True})
+            response.set_cookie("session", self.session)
+            return response
+
+        async def status(request):
+            return JSONResponse({"success": True, "obj": {"cpu": 1.0}})
+
+        async def inbounds(request):
+            return JSONResponse(self.listing())
+
+        async def onlines(request):
+            return JSONResponse({"success": True, "obj": list(self.users)[::10]})
+
+        async def add(request):
+            payload = await request.json()
+            for client in json.loads(payload["settings"])["clients"]:
+                self.add({**client, "up": 0, "down": 0})
+            return JSONResponse({"success": True})
+
+        async def update(request):
+            payload = await request.json()
+            for client in json.loads(payload["settings"])["clients"]:
+                user = self.users.get(client["email"])
+                if user:
+                    user.update(
+                        enable=client["enable"],
+                        totalGB=client["totalGB"],
+                        expiryTime=client["expiryTime"],
+                    )
+            return JSONResponse({"success": True})
+
+        async def delete(request):
+            client_id = request.path_params["uuid"]
+            email = next(
+                (e for e, user in self.users.items() if user["id"] == client_id), None
+            )
+            self.users.pop(email, None)
+            return JSONResponse({"success": email is not None})
+
+        async def reset(request):
+            user = self.users.get(request.path_params["email"])
+            if user:
+                user.update(up=0, down=0)
+            return JSONResponse({"success": bool(user)})
+
+        async def traffics(request):
+            user = self.users.get(request.path_params["email"])
+            if not user:
+                return JSONResponse({"success": True, "obj": None})
+            return JSONResponse(
+                {
+                    "success": True,
+                    "obj": {
+                        "email": user["email"],
+                        "up": user["up"],
+                        "down": user["down"],
+                        "total": user["totalGB"],
+                    },
+                }
+            )
+
+        api = "/panel/api/inbounds"
+        return [
+            Route("/login", login, methods=["POST"]),
+            Route("/panel/api/server/status", authorized(status)),
+            Route(f"{api}/list", authorized(inbounds)),
+            Route(f"{api}/onlines", authorized(onlines), methods=["POST"]),
+            Route(f"{api}/addClient", authorized(add), methods=["POST"]),
+            Route(f"{api}/updateClient/{{uuid}}", authorized(update), methods=["POST"]),
+            Route(f"{api}/{{id}}/delClient/{{uuid}}", authorized(delete), methods=["POST"]),
+            Route(
+                f"{api}/{{id}}/resetClientTraffic/{{email}}",
+                authorized(reset),
+                methods=["POST"],
+            ),
+            Route(f"{api}/getClientTraffics/{{email}}", authorized(traffics)),
+        ]
+
+
+class MarzbanPanel(FakePanel):
+    """Marzban ``/api`` with per-admin bearer tokens; ``sudo_username`` sees every user."""
+
+    panel_type = "marzban"
+    sudo_username = "bench-sudo"
+
+    def key(self, user):
+        return user["username"]
+
+    def generate(self, name):
+        return {
+            "username": name,
+            "status": "active",
+            "used_traffic": sum(self.usage()),
+            "data_limit": 10 * GB,
+            "expire": self.expiry_ms() // 1000,
+            "subscription_url": f"/sub/{uuid.uuid4().hex}",
+            "admin": {"username": self.owner},
+        }
+
+    def listing(self):
+        users = list(self.users.values())
+        return {"users": users, "total": len(users)}
+
+    def routes(self):
+        def caller(request) -> str | None:
+            header = request.headers.get("authorization", "")
+            return header.removeprefix("Bearer tok:") if header.startswith("Bearer tok:") else None
+
+        def visible(request, user) -> bool:
+            name = caller(request)
+            return name == self.sudo_username or user["admin"]["username"] == name
+
+        async def token(request):
+            form = await request.form()
+            return JSONResponse({"access_token": f"tok:{form['username']}"})
+
+        async def listing(request):
+            if caller(request) is None:
+                return JSONResponse({"detail": "unauthorized"}, 401)
+            params = request.query_params
+            users = [u for u in self.users.values() if visible(request, u)]
+            if params.get("search"):
+                users = [u for u in users if params["search"] in u["username"]]
+            if params.get("status"):
+                users = [u for u in users if u["status"] == params["status"]]
+            offset = int(params.get("offset", 0))
+            limit = params.get("limit")
+            page = users[offset : offset + int(limit)] if limit else users[offset:]
+            return JSONResponse({"users": page, "total": len(users)})
+
+        async def create(request):
+            payload = await request.json()
+            user = self.generate(payload["username"])
+            user.update(
+                used_traffic=0,
+                data_limit=payload["data_limit"],
+                expire=payload["expire"],
+                admin={"username": caller(request)},
+            )
+            self.add(user)
+            return JSONResponse(user)
+
+        async def single(request):
+            user = self.users.get(request.path_params["username"])
+            if not user or not visible(request, user):
+                return JSONResponse({"detail": "User not found"}, 404)
+            if request.method == "PUT":
+                payload = await request.json()
+                user.update(
+                    status=payload["status"],
+                    data_limit=payload["data_limit"],
+                    expire=payload["expire"],
+                )
+            elif request.method == "DELETE":
+                self.users.pop(user["username"])
+                return JSONResponse({"detail": "User successfully deleted"})
+            return JSONResponse(user)
+
+        async def reset(request):
+            user = self.users.get(request.path_params["username"])
+            if not user:
+                return JSONResponse({"detail": "User not found"}, 404)
+            user["used_traffic"] = 0
+            return JSONResponse(user)
+
+        async def inbounds(request):
+            return JSONResponse({"vless": [{"tag": "VLESS TCP", "protocol": "vless"}]})
+
+        return [
+            Route("/api/admin/token", token, methods=["POST"]),
+            Route("/api/users", listing),
+            Route("/api/user", create, methods=["POST"]),
+            Route("/api/user/{username}", single, methods=["GET", "PUT", "DELETE"]),
+            Route("/api/user/{username}/reset", reset, methods=["POST"]),
+            Route("/api/inbounds", inbounds),
+        ]
+
+
+PANELS: dict[str, type[FakePanel]] = {
+    panel.panel_type: panel for panel in (SanaeiPanel, GuardPanel, TxUIPanel, MarzbanPanel)
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a fake upstream panel")
+    parser.add_argument("--type", choices=sorted(PANELS), required=True)
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 503s")
+    parser.add_argument("--owner", default="bench", help="admin owning the seeded users")
+    args = parser.parse_args()
+
+    panel = PANELS[args.type](
+        users=args.users,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        owner=args.owner,
+    )
+    uvicorn.run(panel.app(), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Import-time report for the backend.
+
+Runs ``python -X importtime -c "import backend.app"`` in a fresh
+interpreter, ``--repeat`` times, and reports per module the median
+``self_ms`` (the module body alone) and ``cumulative_ms`` (with everything
+it imported first), plus totals per top-level package.
+
+    python -m benchmarks.imports --top 25 --output imports.json
+"""
+
+import os
+import re
+import sys
+import json
+import uuid
+import argparse
+import platform
+import statistics
+import subprocess
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def import_times(module: str, env: dict) -> list[tuple[str, int, int, int]]:
+    """(module, self_us, cumulative_us, depth) in the order imports finished."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"importing {module} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Per-module import timings")
+    parser.add_argument("--module", default="backend.app")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(ROOT),
+        "ADMIN_USERNAME": os.environ.get("ADMIN_USERNAME", "bench-superadmin"),
+        "ADMIN_PASSWORD": os.environ.get("ADMIN_PASSWORD", "bench-superadmin"),
+        "JWT_SECRET_KEY": os.environ.get("JWT_SECRET_KEY", uuid.uuid4().hex),
+    }
+
+    self_us, cumulative_us, totals = defaultdict(list), defaultdict(list), []
+    for _ in range(args.repeat):
+        rows = import_times(args.module, env)
+        for name, own, cumulative, _depth in rows:
+            self_us[name].append(own)
+            cumulative_us[name].append(cumulative)
+        totals.append(sum(cumulative for _, _, cumulative, depth in rows if depth == 0))
+
+    def ms(values: list[int]) -> float:
+        return round(statistics.median(values) / 1000, 2)
+
+    modules = sorted(
+        (
+            {
+                "module": name,
+                "self_ms": ms(self_us[name]),
+                "cumulative_ms": ms(cumulative_us[name]),
+            }
+            for name in self_us
+        ),
+        key=lambda row: row["self_ms"],
+        reverse=True,
+    )
+    packages = defaultdict(float)
+    for row in modules:
+        packages[row["module"].split(".")[0]] += row["self_ms"]
+    backend = sorted(
+        (row for row in modules if row["module"].startswith("backend")),
+        key=lambda row: row["cumulative_ms"],
+        reverse=True,
+    )
+
+    results = {
+        "total_ms": ms(totals),
+        "modules_imported": len(modules),
+        "packages": {
+            name: round(value, 2)
+            for name, value in sorted(packages.items(), key=lambda item: -item[1])[: args.top]
+        },
+        "slowest_modules": modules[: args.top],
+        "backend_modules": backend[: args.top],
+    }
+
+    print(f"{'total':32} {results['total_ms']:8.1f}ms", file=sys.stderr)
+    for name, value in list(results["packages"].items())[:10]:
+        print(f"{name:32} {value:8.1f}ms", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "module": args.module,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+"""End-to-end load test: the real app in front of fake upstream panels.
+
+For every panel type a fake upstream is started, a throwaway SQLite
+database is seeded with one panel and one admin owning ``--users`` users,
+and ``main.py`` is launched against it. Each scenario then runs for
+``--duration`` seconds at ``--concurrency`` parallel clients:
+
+* ``list``      - ``GET /admin/user``
+* ``dashboard`` - ``GET /dashboard/`` (the page the admin UI loads)
+* ``lifecycle`` - add, update, reset and delete of a fresh user
+
+Results are written as JSON, one entry per panel type and scenario, with
+throughput, latency percentiles per operation and the server's peak RSS.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import uuid
+import socket
+import asyncio
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+import psutil
+
+from benchmarks.fake_panels import PANELS, admin_name
+
+
+ROOT = Path(__file__).resolve().parent.parent
+SCENARIOS = ("list", "dashboard", "lifecycle")
+ADMIN_PASSWORD = "bench-password"
+GB = 1024**3
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values: list[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = math.ceil(percent / 100 * len(ordered)) - 1
+    return ordered[min(max(index, 0), len(ordered) - 1)]
+
+
+def wait_for(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def start_fake_panel(panel_type: str, port: int, args) -> subprocess.Popen:
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.fake_panels",
+            "--type",
+            panel_type,
+            "--port",
+            str(port),
+            "--users",
+            str(args.users),
+            "--latency",
+            str(args.latency),
+            "--error-rate",
+            str(args.error_rate),
+            "--owner",
+            admin_name(panel_type),
+        ],
+        cwd=ROOT,
+    )
+
+
+def seed_database(env: dict, panel_ports: dict[str, int], users: int) -> None:
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.seed",
+            "--panels",
+            json.dumps(panel_ports),
+            "--users",
+            str(users),
+            "--password",
+            ADMIN_PASSWORD,
+        ],
+        cwd=ROOT,
+        env=env,
+        check=True,
+    )
+
+
+class RSSSampler:
+    """Track the peak resident set size of a process tree."""
+
+    def __init__(self, pid: int):
+        self.process = psutil.Process(pid)
+        self.peak = 0
+
+    def sample(self) -> None:
+        try:
+            processes = [self.process, *self.process.children(recursive=True)]
+            rss = sum(p.memory_info().rss for p in processes)
+        except psutil.Error:
+            return
+        self.peak = max(self.peak, rss)
+
+    async def run(self, interval: float = 0.1) -> None:
+        while True:
+            self.sample()
+            await asyncio.sleep(interval)
+
+
+class Workload:
+    def __init__(self, client: httpx.AsyncClient, panel_type: str):
+        self.client = client
+        self.panel_type = panel_type
+        self.latencies: dict[str, list[float]] = {}
+        self.requests = 0
+        self.errors = 0
+
+    async def call(self, op: str, method: str, url: str, **kwargs) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            response = None
+        self.latencies.setdefault(op, []).append(time.perf_counter() - started)
+        self.requests += 1
+        if response is None or response.status_code >= 400 or not self._succeeded(response):
+            self.errors += 1
+            return None
+        return response
+
+    @staticmethod
+    def _succeeded(response: httpx.Response) -> bool:
+        body = response.json()
+        # GET /admin/user answers with [ResponseModel, users]
+        if isinstance(body, list):
+            body = body[0]
+        return not isinstance(body, dict) or body.get("success", True) is not False
+
+    async def list_users(self) -> None:
+        await self.call("list", "GET", "admin/user")
+
+    async def dashboard(self) -> None:
+        await self.call("dashboard", "GET", "dashboard/")
+
+    async def lifecycle(self) -> None:
+        email = f"load{uuid.uuid4().hex[:12]}"
+        client_id = str(uuid.uuid4())
+        expiry = int((time.time() + 30 * 86400) * 1000)
+        created = await self.call(
+            "add",
+            "POST",
+            "admin/user",
+            json={
+                "email": email,
+                "id": client_id,
+                "expiry_time": expiry,
+                "total": 5 * GB,
+                "sub_id": uuid.uuid4().hex[:16],
+            },
+        )
+        if created is None:
+            return
+
+        target = await self._user_key(email, client_id)
+        if target is None:
+            self.errors += 1
+            return
+
+        await self.call(
+            "update",
+            "PUT",
+            f"admin/user/{target}",
+            json={
+                "email": email,
+                "expiry_time": expiry,
+                "total": 6 * GB,
+                "sub_id": uuid.uuid4().hex[:16],
+            },
+        )
+        await self.call("reset", "PUT", f"admin/user/{email}/reset")
+        await self.call("delete", "DELETE", f"admin/user/{target}")
+
+    async def _user_key(self, email: str, client_id: str) -> str | None:
+        """The identifier the update and delete routes expect for this panel type."""
+        if self.panel_type in ("3x-ui", "tx-ui"):
+            return client_id
+        if self.panel_type == "marzban":
+            return email
+
+        # guard addresses users by its own numeric id
+        response = await self.call("lookup", "GET", "admin/user", params={"search": email})
+        users = response.json()[1] if response is not None else []
+        return str(users[0]["id"]) if users else None
+
+    async def run(self, scenario: str, concurrency: int, duration: float) -> float:
+        step = {
+            "list": self.list_users,
+            "dashboard": self.dashboard,
+            "lifecycle": self.lifecycle,
+        }[scenario]
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                await step()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - started
+
+    def summary(self) -> dict:
+        return {
+            op: {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50) * 1000, 2),
+                "p95_ms": round(percentile(values, 95) * 1000, 2),
+                "p99_ms": round(percentile(values, 99) * 1000, 2),
+                "max_ms": round(max(values) * 1000, 2),
+            }
+            for op, values in self.latencies.items()
+        }
+
+
+async def run_scenarios(base_url: str, server_pid: int, panel_types: list[str], args) -> list[dict]:
+    results = []
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    for panel_type in panel_types:
+        async with httpx.AsyncClient(
+            base_url=base_url,
+            limits=limits,
+            timeout=60.0,
+            # cleartext HTTP/2 needs prior knowledge, there is no ALPN to negotiate it
+            http1=not args.http2,
+            http2=args.http2,
+        ) as client:
+            login = await client.post(
+                "login",
+                data={"username": admin_name(panel_type), "password": ADMIN_PASSWORD},
+            )
+            login.raise_for_status()
+            token = login.json()["data"]["access_token"]
+            client.headers["Authorization"] = f"Bearer {token}"
+
+            for scenario in args.scenarios:
+                sampler = RSSSampler(server_pid)
+                sampling = asyncio.create_task(sampler.run())
+                workload = Workload(client, panel_type)
+                elapsed = await workload.run(scenario, args.concurrency, args.duration)
+                sampling.cancel()
+                sampler.sample()
+
+                result = {
+                    "panel_type": panel_type,
+                    "scenario": scenario,
+                    "users": args.users,
+                    "concurrency": args.concurrency,
+                    "duration_s": round(elapsed, 3),
+                    "requests": workload.requests,
+                    "errors": workload.errors,
+                    "throughput_rps": round(workload.requests / elapsed, 2),
+                    "latency": workload.summary(),
+                    "peak_rss_mb": round(sampler.peak / 1024**2, 1),
+                }
+                results.append(result)
+                print(
+                    f"{panel_type:8} {scenario:10} {result['throughput_rps']:>9} rps "
+                    f"errors={workload.errors} peak_rss={result['peak_rss_mb']}MB",
+                    file=sys.stderr,
+                )
+    return results
+
+
+def parse_server_env(pairs: list[str]) -> dict[str, str]:
+    env = {}
+    for pair in pairs:
+        key, sep, value = pair.partition("=")
+        if not sep:
+            raise SystemExit(f"--server-env expects KEY=VALUE, got {pair!r}")
+        env[key] = value
+    return env
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Load test whale-panel against fake panels")
+    parser.add_argument("--panels", nargs="+", choices=sorted(PANELS), default=sorted(PANELS))
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--users", type=int, default=1000, help="users per fake panel")
+    parser.add_argument("--latency", type=float, default=0.0, help="upstream latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of upstream 503s")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument("--port", type=int, default=0, help="app port, random when 0")
+    parser.add_argument(
+        "--http2", action="store_true", help="talk HTTP/2 to the app (SERVER=hypercorn)"
+    )
+    parser.add_argument(
+        "--server-env",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="extra environment for the app server, repeatable",
+    )
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    processes: list[subprocess.Popen] = []
+    server_log = None
+    with tempfile.TemporaryDirectory(prefix="whale-bench-") as workdir:
+        try:
+            panel_ports = {panel_type: free_port() for panel_type in args.panels}
+            for panel_type, port in panel_ports.items():
+                processes.append(start_fake_panel(panel_type, port, args))
+
+            app_port = args.port or free_port()
+            env = {
+                **os.environ,
+                "PYTHONPATH": str(ROOT),
+                "ADMIN_USERNAME": "bench-superadmin",
+                "ADMIN_PASSWORD": "bench-superadmin",
+                "JWT_SECRET_KEY": uuid.uuid4().hex,
+                "DATABASE_URL": f"sqlite:///{workdir}/walpanel.db",
+                "URLPATH": "bench",
+                "HOST": "127.0.0.1",
+                "PORT": str(app_port),
+                "HEALTH_PROBE_INTERVAL": "0",
+                # one admin per panel drives the whole load; the buckets are
+                # still checked on every request, just never run dry
+                "RATE_LIMIT_READS": "1000000",
+                "RATE_LIMIT_MUTATIONS": "1000000",
+                # the SQLite state used with WORKERS > 1; pass it along with
+                # STATE_BACKEND=redis in --server-env
+                "STATE_URL": f"{workdir}/state.db",
+                **parse_server_env(args.server_env),
+            }
+            seed_database(env, panel_ports, args.users)
+
+            for panel_type, port in panel_ports.items():
+                wait_for(f"http://127.0.0.1:{port}/")
+
+            server_log = open(Path(workdir) / "server.log", "w+", encoding="utf-8")
+            server = subprocess.Popen(
+                [sys.executable, "main.py"],
+                cwd=ROOT,
+                env=env,
+                stdout=server_log,
+                stderr=subprocess.STDOUT,
+            )
+            processes.append(server)
+            base_url = f"http://127.0.0.1:{app_port}/bench/"
+            wait_for(f"{base_url}ready")
+
+            results = asyncio.run(run_scenarios(base_url, server.pid, args.panels, args))
+        except Exception:
+            if server_log is not None:
+                server_log.seek(0)
+                print("".join(server_log.readlines()[-40:]), file=sys.stderr)
+            raise
+        finally:
+            for process in reversed(processes):
+                process.terminate()
+            for process in processes:
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+            if server_log is not None:
+                server_log.close()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "users": args.users,
+            "latency_s": args.latency,
+            "error_rate": args.error_rate,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "server_env": parse_server_env(args.server_env),
+            "http2": args.http2,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Microbenchmarks for the user listing hot path.
+
+Times, separately and per panel type, the CPU-bound steps of listing a
+large account:
+
+* ``build``       - decoded upstream structs into a ``UserStore``
+* ``filter``      - the admin's rows (ownership for 3x-ui/guard) plus a status filter
+* ``summary``     - the dashboard counts and totals over those rows
+* ``materialize`` - ``ClientsOutput`` for every selected row
+* ``encode``      - the response body, rendered by ``FastJSONResponse``
+
+Payloads are generated with the fake panels from the load test and
+decoded the way each task service's ``list_clients`` hands them to
+``get_all_users_from_panel``.
+
+    python -m benchmarks.micro --sizes 1000 10000 100000 --output micro.json
+"""
+
+import os
+import gc
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+# backend reads its settings at import time
+os.environ.setdefault("ADMIN_USERNAME", "bench")
+os.environ.setdefault("ADMIN_PASSWORD", "bench")
+os.environ.setdefault("JWT_SECRET_KEY", "bench")
+
+from backend.schema.output import ResponseModel
+from backend.utils.responses import FastJSONResponse
+from backend.services.user_store import (
+    build_guard_store,
+    build_marzban_store,
+    build_sanaei_store,
+    build_txui_store,
+)
+from benchmarks.fake_panels import PANELS, admin_name, user_name
+from benchmarks.payloads import listing_body, typed_clients
+
+
+def build_store(panel_type: str, clients: list, owners: dict[str, str]):
+    if panel_type == "3x-ui":
+        return build_sanaei_store(clients, owners)
+    if panel_type == "guard":
+        return build_guard_store(clients, owners)
+    if panel_type == "tx-ui":
+        return build_txui_store(clients)
+    return build_marzban_store(clients)
+
+
+def select(store, panel_type: str) -> list[int]:
+    if panel_type in ("3x-ui", "guard"):
+        rows = store.owned_by(admin_name(panel_type))
+    else:
+        rows = store.all()
+    return store.with_status("active", rows)
+
+
+def encode(response) -> bytes:
+    return FastJSONResponse(response).body
+
+
+def retained_mb(func) -> float:
+    """Memory still held by what ``func`` returns."""
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return round(retained / 1024**2, 2)
+
+
+def measure(func, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return {
+        "min_ms": round(min(timings) * 1000, 3),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "max_ms": round(max(timings) * 1000, 3),
+    }
+
+
+def run(panel_type: str, size: int, repeat: int) -> dict:
+    payload = typed_clients(panel_type, listing_body(panel_type, size))
+    # every other user belongs to some other admin
+    owner = admin_name(panel_type)
+    owners = {
+        name: owner if index % 2 else "other"
+        for index, name in enumerate(user_name(panel_type, i) for i in range(size))
+    }
+    store = build_store(panel_type, payload, owners)
+    rows = select(store, panel_type)
+    clients = store.rows(rows)
+    result = {"panel_type": panel_type, "clients": size, "selected": len(rows)}
+
+    result["build"] = measure(lambda: build_store(panel_type, payload, owners), repeat)
+    result["filter"] = measure(lambda: select(store, panel_type), repeat)
+    result["summary"] = measure(lambda: store.summary(rows), repeat)
+    result["materialize"] = measure(lambda: store.rows(rows), repeat)
+
+    response = (
+        ResponseModel(success=True, message="Users retrieved successfully", data=clients),
+        clients,
+    )
+    body = encode(response)
+    result["encode"] = measure(lambda: encode(response), repeat)
+    result["response_bytes"] = len(body)
+    result["memory_mb"] = {
+        "store": retained_mb(lambda: build_store(panel_type, payload, owners)),
+        "models": retained_mb(lambda: store.rows(store.all())),
+    }
+    return result
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Normalization and encoding microbenchmarks")
+    parser.add_argument("--panels", nargs="+", choices=sorted(PANELS), default=sorted(PANELS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        for panel_type in args.panels:
+            result = run(panel_type, size, args.repeat)
+            results.append(result)
+            steps = " ".join(
+                f"{step}={result[step]['median_ms']}ms"
+                for step in ("build", "filter", "summary", "materialize", "encode")
+            )
+            memory = " ".join(f"{k}={v}MB" for k, v in result["memory_mb"].items())
+            print(f"{panel_type:8} {size:>7} {steps} {memory}", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
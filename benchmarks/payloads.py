@@ -0,0 +1,78 @@
+"""Generated upstream payloads shared by the microbenchmarks."""
+
+import json
+import random
+
+from backend.services.decoders import (
+    decode_guard_subscriptions,
+    decode_marzban_users_page,
+    decode_sanaei_clients,
+    decode_txui_clients,
+    decode_txui_inbounds,
+    read_guard_subscriptions,
+    read_marzban_users_page,
+    read_sanaei_clients,
+    read_txui_clients,
+    read_txui_inbounds,
+)
+from benchmarks.fake_panels import PANELS, admin_name
+
+
+def listing_body(panel_type: str, size: int) -> bytes:
+    """Raw response body of the panel's user listing with ``size`` users."""
+    panel = PANELS[panel_type](users=size, owner=admin_name(panel_type))
+    return json.dumps(panel.listing()).encode("utf-8")
+
+
+def typed_clients(panel_type: str, body: bytes) -> list:
+    """Decode a listing body the way each task service's ``list_clients`` does."""
+    rng = random.Random(len(body))
+
+    if panel_type == "3x-ui":
+        clients = decode_sanaei_clients(body)
+        for client in clients:
+            client.is_online = rng.random() < 0.1
+        return clients
+
+    if panel_type == "guard":
+        return decode_guard_subscriptions(body)
+
+    if panel_type == "tx-ui":
+        inbound = decode_txui_inbounds(body)[0]
+        clients = decode_txui_clients(inbound.settings)
+        stats = {stat.email: stat for stat in inbound.client_stats or []}
+        for client in clients:
+            stat = stats.get(client.email)
+            if stat:
+                client.up, client.down = stat.up or 0, stat.down or 0
+            client.is_online = rng.random() < 0.1
+        return clients
+
+    return decode_marzban_users_page(body).users
+
+
+async def read_clients(panel_type: str, body: bytes) -> list:
+    """``typed_clients`` through the async readers the request path uses."""
+    rng = random.Random(len(body))
+
+    if panel_type == "3x-ui":
+        clients = await read_sanaei_clients(body)
+        for client in clients:
+            client.is_online = rng.random() < 0.1
+        return clients
+
+    if panel_type == "guard":
+        return await read_guard_subscriptions(body)
+
+    if panel_type == "tx-ui":
+        inbound = (await read_txui_inbounds(body))[0]
+        clients = await read_txui_clients(inbound.settings)
+        stats = {stat.email: stat for stat in inbound.client_stats or []}
+        for client in clients:
+            stat = stats.get(client.email)
+            if stat:
+                client.up, client.down = stat.up or 0, stat.down or 0
+            client.is_online = rng.random() < 0.1
+        return clients
+
+    return (await read_marzban_users_page(body)).users
@@ -0,0 +1,145 @@
+"""Response encoding benchmark: FastAPI's default path against ``FastJSONResponse``.
+
+Encodes the ``GET /admin/user`` and admin ``GET /dashboard/`` payloads for
+``--clients`` users both ways:
+
+* ``default`` - ``jsonable_encoder`` then ``JSONResponse.render`` (stdlib ``json``)
+* ``fast``    - ``FastJSONResponse.render`` on the models as returned
+
+and checks that both produce the same document.
+
+    python -m benchmarks.responses --clients 1000 50000 --output responses.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+from datetime import datetime
+from pathlib import Path
+
+# backend reads its settings at import time
+os.environ.setdefault("ADMIN_USERNAME", "bench")
+os.environ.setdefault("ADMIN_PASSWORD", "bench")
+os.environ.setdefault("JWT_SECRET_KEY", "bench")
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from backend.schema.output import ResponseModel
+from backend.utils.responses import FastJSONResponse
+from benchmarks.fake_panels import PANELS
+from benchmarks.micro import build_store
+from benchmarks.payloads import listing_body, typed_clients
+
+
+def user_payload(store):
+    clients = store.rows(store.all())
+    return (
+        ResponseModel(success=True, message="Users retrieved successfully", data=clients),
+        clients,
+    )
+
+
+def dashboard_payload(store):
+    rows = store.all()
+    return ResponseModel(
+        success=True,
+        message="Data retrieved successfully",
+        data={
+            "remaining_traffic": 1024**4,
+            "initial_traffic": 1024**4,
+            "expiry_time": datetime(2030, 1, 1),
+            "news": ["maintenance on friday"],
+            "sub_url": "https://sub.example.com",
+            "users": store.rows(rows),
+            "summary": store.summary(rows),
+        },
+    )
+
+
+def default_render(content) -> bytes:
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def fast_render(content) -> bytes:
+    return FastJSONResponse(content).body
+
+
+def measure(func, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return {
+        "min_ms": round(min(timings) * 1000, 3),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+    }
+
+
+def run(panel_type: str, size: int, repeat: int) -> list[dict]:
+    store = build_store(panel_type, typed_clients(panel_type, listing_body(panel_type, size)), {})
+    results = []
+    for endpoint, payload in (("user", user_payload(store)), ("dashboard", dashboard_payload(store))):
+        default_body, fast_body = default_render(payload), fast_render(payload)
+        if json.loads(default_body) != json.loads(fast_body):
+            raise SystemExit(f"{panel_type} {endpoint}: encoders disagree")
+
+        default = measure(lambda: default_render(payload), repeat)
+        fast = measure(lambda: fast_render(payload), repeat)
+        results.append(
+            {
+                "panel_type": panel_type,
+                "endpoint": endpoint,
+                "clients": size,
+                "response_bytes": len(fast_body),
+                "default": default,
+                "fast": fast,
+                "speedup": round(default["median_ms"] / fast["median_ms"], 1),
+            }
+        )
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Default vs fast JSON response encoding")
+    parser.add_argument("--panels", nargs="+", choices=sorted(PANELS), default=sorted(PANELS))
+    parser.add_argument("--clients", nargs="+", type=int, default=[1_000, 50_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.clients:
+        for panel_type in args.panels:
+            for result in run(panel_type, size, args.repeat):
+                results.append(result)
+                print(
+                    f"{panel_type:8} {result['endpoint']:9} {size:>7} default "
+                    f"{result['default']['median_ms']}ms | fast "
+                    f"{result['fast']['median_ms']}ms ({result['speedup']}x)",
+                    file=sys.stderr,
+                )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
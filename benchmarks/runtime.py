@@ -0,0 +1,153 @@
+"""Server runtime matrix: the load test against each SERVER/LOOP/HTTP_PARSER.
+
+Every runtime in ``RUNTIMES`` (optionally crossed with ``--workers``) runs
+the end-to-end load test from ``benchmarks.load`` with the matching
+``--server-env``; ``hypercorn-uvloop-h2`` also switches the client to HTTP/2.
+Runtimes whose packages are missing are skipped. The report keeps every
+load-test result and ranks the runtimes by overall throughput.
+
+    python -m benchmarks.runtime --workers 1 2 --duration 5 --output runtime.json
+
+Anything after ``--`` is passed to the load test as is, e.g.
+``-- --server-env KEEP_ALIVE_TIMEOUT=30 --server-env BACKLOG=4096``.
+"""
+
+import os
+import sys
+import json
+import argparse
+import platform
+import tempfile
+import importlib.util
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks import load
+
+
+# name -> (server environment, client speaks HTTP/2)
+RUNTIMES = {
+    "uvicorn-asyncio-h11": ({"LOOP": "asyncio", "HTTP_PARSER": "h11"}, False),
+    "uvicorn-uvloop-h11": ({"LOOP": "uvloop", "HTTP_PARSER": "h11"}, False),
+    "uvicorn-asyncio-httptools": ({"LOOP": "asyncio", "HTTP_PARSER": "httptools"}, False),
+    "uvicorn-uvloop-httptools": ({"LOOP": "uvloop", "HTTP_PARSER": "httptools"}, False),
+    "hypercorn-asyncio": ({"SERVER": "hypercorn", "LOOP": "asyncio"}, False),
+    "hypercorn-uvloop": ({"SERVER": "hypercorn", "LOOP": "uvloop"}, False),
+    "hypercorn-uvloop-h2": ({"SERVER": "hypercorn", "LOOP": "uvloop"}, True),
+}
+PACKAGES = {"SERVER": {"hypercorn": "hypercorn"}, "LOOP": {"uvloop": "uvloop"}}
+
+
+def missing_packages(env: dict[str, str], http2: bool) -> list[str]:
+    needed = [PACKAGES.get(key, {}).get(value) for key, value in env.items()]
+    if env.get("HTTP_PARSER") == "httptools":
+        needed.append("httptools")
+    if http2:
+        needed.append("h2")
+    return [name for name in needed if name and importlib.util.find_spec(name) is None]
+
+
+def overall(results: list[dict]) -> dict:
+    requests = sum(result["requests"] for result in results)
+    errors = sum(result["errors"] for result in results)
+    duration = sum(result["duration_s"] for result in results)
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / duration, 2) if duration else 0.0,
+        "peak_rss_mb": max((result["peak_rss_mb"] for result in results), default=0.0),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    load_args = []
+    if "--" in argv:
+        argv, load_args = argv[: argv.index("--")], argv[argv.index("--") + 1 :]
+
+    parser = argparse.ArgumentParser(description="Load test every server runtime")
+    parser.add_argument("--runtimes", nargs="+", choices=sorted(RUNTIMES), default=list(RUNTIMES))
+    parser.add_argument("--workers", nargs="+", type=int, default=[1])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per scenario")
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    runs, skipped = [], {}
+    with tempfile.TemporaryDirectory(prefix="whale-runtime-") as workdir:
+        for name in args.runtimes:
+            env, http2 = RUNTIMES[name]
+            missing = missing_packages(env, http2)
+            if missing:
+                skipped[name] = f"not installed: {', '.join(missing)}"
+                print(f"{name:28} skipped, {skipped[name]}", file=sys.stderr)
+                continue
+
+            for workers in args.workers:
+                print(f"{name} workers={workers}", file=sys.stderr)
+                output = Path(workdir) / f"{name}-{workers}.json"
+                server_env = {**env, "WORKERS": str(workers)}
+                # the runtime's own options last, they win over load_args
+                load.main(
+                    [
+                        *load_args,
+                        "--users", str(args.users),
+                        "--concurrency", str(args.concurrency),
+                        "--duration", str(args.duration),
+                        "--output", str(output),
+                        *(["--http2"] if http2 else []),
+                        *(arg for key, value in server_env.items()
+                          for arg in ("--server-env", f"{key}={value}")),
+                    ]
+                )
+                results = json.loads(output.read_text(encoding="utf-8"))["results"]
+                runs.append(
+                    {
+                        "runtime": name,
+                        "workers": workers,
+                        "server_env": server_env,
+                        "http2": http2,
+                        "overall": overall(results),
+                        "results": results,
+                    }
+                )
+
+    ranking = sorted(runs, key=lambda run: run["overall"]["throughput_rps"], reverse=True)
+    print("", file=sys.stderr)
+    for run in ranking:
+        summary = run["overall"]
+        print(
+            f"{run['runtime']:28} workers={run['workers']} "
+            f"{summary['throughput_rps']:>9} rps errors={summary['errors']} "
+            f"peak_rss={summary['peak_rss_mb']}MB",
+            file=sys.stderr,
+        )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "users": args.users,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "load_args": load_args,
+            "skipped": skipped,
+        },
+        "results": [
+            {"runtime": run["runtime"], "workers": run["workers"], **run["overall"]}
+            for run in ranking
+        ],
+        "runs": runs,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Seed a throwaway database for the load test.
+
+Runs in its own process because ``backend`` reads its settings and
+``DATABASE_URL`` from the environment at import time.
+"""
+
+import json
+import argparse
+from datetime import datetime
+
+from backend.db.engin import Base, engin, sessionLocal
+from backend.db.model import Admins, Panels, SanaeiUsers
+from backend.auth.hash import hash_password
+from benchmarks.fake_panels import MarzbanPanel, admin_name, user_name
+
+
+GB = 1024**3
+
+
+def seed(panel_ports: dict[str, int], users: int, password: str) -> None:
+    """One panel and one admin per panel type, plus ownership rows for the seeded users."""
+    Base.metadata.create_all(engin)
+    db = sessionLocal()
+    hashed_password = hash_password(password)
+    try:
+        for panel_type, port in panel_ports.items():
+            admin = admin_name(panel_type)
+            db.add(
+                Panels(
+                    panel_type=panel_type,
+                    name=panel_type,
+                    url=f"http://127.0.0.1:{port}",
+                    username=MarzbanPanel.sudo_username,
+                    password="bench",
+                    token="bench",
+                    is_active=True,
+                )
+            )
+            db.add(
+                Admins(
+                    username=admin,
+                    hashed_password=hashed_password,
+                    is_active=True,
+                    panel=panel_type,
+                    inbound_id="1",
+                    marzban_password="bench",
+                    marzban_inbounds=json.dumps({"vless": ["VLESS TCP"]}),
+                    traffic=100_000 * GB,
+                    initial_traffic=100_000 * GB,
+                    expiry_date=datetime(2100, 1, 1),
+                )
+            )
+            # 3x-ui and guard ownership lives in our own table
+            if panel_type in ("3x-ui", "guard"):
+                db.bulk_save_objects(
+                    [
+                        SanaeiUsers(username=user_name(panel_type, index), owner=admin)
+                        for index in range(users)
+                    ]
+                )
+        db.commit()
+    finally:
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Seed the load test database")
+    parser.add_argument("--panels", required=True, help='JSON object {"panel_type": port}')
+    parser.add_argument("--users", type=int, required=True)
+    parser.add_argument("--password", required=True)
+    args = parser.parse_args()
+    seed(json.loads(args.panels), args.users, args.password)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Startup benchmark: migration check against alembic, and time to ready.
+
+Against a temporary SQLite database this times
+
+* ``alembic_upgrade``  - ``alembic upgrade head`` on a database already at head,
+  what the entrypoint used to run on every start
+* ``migration_check``  - ``backend/db/migration_check.py``, what it runs now
+* ``time_to_ready``    - from spawning ``main.py`` until ``/<URLPATH>/ready``
+  answers 200
+
+    python -m benchmarks.startup --repeat 5 --output startup.json
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+from benchmarks.load import free_port
+
+ROOT = Path(__file__).resolve().parent.parent
+BACKEND = ROOT / "backend"
+
+
+def alembic_ini(workdir: Path, db_path: Path) -> Path:
+    """A copy of alembic.ini pointing at ``db_path``."""
+    source = (BACKEND / "alembic.ini").read_text(encoding="utf-8")
+    ini = workdir / "alembic.ini"
+    ini.write_text(
+        source.replace("sqlite:///../data/walpanel.db", f"sqlite:///{db_path}")
+        .replace("script_location = alembic", f"script_location = {BACKEND / 'alembic'}"),
+        encoding="utf-8",
+    )
+    return ini
+
+
+def timed(command: list[str], **kwargs) -> float:
+    started = time.perf_counter()
+    subprocess.run(command, check=False, capture_output=True, **kwargs)
+    return time.perf_counter() - started
+
+
+def time_to_ready(env: dict, port: int, timeout: float = 60.0) -> float:
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "main.py"],
+        cwd=ROOT,
+        env={**env, "PORT": str(port)},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        url = f"http://127.0.0.1:{port}/{env['URLPATH']}/ready"
+        while time.perf_counter() - started < timeout:
+            try:
+                if httpx.get(url, timeout=1.0).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.02)
+        raise RuntimeError(f"server not ready within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def summarize(timings: list[float]) -> dict:
+    return {
+        "min_ms": round(min(timings) * 1000, 1),
+        "median_ms": round(statistics.median(timings) * 1000, 1),
+        "max_ms": round(max(timings) * 1000, 1),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Startup and migration check timings")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="whale-startup-") as workdir:
+        workdir = Path(workdir)
+        db_path = workdir / "walpanel.db"
+        ini = alembic_ini(workdir, db_path)
+        alembic = [sys.executable, "-m", "alembic", "-c", str(ini), "upgrade", "head"]
+        check = [sys.executable, str(BACKEND / "db" / "migration_check.py"), str(ini)]
+
+        initial = timed(alembic, cwd=BACKEND)
+        if subprocess.run(check, capture_output=True).returncode != 0:
+            raise SystemExit("migration check does not see the database at head")
+
+        env = {
+            **os.environ,
+            "PYTHONPATH": str(ROOT),
+            "ADMIN_USERNAME": "bench-superadmin",
+            "ADMIN_PASSWORD": "bench-superadmin",
+            "JWT_SECRET_KEY": uuid.uuid4().hex,
+            "DATABASE_URL": f"sqlite:///{db_path}",
+            "URLPATH": "bench",
+            "HOST": "127.0.0.1",
+            "HEALTH_PROBE_INTERVAL": "0",
+        }
+        results = {
+            "initial_migration_ms": round(initial * 1000, 1),
+            "alembic_upgrade": summarize(
+                [timed(alembic, cwd=BACKEND) for _ in range(args.repeat)]
+            ),
+            "migration_check": summarize([timed(check) for _ in range(args.repeat)]),
+            "time_to_ready": summarize(
+                [time_to_ready(env, free_port()) for _ in range(args.repeat)]
+            ),
+        }
+
+    for step in ("alembic_upgrade", "migration_check", "time_to_ready"):
+        print(f"{step:16} {results[step]['median_ms']}ms", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
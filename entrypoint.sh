@@ -1,17 +1,15 @@
 #!/bin/bash
 set -e
 
-URLPATH=${URLPATH:-dashboard}
-
-echo "Replacing frontend URL path with: $URLPATH"
+cd /app
 
-find /app/frontend/dist -type f \( -name "*.js" -o -name "*.css" -o -name "*.html" \) \
-    -exec sed -i "s|__URLPATH__|$URLPATH|g" {} +
+# URLPATH is applied to the frontend in memory when the server starts
 
-echo "Running migrations..."
-cd /app/backend
-uv run alembic upgrade head
+echo "Checking migrations..."
+if ! uv run --no-sync python backend/db/migration_check.py; then
+    echo "Running migrations..."
+    (cd backend && uv run --no-sync alembic upgrade head)
+fi
 
 echo "Starting server..."
-cd /app
-exec uv run python main.py
\ No newline at end of file
+exec uv run --no-sync python main.py
@@ -1,6 +1,6 @@
 import { useEffect, useState } from 'react'
 import { Navigate } from 'react-router-dom'
-import { isTokenValid, getUserRole } from '@/lib/auth'
+import { isTokenValid, getUserRole, refreshAccessToken } from '@/lib/auth'
 
 interface ProtectedRouteProps {
     children: React.ReactNode
@@ -13,7 +13,8 @@ export function ProtectedRoute({ children, allowedRoles }: ProtectedRouteProps)
 
     useEffect(() => {
         const checkToken = async () => {
-            const valid = isTokenValid()
+            // access tokens are short lived, renew an expired one before sending to login
+            const valid = isTokenValid() || (await refreshAccessToken()) !== null
             setIsValid(valid)
 
             if (valid && allowedRoles && allowedRoles.length > 0) {
@@ -1,9 +1,9 @@
-import axios, { AxiosInstance, AxiosError } from 'axios'
-import { getToken, removeToken } from './auth'
+import axios, { AxiosInstance, AxiosError, InternalAxiosRequestConfig } from 'axios'
+import { getToken, removeToken, refreshAccessToken } from './auth'
 
 let apiClient: AxiosInstance | null = null
 
-function getBaseURL(): string {
+export function getBaseURL(): string {
     // URL_PREFIX is configurable (e.g., "dashboard" from .env)
     // Final URL structure: {host}/{URL_PREFIX}/{endpoint}
     const urlPrefix = import.meta.env.VITE_URL_PREFIX || 'dashboard'
@@ -18,7 +18,9 @@ function getBaseURL(): string {
     // For development: use environment variable or default
     const apiBaseURL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000'
     return `${apiBaseURL}/${urlPrefix}`
-} export function initializeApiClient(): AxiosInstance {
+}
+
+export function initializeApiClient(): AxiosInstance {
     if (apiClient) return apiClient
 
     apiClient = axios.create({
@@ -45,9 +47,18 @@ function getBaseURL(): string {
     // Response interceptor
     apiClient.interceptors.response.use(
         (response) => response,
-        (error: AxiosError) => {
-            // Handle 401 Unauthorized
+        async (error: AxiosError) => {
+            // Handle 401 Unauthorized: renew the session once, then give up
+            const request = error.config as (InternalAxiosRequestConfig & { _retried?: boolean }) | undefined
             if (error.response?.status === 401) {
+                if (request && !request._retried && !request.url?.endsWith('/login')) {
+                    request._retried = true
+                    const token = await refreshAccessToken()
+                    if (token) {
+                        request.headers.Authorization = `Bearer ${token}`
+                        return apiClient!(request)
+                    }
+                }
                 removeToken()
                 window.location.href = '/login'
             }
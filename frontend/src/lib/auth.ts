@@ -1,8 +1,12 @@
+import axios from 'axios'
 import Cookies from 'js-cookie'
 import { jwtDecode } from 'jwt-decode'
-import { DecodedToken } from '@/types'
+import { DecodedToken, LoginResponse, ResponseModel } from '@/types'
+import { getBaseURL } from './api-client'
 
 const TOKEN_KEY = 'access_token'
+const REFRESH_TOKEN_KEY = 'refresh_token'
+const REFRESH_LOCK = 'walpanel-refresh'
 
 export function getToken(): string | undefined {
     return Cookies.get(TOKEN_KEY)
@@ -19,6 +23,61 @@ export function setToken(token: string): void {
 
 export function removeToken(): void {
     Cookies.remove(TOKEN_KEY)
+    Cookies.remove(REFRESH_TOKEN_KEY)
+}
+
+export function getRefreshToken(): string | undefined {
+    return Cookies.get(REFRESH_TOKEN_KEY)
+}
+
+export function setSession(session: LoginResponse): void {
+    setToken(session.access_token)
+    Cookies.set(REFRESH_TOKEN_KEY, session.refresh_token, {
+        secure: window.location.protocol === 'https:',
+        sameSite: 'strict',
+        expires: 30,
+    })
+}
+
+let refreshing: Promise<string | null> | null = null
+
+async function rotateSession(staleToken: string | undefined): Promise<string | null> {
+    // Another tab may have rotated the session while this one waited for the
+    // lock, the cookies are shared so its access token is ours to reuse.
+    const current = getToken()
+    if (current && current !== staleToken && isTokenValid()) return current
+
+    const refreshToken = getRefreshToken()
+    if (!refreshToken) return null
+    try {
+        const response = await axios.post<ResponseModel<LoginResponse>>(
+            `${getBaseURL()}/refresh`,
+            { refresh_token: refreshToken }
+        )
+        if (!response.data.success || !response.data.data) return null
+        setSession(response.data.data)
+        return response.data.data.access_token
+    } catch {
+        return null
+    }
+}
+
+/**
+ * Trade the refresh token for a new session, returns the new access token
+ * or null when the session is gone. Refresh tokens are single use and a
+ * reused one revokes the whole session, so concurrent callers share one
+ * request and tabs take turns through a Web Lock.
+ */
+export function refreshAccessToken(): Promise<string | null> {
+    if (!refreshing) {
+        const staleToken = getToken()
+        const rotate = () => rotateSession(staleToken)
+        refreshing = (navigator.locks ? navigator.locks.request(REFRESH_LOCK, rotate) : rotate())
+            .finally(() => {
+                refreshing = null
+            })
+    }
+    return refreshing
 }
 
 export function getDecodedToken(): DecodedToken | null {
@@ -61,6 +120,11 @@ export function getPanel(): string | null {
 }
 
 export function logout(): void {
+    const refreshToken = getRefreshToken()
+    if (refreshToken) {
+        // best effort, the session also expires on its own
+        axios.post(`${getBaseURL()}/logout`, { refresh_token: refreshToken }).catch(() => undefined)
+    }
     removeToken()
     window.location.href = import.meta.env.BASE_URL + 'login'
 }
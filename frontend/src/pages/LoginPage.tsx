@@ -4,7 +4,7 @@ import { useForm } from 'react-hook-form'
 import { zodResolver } from '@hookform/resolvers/zod'
 import { loginSchema, LoginFormData } from '@/types'
 import { authAPI } from '@/lib/api'
-import { setToken, getDecodedToken, isTokenValid } from '@/lib/auth'
+import { setSession, getDecodedToken, isTokenValid } from '@/lib/auth'
 import { Button } from '@/components/ui/button'
 import { Input } from '@/components/ui/input'
 import { Label } from '@/components/ui/label'
@@ -37,8 +37,8 @@ export function LoginPage() {
         try {
             const response = await authAPI.login(data.username, data.password)
 
-            // Store token
-            setToken(response.access_token)
+            // Store the access and refresh tokens
+            setSession(response)
 
             // Decode token to get role
             const decoded = getDecodedToken()
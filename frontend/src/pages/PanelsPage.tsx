@@ -282,6 +282,11 @@ function PanelDetailsRow({
                     <Badge variant={panel.is_active ? 'default' : 'destructive'}>
                         {panel.is_active ? 'Active' : 'Inactive'}
                     </Badge>
+                    {panel.breaker && panel.breaker.state !== 'closed' && (
+                        <Badge variant="destructive" className="ml-2" title={panel.breaker.last_error ?? ''}>
+                            {panel.breaker.state === 'open' ? 'Unreachable' : 'Recovering'}
+                        </Badge>
+                    )}
                 </TableCell>
                 <TableCell className="text-right space-x-2">
                     <Button size="sm" variant="ghost" onClick={onToggleStatus}>
@@ -354,6 +359,11 @@ function MobilePanelCard({
                     <Badge variant={panel.is_active ? 'default' : 'destructive'} className="text-xs">
                         {panel.is_active ? 'Active' : 'Inactive'}
                     </Badge>
+                    {panel.breaker && panel.breaker.state !== 'closed' && (
+                        <Badge variant="destructive" className="text-xs">
+                            {panel.breaker.state === 'open' ? 'Unreachable' : 'Recovering'}
+                        </Badge>
+                    )}
                     <ChevronDown
                         className={cn(
                             'h-4 w-4 text-muted-foreground transition-transform',
@@ -195,6 +195,33 @@ export interface PanelOutput {
     name: string
     url: string
     is_active: boolean
+    breaker?: {
+        state: 'closed' | 'open' | 'half_open'
+        failures: number
+        retry_after: number
+        last_error: string | null
+    } | null
+    retries?: {
+        retries: number
+        exhausted: number
+    } | null
+    health?: {
+        healthy: boolean | null
+        samples: number
+        unreached?: number
+        error_rate?: number
+        p50_ms?: number
+        p95_ms?: number
+        p99_ms?: number
+        last_checked?: number
+    } | null
+    concurrency?: {
+        limit: number
+        inflight: number
+        queued: number
+        latency_ms: number
+        slowdown: number
+    } | null
 }
 
 // User Form
@@ -240,6 +267,7 @@ export interface ResponseModel<T = any> {
 
 export interface LoginResponse {
     access_token: string
+    refresh_token: string
     token_type: string
 }
 
@@ -1,17 +1,74 @@
-import uvicorn
 from backend.config import config
-from backend import app
+from backend.utils.logger import logger
+
+APP = "backend.app:app"
+
+
+def uvloop_available() -> bool:
+    try:
+        import uvloop  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def run_uvicorn():
+    import uvicorn
 
-def main():
     uvicorn.run(
-        app="backend.app:app",
+        app=APP,
         host=config.HOST,
         port=config.PORT,
         ssl_keyfile=config.SSL_KEYFILE,
         ssl_certfile=config.SSL_CERTFILE,
         reload=True if config.DEBUG else False,
+        # uvicorn can't reload and run several workers at once
+        workers=1 if config.DEBUG else config.WORKERS,
+        loop=config.LOOP,
+        http=config.HTTP_PARSER,
+        backlog=config.BACKLOG,
+        timeout_keep_alive=config.KEEP_ALIVE_TIMEOUT,
+        limit_concurrency=config.LIMIT_CONCURRENCY,
+        timeout_graceful_shutdown=config.SHUTDOWN_TIMEOUT,
     )
-    
+
+
+def run_hypercorn():
+    # HTTP/2: negotiated with ALPN over TLS, h2c upgrade or prior knowledge without
+    try:
+        from hypercorn.config import Config
+        from hypercorn.run import run
+    except ImportError as error:
+        raise RuntimeError(
+            "SERVER=hypercorn needs the hypercorn package: uv sync --extra http2"
+        ) from error
+
+    hypercorn_config = Config()
+    hypercorn_config.application_path = APP
+    hypercorn_config.bind = [f"{config.HOST}:{config.PORT}"]
+    hypercorn_config.workers = config.WORKERS
+    hypercorn_config.backlog = config.BACKLOG
+    hypercorn_config.keep_alive_timeout = config.KEEP_ALIVE_TIMEOUT
+    hypercorn_config.graceful_timeout = config.SHUTDOWN_TIMEOUT
+    hypercorn_config.keyfile = config.SSL_KEYFILE
+    hypercorn_config.certfile = config.SSL_CERTFILE
+    hypercorn_config.use_reloader = config.DEBUG
+    hypercorn_config.accesslog = "-"
+    hypercorn_config.errorlog = "-"
+    if config.LOOP == "uvloop" or (config.LOOP == "auto" and uvloop_available()):
+        hypercorn_config.worker_class = "uvloop"
+    if config.LIMIT_CONCURRENCY or config.HTTP_PARSER != "auto":
+        logger.warning("LIMIT_CONCURRENCY and HTTP_PARSER only apply to uvicorn, ignored")
+    run(hypercorn_config)
+
+
+def main():
+    if config.LOOP == "uvloop" and not uvloop_available():
+        raise RuntimeError("LOOP=uvloop needs the uvloop package: uv sync --extra speedups")
+    if config.SERVER == "hypercorn":
+        run_hypercorn()
+    else:
+        run_uvicorn()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,83 @@
+import asyncio
+import json
+import os
+import unittest
+
+# importing backend.services loads the settings, which require these
+for name in ("ADMIN_USERNAME", "ADMIN_PASSWORD", "JWT_SECRET_KEY"):
+    os.environ.setdefault(name, "test")
+
+from backend.services import decoders  # noqa: E402
+
+
+class NullNumbersTest(unittest.TestCase):
+    """A null number in one row must not fail the whole listing."""
+
+    def test_sanaei(self):
+        body = json.dumps(
+            {
+                "obj": [
+                    {"email": "a", "totalGB": None, "traffic": {"up": None, "down": 5}},
+                    {"email": "b", "totalGB": 10},
+                ]
+            }
+        ).encode()
+        for clients in (
+            decoders.decode_sanaei_clients(body),
+            asyncio.run(decoders.read_sanaei_clients(body)),
+        ):
+            self.assertEqual([client.email for client in clients], ["a", "b"])
+            self.assertIsNone(clients[0].total_gb)
+            self.assertIsNone(clients[0].traffic.up)
+
+    def test_guard(self):
+        body = json.dumps(
+            [
+                {
+                    "id": 1,
+                    "username": "a",
+                    "limit_usage": None,
+                    "current_usage": None,
+                    "limit_expire": None,
+                },
+                {"id": 2, "username": "b", "limit_usage": 10},
+            ]
+        ).encode()
+        for subscriptions in (
+            decoders.decode_guard_subscriptions(body),
+            asyncio.run(decoders.read_guard_subscriptions(body)),
+        ):
+            self.assertEqual([sub.username for sub in subscriptions], ["a", "b"])
+            self.assertIsNone(subscriptions[0].limit_expire)
+
+    def test_txui(self):
+        settings = json.dumps(
+            {
+                "clients": [
+                    {"email": "a", "totalGB": None, "expiryTime": None},
+                    {"email": "b", "totalGB": 10},
+                ]
+            }
+        )
+        for clients in (
+            decoders.decode_txui_clients(settings),
+            asyncio.run(decoders.read_txui_clients(settings)),
+        ):
+            self.assertEqual([client.email for client in clients], ["a", "b"])
+            self.assertIsNone(clients[0].expiry_time)
+
+    def test_incremental_path(self):
+        body = json.dumps(
+            {"obj": [{"email": str(i), "totalGB": None} for i in range(10)]}
+        ).encode()
+        size = decoders.INCREMENTAL_SIZE
+        decoders.INCREMENTAL_SIZE = 0
+        try:
+            clients = asyncio.run(decoders.read_sanaei_clients(body))
+        finally:
+            decoders.INCREMENTAL_SIZE = size
+        self.assertEqual(len(clients), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()